@@ -0,0 +1,168 @@
+"""
+Compare the capture backends on a video file and check their frames.
+
+Each backend decodes the whole file to processing-size uint8 BGR frames:
+opencv decodes at source resolution and resizes with cv2.resize, pyav and
+gstreamer scale while converting the decoded frames. The frames of every
+backend are checked against the opencv ones (count, shape, dtype, mean
+absolute difference); the exit status is 1 if a check fails. Without
+--source a test file with a moving box is written first.
+
+Usage (from the aiml-inference directory):
+    python -m benchmarks.capture
+    python -m benchmarks.capture --source video.mp4 --backend opencv --backend pyav
+    python -m benchmarks.capture --source video.mp4 --backend pyav --keyframes-only
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from typing import List, Optional
+
+if not __package__:
+    # Run as a script: make the aiml-inference packages importable
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import cv2
+import numpy as np
+
+from video_processor.capture import CAPTURE_BACKENDS, open_capture
+
+
+def write_test_video(path: str, width: int, height: int, num_frames: int,
+                     fps: float):
+    """
+    Write an MPEG-4 file (with inter frames) of a box moving over a gradient.
+    """
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'mp4v'), fps,
+                             (width, height))
+    gradient = np.linspace(0, 255, width, dtype=np.uint8)
+    background = np.dstack([np.tile(gradient, (height, 1))] * 3)
+    size = min(width, height) // 4
+    for i in range(num_frames):
+        frame = background.copy()
+        x = i * 8 % (width - size)
+        cv2.rectangle(frame, (x, height // 3), (x + size, height // 3 + size),
+                      (0, 0, 255), -1)
+        writer.write(frame)
+    writer.release()
+
+
+def decode(source: str, backend: str, width: int, height: int,
+           keyframes_only: bool) -> Optional[List[np.ndarray]]:
+    """
+    Decode every frame at the processing size, None if the backend is
+    unavailable. Prints frames/s and ms/frame.
+    """
+    try:
+        cap = open_capture(source, backend, width, height,
+                           keyframes_only=keyframes_only)
+    except ImportError as e:
+        print(f"{backend:>10}: unavailable ({e})")
+        return None
+    if not cap.isOpened():
+        print(f"{backend:>10}: unavailable (failed to open {source})")
+        return None
+
+    frames = []
+    start = time.perf_counter()
+    while True:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        if frame.shape[:2] != (height, width):
+            frame = cv2.resize(frame, (width, height))
+        frames.append(frame)
+    elapsed = time.perf_counter() - start
+    cap.release()
+
+    print(f"{backend:>10}: {len(frames) / max(elapsed, 1e-9):8.2f} frames/s "
+          f"({elapsed / max(len(frames), 1) * 1e3:.2f} ms/frame, "
+          f"{len(frames)} frames in {elapsed:.2f} s)")
+    return frames
+
+
+def check(backend: str, frames: List[np.ndarray], reference: List[np.ndarray],
+          width: int, height: int, keyframes_only: bool,
+          max_mean_diff: float) -> bool:
+    """
+    Check the frames of a backend against the opencv reference frames.
+    """
+    errors = []
+    if not frames:
+        errors.append("no frames decoded")
+    if keyframes_only:
+        if len(frames) >= len(reference):
+            errors.append(f"{len(frames)} key frames, expected fewer than "
+                          f"{len(reference)}")
+    elif len(frames) != len(reference):
+        errors.append(f"{len(frames)} frames, expected {len(reference)}")
+    for frame in frames:
+        if frame.shape != (height, width, 3) or frame.dtype != np.uint8:
+            errors.append(f"frame {frame.shape} {frame.dtype}, expected "
+                          f"({height}, {width}, 3) uint8")
+            break
+
+    if not keyframes_only and not errors:
+        diff = max(np.abs(frame.astype(np.int16) - expected).mean()
+                   for frame, expected in zip(frames, reference))
+        if diff > max_mean_diff:
+            errors.append(f"mean abs diff {diff:.2f} to opencv above "
+                          f"{max_mean_diff}")
+        else:
+            print(f"{backend:>10}: max mean abs diff to opencv {diff:.2f}")
+
+    for error in errors:
+        print(f"[ERR]: {backend}: {error}", file=sys.stderr)
+    return not errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--source', help='Video file (default: generated)')
+    parser.add_argument('--backend', action='append', choices=CAPTURE_BACKENDS,
+                        help='Backend to compare, repeatable (default: all)')
+    parser.add_argument('--keyframes-only', action='store_true',
+                        help='Decode only key frames with pyav')
+    parser.add_argument('--width', type=int, default=640)
+    parser.add_argument('--height', type=int, default=640)
+    parser.add_argument('--source-width', type=int, default=1920)
+    parser.add_argument('--source-height', type=int, default=1080)
+    parser.add_argument('--frames', type=int, default=150,
+                        help='Frames of the generated file')
+    parser.add_argument('--fps', type=float, default=25.0)
+    parser.add_argument('--max-mean-diff', type=float, default=8.0,
+                        help='Largest mean abs difference of a frame to opencv')
+    args = parser.parse_args()
+
+    source = args.source
+    tmp_dir = None
+    if source is None:
+        tmp_dir = tempfile.TemporaryDirectory(prefix='capture-bench-')
+        source = os.path.join(tmp_dir.name, 'test.mp4')
+        write_test_video(source, args.source_width, args.source_height,
+                         args.frames, args.fps)
+
+    backends = args.backend or list(CAPTURE_BACKENDS)
+    reference = decode(source, 'opencv', args.width, args.height, False)
+    if reference is None:
+        sys.exit(1)
+
+    ok = True
+    for backend in backends:
+        keyframes_only = args.keyframes_only and backend == 'pyav'
+        if backend == 'opencv' and not keyframes_only:
+            continue  # Reference, decoded above
+        frames = decode(source, backend, args.width, args.height, keyframes_only)
+        if frames is not None:
+            ok &= check(backend, frames, reference, args.width, args.height,
+                        keyframes_only, args.max_mean_diff)
+
+    if tmp_dir is not None:
+        tmp_dir.cleanup()
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
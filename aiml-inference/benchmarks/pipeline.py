@@ -0,0 +1,401 @@
+"""
+Run the full inference pipeline on recorded or synthetic sources.
+
+Measures FastVideoProcessor + model + post-processing without cameras,
+Redis or RabbitMQ: the model can be a stub backend and published messages
+only go to an in-memory stub broker, so it runs on a plain CPU machine.
+With --realtime the decode stage includes the wait for the next frame,
+like a live camera.
+
+Usage (from the aiml-inference directory):
+    python -m benchmarks.pipeline --source synthetic --frames 300
+    python -m benchmarks.pipeline --source video.mp4 --source video.mp4 --realtime
+    python -m benchmarks.pipeline --source video.mp4 --backend onnxruntime --model yolo_person.onnx
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from threading import Lock
+from typing import Optional, Tuple
+
+if not __package__:
+    # Run as a script: make the aiml-inference packages importable
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import cv2
+import numpy as np
+import torch
+
+from postprocess.batch_postprocessor import BatchPostprocessor
+from postprocess.clip_recorder import ClipRecorder
+from postprocess.image_writer import ImageWriter
+from postprocess.rate_limiter import DetectionRateLimiter
+from postprocess.tracker import DetectionTracker
+from postprocess.zone_filter import ZoneFilter
+from video_processor.capture import CAPTURE_BACKENDS, open_capture
+from video_processor.processor import FastVideoProcessor
+from video_processor.stage_timer import StageTimer
+from yolo_engine.attributes import create_attribute_backend
+from yolo_engine.backends import (DETECTION_DTYPE, InferenceBackend,
+                                  create_backend)
+
+SYNTHETIC = 'synthetic'
+
+
+class SyntheticCapture:
+    """
+    Capture generating frames with a moving box on a noisy background.
+    """
+
+    def __init__(self, width: int, height: int, num_frames: int, seed: int = 0):
+        rng = np.random.default_rng(seed)
+        self.background = rng.integers(0, 64, (height, width, 3), dtype=np.uint8)
+        self.width = width
+        self.height = height
+        self.num_frames = num_frames
+        self.index = 0
+
+    def isOpened(self) -> bool:
+        return True
+
+    def get(self, prop: int) -> float:
+        return 0.0
+
+    def read(self) -> Tuple[bool, Optional[np.ndarray]]:
+        if self.index >= self.num_frames:
+            return False, None
+
+        frame = self.background.copy()
+        size = min(self.width, self.height) // 4
+        x = self.index * 4 % max(self.width - size, 1)
+        y = (self.height - size) // 2
+        cv2.rectangle(frame, (x, y), (x + size, y + size), (255, 255, 255), -1)
+        self.index += 1
+        return True, frame
+
+    def grab(self) -> bool:
+        if self.index >= self.num_frames:
+            return False
+        self.index += 1
+        return True
+
+    def release(self):
+        self.index = self.num_frames
+
+
+class PacedCapture:
+    """
+    Capture wrapper delivering frames no faster than ``fps`` (real time).
+    """
+
+    def __init__(self, cap, fps: float):
+        self.cap = cap
+        self.interval = 1.0 / fps
+        self.next_time = None
+
+    def isOpened(self) -> bool:
+        return self.cap.isOpened()
+
+    def _wait(self):
+        now = time.perf_counter()
+        if self.next_time is None:
+            self.next_time = now
+        elif self.next_time > now:
+            time.sleep(self.next_time - now)
+        self.next_time += self.interval
+
+    def read(self) -> Tuple[bool, Optional[np.ndarray]]:
+        self._wait()
+        return self.cap.read()
+
+    def grab(self) -> bool:
+        self._wait()
+        return self.cap.grab()
+
+    def release(self):
+        self.cap.release()
+
+
+class StubBackend(InferenceBackend):
+    """
+    Backend returning random boxes after a fixed simulated latency.
+    """
+
+    name = 'stub'
+
+    def __init__(self, detections_per_frame: int = 2, latency_ms: float = 0.0,
+                 seed: int = 0, **kwargs):
+        super().__init__(path='', **kwargs)
+        self.detections_per_frame = detections_per_frame
+        self.latency = latency_ms / 1e3
+        self.rng = np.random.default_rng(seed)
+
+    def load(self):
+        pass
+
+    def infer(self, batch: torch.Tensor) -> np.ndarray:
+        if self.latency > 0:
+            time.sleep(self.latency)
+
+        height, width = batch.shape[2:]
+        count = batch.size(0) * self.detections_per_frame
+        xy = self.rng.uniform(0, [width * 0.8, height * 0.8], (count, 2))
+        wh = self.rng.uniform(10, [width * 0.2, height * 0.2], (count, 2))
+
+        detections = np.zeros(count, dtype=DETECTION_DTYPE)
+        detections['frame'] = np.repeat(np.arange(batch.size(0)),
+                                        self.detections_per_frame)
+        detections['box'] = np.concatenate([xy, xy + wh], axis=1)
+        detections['score'] = self.rng.uniform(0.3, 1.0, count)
+        return detections
+
+
+class StubPublisher:
+    """
+    In-memory broker stub: serializes messages like the real publisher and
+    records the publish stage.
+    """
+
+    def __init__(self, stage_timer: StageTimer):
+        self.stage_timer = stage_timer
+        self.published = 0
+        self.bytes = 0
+        self._lock = Lock()
+
+    def publish(self, msg_dict: dict) -> bool:
+        with self.stage_timer.time('publish'):
+            body = json.dumps(msg_dict).encode('utf-8')
+        with self._lock:
+            self.published += 1
+            self.bytes += len(body)
+        return True
+
+
+def open_source(source: str, args):
+    """
+    Open a recorded video file or a synthetic source, paced if requested.
+    """
+    if source == SYNTHETIC:
+        cap = SyntheticCapture(args.source_width, args.source_height, args.frames)
+        fps = args.fps
+    else:
+        scaled = not args.roi  # ROI crops need the source resolution
+        cap = open_capture(source, args.capture_backend,
+                           args.width if scaled else None,
+                           args.height if scaled else None,
+                           keyframes_only=args.keyframes_only)
+        if not cap.isOpened():
+            raise IOError(f"Failed to open video source {source}")
+        fps = cap.get(cv2.CAP_PROP_FPS) or args.fps
+
+    if args.realtime:
+        cap = PacedCapture(cap, fps)
+    return cap
+
+
+def print_report(elapsed: float, frames: int, stage_stats: dict,
+                 batch_stats: dict, writer_stats: dict, publisher: StubPublisher):
+    """
+    Print frames/s and the per-stage latencies of the run.
+    """
+    print(f"Frames: {frames} in {elapsed:.2f} s, {frames / elapsed:.2f} frames/s")
+    print(f"{'stage':>12} {'calls':>7} {'items':>7} {'avg ms':>9} "
+          f"{'max ms':>9} {'ms/frame':>9}")
+    for stage, stat in stage_stats.items():
+        print(f"{stage:>12} {stat['calls']:>7} {stat['items']:>7} "
+              f"{stat['avg_ms']:>9.2f} {stat['max_ms']:>9.2f} "
+              f"{stat['total_ms'] / max(stat['items'], 1):>9.3f}")
+    for stage in ('encode', 'write'):
+        print(f"{stage:>12} {writer_stats['written']:>7} {writer_stats['written']:>7} "
+              f"{writer_stats[f'{stage}_avg_ms']:>9.2f} "
+              f"{writer_stats[f'{stage}_max_ms']:>9.2f}")
+    print(f"Batch fill ratio: {batch_stats['fill_ratio']:.2f}, frame age avg/max: "
+          f"{batch_stats['frame_age_avg_ms']:.1f}/{batch_stats['frame_age_max_ms']:.1f} ms, "
+          f"dropped frames: {batch_stats['dropped_frames']}")
+    if 'strides' in batch_stats:
+        print(f"Strides: {batch_stats['strides']}, input/capacity: "
+              f"{batch_stats['input_fps']:.1f}/{batch_stats['capacity_fps']:.1f} "
+              f"frames/s, stride increases/decreases: "
+              f"{batch_stats['stride_increases']}/{batch_stats['stride_decreases']}")
+    print(f"Images written: {writer_stats['written']}, dropped: "
+          f"{writer_stats['dropped']}, messages published: {publisher.published} "
+          f"({publisher.bytes} bytes)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--source', action='append',
+                        help=f"Video file or '{SYNTHETIC}', repeat for several streams")
+    parser.add_argument('--frames', type=int, default=300,
+                        help='Frames per synthetic source')
+    parser.add_argument('--source-width', type=int, default=1280)
+    parser.add_argument('--source-height', type=int, default=720)
+    parser.add_argument('--fps', type=float, default=25.0,
+                        help='Synthetic frame rate, or file rate if unknown')
+    parser.add_argument('--realtime', action='store_true',
+                        help='Pace sources to their frame rate instead of as fast as possible')
+    parser.add_argument('--live', action='store_true', help='Latest-frame-wins mode')
+    parser.add_argument('--motion-gate', action='store_true')
+    parser.add_argument('--polygon', default='',
+                        help='Detection polygon x1,y1,x2,y2,... in processed-frame pixels')
+    parser.add_argument('--roi', action='store_true',
+                        help="Crop frames to the polygon's bounding rectangle")
+    parser.add_argument('--batch-size', type=int, default=8)
+    parser.add_argument('--width', type=int, default=640)
+    parser.add_argument('--height', type=int, default=640)
+    parser.add_argument('--num-workers', type=int, default=4)
+    parser.add_argument('--capture-backend', default='opencv',
+                        choices=CAPTURE_BACKENDS)
+    parser.add_argument('--keyframes-only', action='store_true',
+                        help='Decode only key frames (pyav)')
+    parser.add_argument('--decode-processes', type=int, default=0,
+                        help='Decode video files in worker processes (shared memory)')
+    parser.add_argument('--device', default='cpu')
+    parser.add_argument('--adaptive-stride', action='store_true',
+                        help='Adjust the capture stride to the inference throughput')
+    parser.add_argument('--target-latency', type=float, default=0.5)
+    parser.add_argument('--max-batch-latency', type=float, default=0.2)
+    parser.add_argument('--backend', default='stub',
+                        help='stub, tensorrt, torchscript or onnxruntime')
+    parser.add_argument('--model', help='Model artifact of a real backend')
+    parser.add_argument('--detections', type=int, default=2,
+                        help='Boxes per frame returned by the stub backend')
+    parser.add_argument('--infer-ms', type=float, default=0.0,
+                        help='Simulated latency per batch of the stub backend')
+    parser.add_argument('--min-score', type=float, default=0.25)
+    parser.add_argument('--attribute-backend',
+                        help='Attribute model backend (onnxruntime or torchscript)')
+    parser.add_argument('--attribute-model', help='Attribute model artifact')
+    parser.add_argument('--rate', type=float, default=0.0,
+                        help='Detection rate limit per camera and class, 0 disables')
+    parser.add_argument('--save-dir', help='Keep saved images here (default: temporary)')
+    parser.add_argument('--jpeg-quality', type=int, default=90)
+    parser.add_argument('--writer-workers', type=int, default=2)
+    parser.add_argument('--no-tracking', action='store_true',
+                        help='Publish every frame with detections instead of track events')
+    parser.add_argument('--clips', action='store_true',
+                        help='Buffer frames and record a clip around track events')
+    parser.add_argument('--clip-seconds', type=float, default=2.0,
+                        help='Seconds before and after the clip event')
+    parser.add_argument('--clip-fps', type=float, default=5.0)
+    parser.add_argument('--clip-memory-mb', type=float, default=64)
+    args = parser.parse_args()
+
+    sources = args.source or [SYNTHETIC]
+    coordinates = [int(value) for value in args.polygon.split(',') if value]
+    polygon = list(zip(coordinates[0::2], coordinates[1::2]))
+
+    if args.backend == StubBackend.name:
+        model = StubBackend(detections_per_frame=args.detections,
+                            latency_ms=args.infer_ms, device=args.device)
+        model.load()
+    else:
+        model = create_backend(args.backend, path=args.model, device=args.device)
+    model.warmup(args.batch_size, args.height, args.width)
+
+    attribute_model = None
+    if args.attribute_backend:
+        attribute_model = create_attribute_backend(
+            args.attribute_backend, path=args.attribute_model, device=args.device)
+
+    tracker = None
+    if not args.no_tracking:
+        tracker = DetectionTracker()
+
+    rate_limiter = None
+    if args.rate > 0:
+        rate_limiter = DetectionRateLimiter(rate=args.rate, burst=args.rate)
+
+    save_dir = args.save_dir or tempfile.mkdtemp(prefix='pipeline-bench-')
+    os.makedirs(save_dir, exist_ok=True)
+
+    if args.decode_processes > 0:
+        if SYNTHETIC in sources or args.realtime:
+            parser.error('--decode-processes needs video files without --realtime')
+        captures = sources
+    else:
+        captures = [open_source(source, args) for source in sources]
+
+    processor = FastVideoProcessor(
+        sources=captures,
+        batch_size=args.batch_size,
+        width=args.width,
+        height=args.height,
+        num_workers=args.num_workers,
+        device=args.device,
+        max_batch_latency=args.max_batch_latency,
+        live=args.live,
+        motion_gate=args.motion_gate,
+        roi_mode=args.roi,
+        decode_processes=args.decode_processes,
+        capture_backend=args.capture_backend,
+        keyframes_only=args.keyframes_only,
+        adaptive_stride=args.adaptive_stride,
+        target_latency=args.target_latency
+    )
+    processor.set_detection_region(polygon)
+    zone_filter = ZoneFilter(args.width, args.height)
+    publisher = StubPublisher(processor.stage_timer)
+    image_writer = ImageWriter(num_workers=args.writer_workers,
+                               queue_size=64,
+                               jpeg_quality=args.jpeg_quality)
+    clip_recorder = None
+    if args.clips and tracker is not None:
+        clip_recorder = ClipRecorder(save_dir, pre_seconds=args.clip_seconds,
+                                     post_seconds=args.clip_seconds,
+                                     fps=args.clip_fps,
+                                     memory_limit_mb=args.clip_memory_mb)
+
+    postprocessor = BatchPostprocessor(
+        image_writer, publisher.publish, save_dir, list(range(len(sources))),
+        min_score=args.min_score, zone_filter=zone_filter, tracker=tracker,
+        rate_limiter=rate_limiter, attribute_model=attribute_model,
+        attribute_classes=[0], clip_recorder=clip_recorder)
+
+    frames_processed = 0
+    start = time.perf_counter()
+    try:
+        while True:
+            batch = processor.get_batch(timeout=1.0)
+            if batch is None:
+                if processor.finished:
+                    break
+                continue
+
+            with processor.stage_timer.time('infer', batch.size(0)):
+                detections = model.infer(batch)
+            postprocessor.process(processor, detections, polygon)
+            frames_processed += batch.size(0)
+    except KeyboardInterrupt:
+        print("Stopping...")
+    finally:
+        processor.release()
+        image_writer.close()  # Waits for queued images (save + publish)
+        elapsed = time.perf_counter() - start
+        clip_stats = None
+        if clip_recorder is not None:
+            clip_recorder.close()  # Writes the pending clips
+            clip_stats = clip_recorder.stats()
+        if not args.save_dir:
+            shutil.rmtree(save_dir, ignore_errors=True)
+
+    print_report(elapsed, frames_processed, processor.stage_stats(),
+                 processor.stats(), image_writer.stats(), publisher)
+    if tracker is not None:
+        track_stats = tracker.stats()
+        print(f"Tracks started: {track_stats['started']}, "
+              f"ended: {track_stats['ended']}, "
+              f"zone entries: {track_stats['zone_entries']}")
+    if clip_stats is not None:
+        print(f"Clip buffer: {clip_stats['memory_mb']:.1f} MB "
+              f"({clip_stats['frames']} frames), clips written: "
+              f"{clip_stats['clips']}, dropped/evicted frames: "
+              f"{clip_stats['dropped']}/{clip_stats['evicted']}")
+
+
+if __name__ == "__main__":
+    main()
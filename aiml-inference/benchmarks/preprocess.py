@@ -0,0 +1,99 @@
+"""
+Compare per-frame, vectorized and on-device preprocessing of a batch.
+
+Usage (from the aiml-inference directory):
+    python -m benchmarks.preprocess --batch-size 8 --iterations 50 --device cpu
+"""
+import argparse
+import os
+import sys
+import time
+
+if not __package__:
+    # Run as a script: make the aiml-inference packages importable
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import torch
+
+from video_processor.preprocess import (normalize_batch, preprocess_batch,
+                                        preprocess_frame, stack_batch)
+
+
+def per_frame(frames, out: torch.Tensor):
+    """
+    Per-frame path: preprocess each frame, then copy it into the batch.
+    """
+    for i, frame in enumerate(frames):
+        out[i].copy_(torch.from_numpy(preprocess_frame(frame)))
+
+
+def on_device(frames, staging: np.ndarray, raw: torch.Tensor, out: torch.Tensor):
+    """
+    uint8 path: stack on the CPU, transfer uint8, normalize on the device.
+    """
+    n = stack_batch(frames, staging)
+    raw[:n].copy_(torch.from_numpy(staging[:n]), non_blocking=True)
+    normalize_batch(raw[:n], out[:n])
+    if out.is_cuda:
+        torch.cuda.synchronize()
+
+
+def run(name: str, func, frames, iterations: int) -> float:
+    """
+    Time ``func`` over ``iterations`` batches and print frames/s.
+    """
+    func(frames)  # Warmup
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func(frames)
+    elapsed = time.perf_counter() - start
+
+    fps = iterations * len(frames) / elapsed
+    print(f"{name:>12}: {fps:8.2f} frames/s ({elapsed / iterations * 1e3:.2f} ms/batch)")
+    return fps
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--batch-size', type=int, default=8)
+    parser.add_argument('--width', type=int, default=640)
+    parser.add_argument('--height', type=int, default=640)
+    parser.add_argument('--iterations', type=int, default=50)
+    parser.add_argument('--device', default='cpu')
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    frames = [rng.integers(0, 256, (args.height, args.width, 3), dtype=np.uint8)
+              for _ in range(args.batch_size)]
+
+    out = torch.zeros((args.batch_size, 3, args.height, args.width),
+                      dtype=torch.float16)
+    staging = np.empty((args.batch_size, args.height, args.width, 3),
+                       dtype=np.uint8)
+
+    baseline = run('per-frame', lambda f: per_frame(f, out),
+                   frames, args.iterations)
+    expected = out.clone()
+
+    batched = run('vectorized', lambda f: preprocess_batch(f, staging, out),
+                  frames, args.iterations)
+    max_error = (out.float() - expected.float()).abs().max().item()
+
+    print(f"Speedup: {batched / baseline:.2f}x, max abs diff: {max_error:.4f}")
+
+    raw = torch.zeros((args.batch_size, args.height, args.width, 3),
+                      dtype=torch.uint8, device=args.device)
+    device_out = torch.zeros_like(out, device=args.device)
+    device = run(f'uint8->{args.device}',
+                 lambda f: on_device(f, staging, raw, device_out),
+                 frames, args.iterations)
+    max_error = (device_out.cpu().float() - expected.float()).abs().max().item()
+
+    print(f"Speedup: {device / baseline:.2f}x, max abs diff: {max_error:.4f}, "
+          f"bytes transferred: {raw.nbytes} vs {out.nbytes}")
+
+
+if __name__ == "__main__":
+    main()
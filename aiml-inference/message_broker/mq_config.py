@@ -3,4 +3,9 @@ VIRTUAL_HOST='/'
 PORT='5672'
 USERNAME='jetson'
 PASSWORD='ivsr@2019'
-QUEUE='model_queue'
\ No newline at end of file
+QUEUE='model_queue'
+# Detection publisher
+PUBLISH_QUEUE_SIZE = 1000  # Messages buffered in memory while the broker is slow/down
+MAX_IN_FLIGHT = 64  # Published messages awaiting a broker confirm
+RECONNECT_DELAY = 5.0  # Seconds between reconnection attempts
+MAX_PUBLISH_RETRIES = 3  # Times a message nacked by the broker is published again
@@ -2,40 +2,302 @@ import pika
 from . import mq_config
 import json
 import sys
+import time
+from collections import deque
+from queue import Empty, Full, Queue
+from threading import Event, Lock, Thread
 
-credentials = pika.PlainCredentials('jetson', 'ivsr@2019')
+
+class DetectionPublisher:
+    '''
+    Non-blocking RabbitMQ publisher running in its own thread.
+
+    Messages are put into a bounded in-memory queue and the caller never
+    waits on the network: when the queue is full the message is dropped.
+    The publisher thread owns an asynchronous pika connection, keeps up to
+    ``max_in_flight`` messages outstanding with publisher confirms, retries
+    unconfirmed messages after a reconnect, publishes nacked messages again
+    up to ``max_retries`` times and reconnects automatically. Nothing
+    connects until ``start`` is called; messages published before are
+    queued.
+    '''
+
+    def __init__(self, parameters: pika.ConnectionParameters, queue: str,
+                 queue_size: int = mq_config.PUBLISH_QUEUE_SIZE,
+                 max_in_flight: int = mq_config.MAX_IN_FLIGHT,
+                 reconnect_delay: float = mq_config.RECONNECT_DELAY,
+                 max_retries: int = mq_config.MAX_PUBLISH_RETRIES):
+        '''
+        Initialize the DetectionPublisher, see ``start``.
+
+        Args:
+            parameters (pika.ConnectionParameters): Broker connection parameters.
+            queue (str): Name of the (durable) queue to publish to.
+            queue_size (int): Maximum number of messages waiting to be published.
+            max_in_flight (int): Maximum number of unconfirmed messages.
+            reconnect_delay (float): Seconds between reconnection attempts.
+            max_retries (int): Times a nacked message is published again
+                before it is dropped.
+        '''
+        self._parameters = parameters
+        self._queue_name = queue
+        self._max_in_flight = max_in_flight
+        self._reconnect_delay = reconnect_delay
+        self._max_retries = max_retries
+
+        self._queue = Queue(maxsize=queue_size)
+        self._retry = deque()  # Unconfirmed (lost connection) or nacked messages
+        self._stopping = Event()
+
+        self._connection = None
+        self._channel = None
+        self._ready = False
+        self._delivery_tag = 0
+        self._in_flight = {}  # delivery tag -> (body, enqueue time, retries)
+
+        self._lock = Lock()
+        self._reset()
+
+        self._thread = Thread(target=self._run, daemon=True)
+
+    def start(self):
+        '''
+        Start the publisher thread, which connects to the broker.
+        '''
+        self._thread.start()
+
+    def _reset(self):
+        self._confirmed = 0
+        self._nacked = 0
+        self._failed = 0
+        self._dropped = 0
+        self._reconnects = 0
+        self._latency_sum = 0.0
+        self._latency_max = 0.0
+
+    def publish(self, msg_dict: dict) -> bool:
+        '''
+        Queue a message for publishing without blocking.
+
+        Args:
+            msg_dict (dict): The message content, represented as a dictionary.
+
+        Returns:
+            bool: True if the message was queued, False if it was dropped.
+        '''
+        try:
+            self._queue.put_nowait((json.dumps(obj=msg_dict), time.monotonic(), 0))
+        except Full:
+            with self._lock:
+                self._dropped += 1
+            return False
+
+        connection = self._connection
+        if connection is not None and self._ready:
+            try:
+                connection.ioloop.add_callback_threadsafe(self._pump)
+            except Exception:
+                pass  # Connection is closing, the message stays queued
+
+        return True
+
+    def _run(self):
+        '''
+        Publisher thread: connect, run the I/O loop, reconnect on failure.
+        '''
+        while not self._stopping.is_set():
+            self._connection = pika.SelectConnection(
+                parameters=self._parameters,
+                on_open_callback=self._on_connection_open,
+                on_open_error_callback=self._on_connection_open_error,
+                on_close_callback=self._on_connection_closed)
+            self._connection.ioloop.start()
+
+            if not self._stopping.is_set():
+                with self._lock:
+                    self._reconnects += 1
+                self._stopping.wait(self._reconnect_delay)
+
+    def _on_connection_open(self, connection):
+        connection.channel(on_open_callback=self._on_channel_open)
+
+    def _on_connection_open_error(self, connection, error):
+        print(f'[ERR]: Failed to connect to broker: {error}', file=sys.stderr)
+        connection.ioloop.stop()
+
+    def _on_connection_closed(self, connection, reason):
+        self._ready = False
+        self._channel = None
+
+        # Retry everything the broker did not confirm
+        for tag in sorted(self._in_flight):
+            self._retry.append(self._in_flight[tag])
+        self._in_flight.clear()
+
+        if not self._stopping.is_set():
+            print(f'[ERR]: Broker connection closed: {reason}', file=sys.stderr)
+        connection.ioloop.stop()
+
+    def _on_channel_open(self, channel):
+        self._channel = channel
+        channel.add_on_close_callback(self._on_channel_closed)
+        channel.queue_declare(queue=self._queue_name, durable=True,
+                              callback=self._on_queue_declared)
+
+    def _on_channel_closed(self, channel, reason):
+        self._close_connection()
+
+    def _close_connection(self):
+        connection = self._connection
+        if connection.is_closing or connection.is_closed:
+            connection.ioloop.stop()
+        else:
+            connection.close()
+
+    def _on_queue_declared(self, frame):
+        self._delivery_tag = 0
+        self._channel.confirm_delivery(
+            ack_nack_callback=self._on_delivery_confirmation)
+        self._ready = True
+        self._pump()
+
+    def _on_delivery_confirmation(self, frame):
+        '''
+        Handle a (possibly multiple) ack or nack from the broker.
+        '''
+        method = frame.method
+        acked = isinstance(method, pika.spec.Basic.Ack)
+        if method.multiple:
+            tags = [tag for tag in self._in_flight if tag <= method.delivery_tag]
+        else:
+            tags = [method.delivery_tag]
+
+        now = time.monotonic()
+        with self._lock:
+            for tag in tags:
+                entry = self._in_flight.pop(tag, None)
+                if entry is None:
+                    continue
+                body, enqueue_time, retries = entry
+                if acked:
+                    latency = now - enqueue_time
+                    self._confirmed += 1
+                    self._latency_sum += latency
+                    self._latency_max = max(self._latency_max, latency)
+                    continue
+
+                self._nacked += 1
+                if retries < self._max_retries:
+                    self._retry.append((body, enqueue_time, retries + 1))
+                else:
+                    self._failed += 1
+                    print(f'[ERR]: Message nacked {retries + 1} times, dropped',
+                          file=sys.stderr)
+
+        self._pump()
+
+    def _next_message(self):
+        if self._retry:
+            return self._retry.popleft()
+        return self._queue.get_nowait()
+
+    def _pump(self):
+        '''
+        Publish queued messages while the in-flight window has room.
+        '''
+        while self._ready and len(self._in_flight) < self._max_in_flight:
+            try:
+                body, enqueue_time, retries = self._next_message()
+            except Empty:
+                break
+
+            try:
+                self._channel.basic_publish(
+                    exchange='',
+                    routing_key=self._queue_name,
+                    body=body
+                )
+            except Exception as e:
+                print(f'[ERR]: {e}', file=sys.stderr)
+                self._retry.appendleft((body, enqueue_time, retries))
+                break
+
+            self._delivery_tag += 1
+            self._in_flight[self._delivery_tag] = (body, enqueue_time, retries)
+
+    def stats(self) -> dict:
+        '''
+        Report publisher statistics gathered since the last call.
+
+        Returns:
+            dict: ``queue_depth``, ``in_flight``, ``confirmed``, ``nacked``
+            (nacks received), ``failed`` (dropped after ``max_retries``
+            nacks), ``dropped`` (queue full), ``reconnects`` and
+            ``latency_avg_ms`` / ``latency_max_ms`` (enqueue to broker
+            confirm).
+        '''
+        with self._lock:
+            stats = {
+                "queue_depth": self._queue.qsize() + len(self._retry),
+                "in_flight": len(self._in_flight),
+                "confirmed": self._confirmed,
+                "nacked": self._nacked,
+                "failed": self._failed,
+                "dropped": self._dropped,
+                "reconnects": self._reconnects,
+                "latency_avg_ms": self._latency_sum / max(self._confirmed, 1) * 1e3,
+                "latency_max_ms": self._latency_max * 1e3,
+            }
+            self._reset()
+
+        return stats
+
+    def close(self, timeout: float = 5.0):
+        '''
+        Stop the publisher thread and close the connection.
+
+        Args:
+            timeout (float): Seconds to wait for the thread to finish.
+        '''
+        self._stopping.set()
+        connection = self._connection
+        if connection is not None:
+            try:
+                connection.ioloop.add_callback_threadsafe(self._close_connection)
+            except Exception:
+                pass
+        if self._thread.is_alive():
+            self._thread.join(timeout=timeout)
+
+
+credentials = pika.PlainCredentials(mq_config.USERNAME, mq_config.PASSWORD)
 connection_parameters = pika.ConnectionParameters(
     host=mq_config.HOST,
-    port=mq_config.PORT,
+    port=int(mq_config.PORT),
     virtual_host=mq_config.VIRTUAL_HOST,
     credentials=credentials
 )
 
-connection = pika.BlockingConnection(connection_parameters)
-channel = connection.channel()
-channel.queue_declare(queue=mq_config.QUEUE, durable=True)
+publisher = DetectionPublisher(
+    parameters=connection_parameters, queue=mq_config.QUEUE)
 
 
 def publishMessage(msg_dict: dict) -> bool:
     '''
     Publishes a message to a RabbitMQ queue.
 
+    The message is handed to the background publisher and this call never
+    waits on the network.
+
     Args:
         msg_dict (dict): The message content to be published, represented as a dictionary.
 
     Returns:
-        bool: True if the message was successfully published, False otherwise.
+        bool: True if the message was queued for publishing, False if it was dropped.
     '''
 
     try:
-        message_body = json.dumps(obj=msg_dict)
-        channel.basic_publish(
-            exchange='',
-            routing_key=mq_config.QUEUE,
-            body=message_body
-        )
+        return publisher.publish(msg_dict)
     except Exception as e:
         print(f'[ERR]: {e}', file=sys.stderr)
         return False
-
-    return True
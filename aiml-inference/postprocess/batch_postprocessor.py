@@ -0,0 +1,248 @@
+import os
+import time
+from collections import defaultdict
+from datetime import datetime
+from functools import partial
+from typing import Callable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from yolo_engine.attributes import AttributeBackend, predict_attributes
+
+from .clip_recorder import ClipRecorder
+from .detections import filter_detections, split_by_frame
+from .image_writer import ImageWriter
+from .messages import (build_event_message, build_frame_message,
+                       build_track_end_message)
+from .rate_limiter import DetectionRateLimiter
+from .tracker import TRACK_END, TRACK_START, DetectionTracker
+from .zone_filter import ZoneFilter
+
+
+class BatchPostprocessor:
+    """
+    Post-processing of the detections of one inference batch.
+
+    Shared by ``main.demo()`` and the pipeline benchmark so both run the
+    same path: filter the whole batch, undo the ROI crops and drop
+    out-of-zone boxes vectorized, then per frame buffer it for clips, update
+    the tracks (publishing track ends), rate-limit, predict attributes of
+    the published objects in one call, save the annotated image in
+    background and publish its message once written, and record a clip
+    around frames with track events.
+    """
+
+    def __init__(
+        self,
+        image_writer: ImageWriter,
+        publish: Callable[[dict], bool],
+        save_dir: str,
+        camera_ids: Sequence[int],
+        min_score: float = 0.25,
+        class_ids: Optional[Sequence[int]] = None,
+        zone_filter: Optional[ZoneFilter] = None,
+        tracker: Optional[DetectionTracker] = None,
+        rate_limiter: Optional[DetectionRateLimiter] = None,
+        attribute_model: Optional[AttributeBackend] = None,
+        attribute_classes: Optional[Sequence[int]] = None,
+        clip_recorder: Optional[ClipRecorder] = None
+    ):
+        """
+        Initialize the BatchPostprocessor.
+
+        Args:
+            image_writer (ImageWriter): Background writer of the frame images.
+            publish (Callable[[dict], bool]): Publishes a message, e.g.
+                ``publishMessage``.
+            save_dir (str): Directory of the frame images and clips.
+            camera_ids (Sequence[int]): Camera id of each stream.
+            min_score (float): Minimum confidence of a kept detection.
+            class_ids (Optional[Sequence[int]]): Class ids kept, None for all.
+            zone_filter (Optional[ZoneFilter]): Drops detections outside the
+                detection polygon, None keeps them.
+            tracker (Optional[DetectionTracker]): Publish only track events
+                instead of every frame with detections.
+            rate_limiter (Optional[DetectionRateLimiter]): Caps saved and
+                published frames, or track starts with ``tracker``, per
+                camera and class.
+            attribute_model (Optional[AttributeBackend]): Secondary model
+                predicting attributes of the published objects.
+            attribute_classes (Optional[Sequence[int]]): Class ids whose
+                objects get attributes, None for all.
+            clip_recorder (Optional[ClipRecorder]): Records a clip around
+                frames with track events (needs ``tracker``).
+        """
+        self.image_writer = image_writer
+        self.publish = publish
+        self.save_dir = save_dir
+        self.camera_ids = camera_ids
+        self.min_score = min_score
+        self.class_ids = class_ids
+        self.zone_filter = zone_filter
+        self.tracker = tracker
+        self.rate_limiter = rate_limiter
+        self.attribute_model = attribute_model
+        self.attribute_classes = attribute_classes
+        self.clip_recorder = clip_recorder if tracker is not None else None
+
+    def process(self, processor, detections: np.ndarray,
+                polygon: List[Tuple[int, int]]):
+        """
+        Post-process the detections of the batch last returned by
+        ``processor.get_batch``.
+
+        Records the ``postprocess`` and ``attributes`` stages on the
+        processor's stage timer.
+
+        Args:
+            processor (FastVideoProcessor): Processor the batch comes from.
+            detections (np.ndarray): ``DETECTION_DTYPE`` detections of the
+                batch, see ``InferenceBackend.infer``.
+            polygon (List[Tuple[int, int]]): Detection polygon.
+        """
+        postprocess_start = time.perf_counter()
+        stream_ids = processor.batch_stream_ids
+        capture_times = processor.batch_capture_times
+        batch_size = len(stream_ids)
+
+        detections = filter_detections(detections, min_score=self.min_score,
+                                       class_ids=self.class_ids)
+        detections['box'] = processor.batch_boxes_to_frame(
+            detections['box'], detections['frame'])
+        if self.zone_filter is not None:
+            self.zone_filter.set_polygon(polygon)
+            detections = detections[self.zone_filter.boxes_in_zone(detections['box'])]
+        frame_detections = split_by_frame(detections, batch_size)
+
+        published = []
+        for i in range(batch_size):
+            bboxes = frame_detections[i]['box']
+            scores = frame_detections[i]['score']
+            class_ids = frame_detections[i]['class_id']
+            camera_id = self.camera_ids[stream_ids[i]]
+            object_ids = events = in_zone = clip_events = None
+            object_tracks = ()
+
+            if self.clip_recorder is not None:
+                # Copied only when sampled for the clip buffer
+                self.clip_recorder.add(camera_id, capture_times[i],
+                                       partial(processor.batch_full_frame, i))
+
+            if self.tracker is not None:
+                # Every frame updates the tracks, also without detections
+                track_ids, track_events = self.tracker.update(
+                    camera_id, bboxes, scores, class_ids, capture_times[i],
+                    polygon)
+
+                # Only the tracks whose start was published end
+                ended = [track for event, track in track_events
+                         if event == TRACK_END and track.reported]
+                if ended:
+                    self.publish(build_track_end_message(
+                        camera_id, datetime.now().isoformat(), ended))
+
+                # Report only the objects of tracks that started or entered
+                # the zone on this frame. A track starting in the zone has
+                # both events: the frame message reports its start with
+                # in_zone, the clip message both
+                tracks, reported = {}, defaultdict(list)
+                for event, track in track_events:
+                    if event != TRACK_END:
+                        tracks[track.track_id] = track
+                        reported[track.track_id].append(event)
+
+                # Cap the track starts per camera and class. The events of a
+                # track whose start was rate-limited are never published
+                reported = {track_id: object_events
+                            for track_id, object_events in reported.items()
+                            if tracks[track_id].reported or
+                            TRACK_START in object_events}
+                starting = [tracks[track_id].class_id
+                            for track_id, object_events in reported.items()
+                            if TRACK_START in object_events]
+                if starting and self.rate_limiter is not None and \
+                        not self.rate_limiter.allow(camera_id, starting):
+                    reported = {track_id: object_events
+                                for track_id, object_events in reported.items()
+                                if TRACK_START not in object_events}
+                keep = np.isin(track_ids, list(reported))
+                bboxes, scores, class_ids = \
+                    bboxes[keep], scores[keep], class_ids[keep]
+                object_ids = track_ids[keep]
+                events = [reported[track_id][0] for track_id in object_ids]
+                object_tracks = [tracks[track_id] for track_id in object_ids]
+                in_zone = [track.in_zone for track in object_tracks]
+                clip_events = [(track_id, event) for track_id in object_ids
+                               for event in reported[track_id]]
+
+            if bboxes.shape[0] == 0:
+                continue
+
+            # Cap saves and publishes per camera and per class
+            if self.tracker is None and self.rate_limiter is not None and \
+                    not self.rate_limiter.allow(camera_id, class_ids):
+                continue
+
+            published.append((i, camera_id, bboxes, scores, class_ids,
+                              object_ids, events, in_zone, clip_events,
+                              object_tracks))
+
+        # The frames are copies as their ring slot is reused by the producer
+        frames = [processor.batch_full_frame(i) for i, *_ in published]
+        attributes = [None] * len(published)
+        attribute_time = 0.0
+        if self.attribute_model is not None and published:
+            # Crops of the published objects of all frames, one model call
+            attribute_start = time.perf_counter()
+            boxes_per_frame = [entry[2] for entry in published]
+            attributes = predict_attributes(
+                self.attribute_model, frames, boxes=boxes_per_frame,
+                class_ids=[entry[4] for entry in published],
+                classes=self.attribute_classes)
+            attribute_time = time.perf_counter() - attribute_start
+            processor.stage_timer.record(
+                'attributes', attribute_time,
+                sum(len(boxes) for boxes in boxes_per_frame))
+
+        for (i, camera_id, bboxes, scores, class_ids, object_ids, events,
+             in_zone, clip_events, object_tracks), \
+                frame, frame_attributes in zip(published, frames, attributes):
+            timestamp = datetime.now().isoformat()
+
+            # Prepare one message payload for all boxes of the frame
+            message, boxes = build_frame_message(
+                camera_id, timestamp, bboxes, scores, class_ids,
+                object_ids=object_ids, events=events,
+                attributes=frame_attributes, in_zone=in_zone)
+
+            # Draw bounding boxes and detection polygon, save the image in
+            # background and publish once it is written
+            if not self.image_writer.submit(
+                    os.path.join(self.save_dir, f"{timestamp}.jpg"), frame,
+                    boxes=boxes, polygon=polygon,
+                    on_written=partial(self.publish, message)):
+                # Dropped: neither the frame nor its clip event is published,
+                # and the tracks still count as unreported
+                continue
+            for track in object_tracks:
+                track.reported = True
+
+            if self.clip_recorder is not None and clip_events:
+                # Published with the clip once its post-event part is in
+                self.clip_recorder.trigger(
+                    camera_id, capture_times[i], f"{timestamp}.avi",
+                    on_ready=partial(self._publish_clip_message, camera_id,
+                                     timestamp, *zip(*clip_events)))
+
+        processor.stage_timer.record(
+            'postprocess',
+            time.perf_counter() - postprocess_start - attribute_time,
+            batch_size)
+
+    def _publish_clip_message(self, camera_id, timestamp, object_ids, events,
+                              path):
+        """
+        Publish the track events of a frame once their clip is written.
+        """
+        self.publish(build_event_message(camera_id, timestamp, object_ids,
+                                         events, os.path.basename(path)))
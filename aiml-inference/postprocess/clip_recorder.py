@@ -0,0 +1,291 @@
+import os
+import struct
+import sys
+import time
+from collections import deque
+from queue import Empty, Full, Queue
+from threading import Event, Lock, Thread
+from typing import Callable, Dict, Hashable, List, Optional
+
+import cv2
+import numpy as np
+
+AVIF_HASINDEX = 0x10
+AVIIF_KEYFRAME = 0x10
+
+
+def write_mjpeg_avi(path: str, frames: List[bytes], width: int, height: int,
+                    fps: float):
+    """
+    Mux already JPEG-encoded frames into an MJPEG AVI, without re-encoding.
+
+    Args:
+        path (str): Destination file path.
+        frames (List[bytes]): JPEG frames in display order.
+        width (int): Frame width.
+        height (int): Frame height.
+        fps (float): Frame rate.
+    """
+    def chunk(fourcc: bytes, data: bytes) -> bytes:
+        return fourcc + struct.pack('<I', len(data)) + data + b'\0' * (len(data) % 2)
+
+    def riff_list(kind: bytes, fourcc: bytes, data: bytes) -> bytes:
+        return kind + struct.pack('<I', len(data) + 4) + fourcc + data
+
+    rate = max(int(round(fps)), 1)
+    largest = max((len(frame) for frame in frames), default=0)
+
+    avih = struct.pack('<14I', int(1e6 / rate), largest * rate, 0, AVIF_HASINDEX,
+                       len(frames), 0, 1, largest, width, height, 0, 0, 0, 0)
+    strh = struct.pack('<4s4sIHHIIIIIIII4h', b'vids', b'MJPG', 0, 0, 0, 0, 1,
+                       rate, 0, len(frames), largest, 0xFFFFFFFF, 0,
+                       0, 0, width, height)
+    strf = struct.pack('<IiiHH4sIiiII', 40, width, height, 1, 24, b'MJPG',
+                       width * height * 3, 0, 0, 0, 0)
+    hdrl = riff_list(b'LIST', b'hdrl', chunk(b'avih', avih) + riff_list(
+        b'LIST', b'strl', chunk(b'strh', strh) + chunk(b'strf', strf)))
+
+    movi = bytearray()
+    index = bytearray()
+    for frame in frames:
+        # Offsets are relative to the 'movi' fourcc
+        index += struct.pack('<4sIII', b'00dc', AVIIF_KEYFRAME, len(movi) + 4,
+                             len(frame))
+        movi += chunk(b'00dc', frame)
+
+    body = hdrl + riff_list(b'LIST', b'movi', bytes(movi)) + chunk(b'idx1', bytes(index))
+    with open(path, 'wb') as file:
+        file.write(riff_list(b'RIFF', b'AVI ', body))
+
+
+class PendingClip:
+    """
+    Clip requested around an event, written once its post-event part is in.
+    """
+
+    __slots__ = ('camera_id', 'start', 'end', 'path', 'on_ready')
+
+    def __init__(self, camera_id: Hashable, start: float, end: float, path: str,
+                 on_ready: Optional[Callable[[str], None]]):
+        self.camera_id = camera_id
+        self.start = start
+        self.end = end
+        self.path = path
+        self.on_ready = on_ready
+
+
+class ClipRecorder:
+    """
+    Bounded in-memory ring of JPEG-compressed frames per camera, turned into
+    pre/post-event clips on demand.
+
+    Frames are sampled at ``fps`` per camera, encoded once on a background
+    thread and kept compressed; the oldest frames of any camera are evicted
+    to stay under ``memory_limit_mb``. ``trigger`` requests a clip from
+    ``pre_seconds`` before to ``post_seconds`` after an event; once the
+    post-event frames are in (or the camera stalls), the stored JPEGs are
+    muxed into an MJPEG AVI without decoding and ``on_ready`` is called with
+    its path.
+    """
+
+    def __init__(
+        self,
+        output_dir: str,
+        pre_seconds: float = 5.0,
+        post_seconds: float = 5.0,
+        fps: float = 5.0,
+        memory_limit_mb: float = 64.0,
+        jpeg_quality: int = 70,
+        queue_size: int = 32
+    ):
+        """
+        Initialize the ClipRecorder and start its encoder thread.
+
+        Args:
+            output_dir (str): Directory clips are written to.
+            pre_seconds (float): Seconds of video before the event.
+            post_seconds (float): Seconds of video after the event.
+            fps (float): Frames per second kept per camera.
+            memory_limit_mb (float): Maximum size of all compressed frames.
+            jpeg_quality (int): JPEG quality of the kept frames, 0-100.
+            queue_size (int): Maximum number of frames waiting for encoding.
+        """
+        self.output_dir = output_dir
+        self.pre_seconds = pre_seconds
+        self.post_seconds = post_seconds
+        self.fps = fps
+        self.interval = 1.0 / fps
+        self.memory_limit = int(memory_limit_mb * 1024 * 1024)
+        self.jpeg_quality = jpeg_quality
+
+        self.queue = Queue(maxsize=queue_size)
+        self.stop_event = Event()
+        self._lock = Lock()
+        self._rings: Dict[Hashable, deque] = {}  # camera -> (time, jpeg)
+        self._next_sample: Dict[Hashable, float] = {}
+        self._pending: List[PendingClip] = []
+        self._frame_size = None
+        self._bytes = 0
+        self._reset()
+
+        self.thread = Thread(target=self._work, daemon=True)
+        self.thread.start()
+
+    def _reset(self):
+        self._clips = 0
+        self._dropped = 0
+        self._evicted = 0
+
+    def add(self, camera_id: Hashable, capture_time: float,
+            get_frame: Callable[[], np.ndarray]):
+        """
+        Offer a frame of a camera, kept if its sampling interval elapsed.
+
+        Args:
+            camera_id (Hashable): Camera of the frame.
+            capture_time (float): ``time.monotonic()`` capture timestamp.
+            get_frame (Callable[[], np.ndarray]): Returns a BGR copy of the
+                frame, only called if the frame is kept.
+        """
+        next_sample = self._next_sample.get(camera_id, capture_time)
+        if capture_time < next_sample:
+            return
+        # Keep to the sampling grid, frame jitter would lower the rate
+        next_sample += self.interval
+        if next_sample <= capture_time:
+            next_sample = capture_time + self.interval
+        self._next_sample[camera_id] = next_sample
+
+        try:
+            self.queue.put_nowait((camera_id, capture_time, get_frame()))
+        except Full:
+            with self._lock:
+                self._dropped += 1
+
+    def trigger(self, camera_id: Hashable, event_time: float, name: str,
+                on_ready: Optional[Callable[[str], None]] = None):
+        """
+        Request the clip of an event.
+
+        Args:
+            camera_id (Hashable): Camera of the event.
+            event_time (float): ``time.monotonic()`` of the event frame.
+            name (str): Clip file name in ``output_dir``.
+            on_ready (Optional[Callable[[str], None]]): Called from the
+                encoder thread with the clip path once written.
+        """
+        clip = PendingClip(camera_id, event_time - self.pre_seconds,
+                           event_time + self.post_seconds,
+                           os.path.join(self.output_dir, name), on_ready)
+        with self._lock:
+            self._pending.append(clip)
+
+    def _work(self):
+        """
+        Encoder loop: compress sampled frames, evict, write due clips.
+        """
+        while not (self.stop_event.is_set() and self.queue.empty()):
+            try:
+                camera_id, capture_time, frame = self.queue.get(timeout=0.1)
+            except Empty:
+                self._write_due_clips(flush=self.stop_event.is_set())
+                continue
+
+            ok, encoded = cv2.imencode(
+                '.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, self.jpeg_quality])
+            if not ok:
+                print("[ERR]: Clip frame encoding failed", file=sys.stderr)
+                continue
+
+            with self._lock:
+                self._frame_size = (frame.shape[1], frame.shape[0])
+                ring = self._rings.setdefault(camera_id, deque())
+                ring.append((capture_time, encoded.tobytes()))
+                self._bytes += len(ring[-1][1])
+                self._evict()
+
+            self._write_due_clips()
+        self._write_due_clips(flush=True)
+
+    def _evict(self):
+        """
+        Drop the oldest frames of any camera until under the memory limit.
+        """
+        while self._bytes > self.memory_limit:
+            camera_id = min((c for c, ring in self._rings.items() if ring),
+                            key=lambda c: self._rings[c][0][0])
+            _, jpeg = self._rings[camera_id].popleft()
+            self._bytes -= len(jpeg)
+            self._evicted += 1
+
+    def _write_due_clips(self, flush: bool = False):
+        """
+        Write the clips whose post-event part is complete.
+
+        A clip is due once a frame after its end was stored, or when its
+        camera delivered nothing (e.g. static scene, stalled stream) for
+        ``post_seconds`` past its end. ``flush`` writes all pending clips.
+        """
+        now = time.monotonic()
+        with self._lock:
+            due, pending = [], []
+            for clip in self._pending:
+                ring = self._rings.get(clip.camera_id)
+                newest = ring[-1][0] if ring else float('-inf')
+                if flush or newest >= clip.end or now >= clip.end + self.post_seconds:
+                    frames = [jpeg for t, jpeg in (ring or ())
+                              if clip.start <= t <= clip.end]
+                    due.append((clip, frames))
+                else:
+                    pending.append(clip)
+            self._pending = pending
+            frame_size = self._frame_size
+
+        for clip, frames in due:
+            if not frames:
+                continue
+            try:
+                tmp_path = clip.path + '.tmp'
+                write_mjpeg_avi(tmp_path, frames, frame_size[0], frame_size[1],
+                                self.fps)
+                os.replace(tmp_path, clip.path)
+            except OSError as e:
+                print(f"[ERR]: Failed to write clip {clip.path}: {e}", file=sys.stderr)
+                continue
+
+            with self._lock:
+                self._clips += 1
+            if clip.on_ready is not None:
+                try:
+                    clip.on_ready(clip.path)
+                except Exception as e:
+                    print(f"[ERR]: {e}", file=sys.stderr)
+
+    def stats(self) -> dict:
+        """
+        Report recorder statistics, counters since the last call.
+
+        Returns:
+            dict: ``memory_mb`` used, ``frames`` kept, ``pending`` clips,
+            ``clips`` written, ``dropped`` frames (encoder queue full) and
+            ``evicted`` frames (memory limit).
+        """
+        with self._lock:
+            stats = {
+                "memory_mb": self._bytes / (1024 * 1024),
+                "frames": sum(len(ring) for ring in self._rings.values()),
+                "pending": len(self._pending),
+                "clips": self._clips,
+                "dropped": self._dropped,
+                "evicted": self._evicted,
+            }
+            self._reset()
+
+        return stats
+
+    def close(self):
+        """
+        Encode the queued frames, write the pending clips and stop.
+        """
+        self.stop_event.set()
+        self.thread.join()
@@ -0,0 +1,41 @@
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+
+def filter_detections(
+    detections: np.ndarray,
+    min_score: float = 0.0,
+    class_ids: Optional[Sequence[int]] = None
+) -> np.ndarray:
+    """
+    Keep the detections of a batch above a score and of the given classes,
+    in one vectorized pass.
+
+    Args:
+        detections (np.ndarray): ``DETECTION_DTYPE`` detections of a batch.
+        min_score (float): Minimum confidence kept.
+        class_ids (Optional[Sequence[int]]): Classes kept, None for all.
+
+    Returns:
+        np.ndarray: Kept detections, still sorted by frame.
+    """
+    keep = detections['score'] >= min_score
+    if class_ids is not None:
+        keep &= np.isin(detections['class_id'], class_ids)
+    return detections[keep]
+
+
+def split_by_frame(detections: np.ndarray, batch_size: int) -> List[np.ndarray]:
+    """
+    Split the detections of a batch, sorted by frame, into per-frame views.
+
+    Args:
+        detections (np.ndarray): ``DETECTION_DTYPE`` detections of a batch.
+        batch_size (int): Number of frames in the batch.
+
+    Returns:
+        List[np.ndarray]: Detections of each frame, possibly empty.
+    """
+    bounds = np.searchsorted(detections['frame'], np.arange(batch_size + 1))
+    return [detections[bounds[i]:bounds[i + 1]] for i in range(batch_size)]
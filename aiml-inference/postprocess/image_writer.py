@@ -0,0 +1,184 @@
+import os
+import sys
+import time
+from queue import Empty, Full, Queue
+from threading import Event, Lock, Thread
+from typing import Callable, List, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+BOX_COLOR = (0, 255, 0)
+POLYGON_COLOR = (0, 0, 255)
+
+
+class ImageWriter:
+    """
+    Bounded background pool that annotates, JPEG-encodes and writes images.
+
+    The inference loop only enqueues the frame with its annotations. When
+    the queue is full ``submit`` blocks for up to ``put_timeout`` seconds
+    (backpressure), then drops the image. Files are written under a
+    temporary name and renamed, so readers never see a partial JPEG.
+    """
+
+    def __init__(
+        self,
+        num_workers: int = 2,
+        queue_size: int = 16,
+        jpeg_quality: int = 90,
+        put_timeout: float = 0.05
+    ):
+        """
+        Initialize the ImageWriter and start its worker threads.
+
+        Args:
+            num_workers (int): Number of encoder/writer threads.
+            queue_size (int): Maximum number of images waiting to be written.
+            jpeg_quality (int): JPEG quality, 0-100.
+            put_timeout (float): Seconds ``submit`` waits for room in the queue.
+        """
+        self.jpeg_quality = jpeg_quality
+        self.put_timeout = put_timeout
+        self.queue = Queue(maxsize=queue_size)
+        self.stop_event = Event()
+
+        self._lock = Lock()
+        self._reset()
+
+        self.workers = [Thread(target=self._work, daemon=True)
+                        for _ in range(num_workers)]
+        for worker in self.workers:
+            worker.start()
+
+    def _reset(self):
+        self._written = 0
+        self._dropped = 0
+        self._failed = 0
+        self._encode_sum = 0.0
+        self._encode_max = 0.0
+        self._write_sum = 0.0
+        self._write_max = 0.0
+
+    def submit(
+        self,
+        path: str,
+        image: np.ndarray,
+        boxes: Sequence[Sequence[int]] = (),
+        polygon: Optional[List[Tuple[int, int]]] = None,
+        on_written: Optional[Callable[[], None]] = None
+    ) -> bool:
+        """
+        Enqueue an image to be annotated, encoded and written.
+
+        Args:
+            path (str): Destination JPEG file path.
+            image (np.ndarray): BGR image, owned by the writer from now on.
+            boxes (Sequence[Sequence[int]]): [x1, y1, x2, y2] boxes to draw.
+            polygon (Optional[List[Tuple[int, int]]]): Detection polygon to draw.
+            on_written (Optional[Callable[[], None]]): Called from the worker
+                once the file is in place.
+
+        Returns:
+            bool: True if the image was queued, False if it was dropped.
+        """
+        try:
+            self.queue.put((path, image, boxes, polygon, on_written),
+                           timeout=self.put_timeout)
+        except Full:
+            with self._lock:
+                self._dropped += 1
+            return False
+        return True
+
+    def _annotate(self, image: np.ndarray, boxes, polygon):
+        """
+        Draw the bounding boxes and the detection polygon on the image.
+        """
+        for x1, y1, x2, y2 in boxes:
+            cv2.rectangle(image, (int(x1), int(y1)),
+                          (int(x2), int(y2)), BOX_COLOR, 2)
+
+        if polygon:
+            polygon_points = np.array(polygon, np.int32).reshape((-1, 1, 2))
+            cv2.polylines(image, [polygon_points], isClosed=True,
+                          color=POLYGON_COLOR, thickness=2, lineType=cv2.LINE_AA)
+
+    def _work(self):
+        """
+        Worker loop: annotate, encode and write queued images.
+        """
+        while not (self.stop_event.is_set() and self.queue.empty()):
+            try:
+                path, image, boxes, polygon, on_written = self.queue.get(
+                    timeout=0.1)
+            except Empty:
+                continue
+
+            try:
+                start = time.perf_counter()
+                self._annotate(image, boxes, polygon)
+                ok, encoded = cv2.imencode(
+                    '.jpg', image, [cv2.IMWRITE_JPEG_QUALITY, self.jpeg_quality])
+                if not ok:
+                    raise IOError("JPEG encoding failed")
+                encoded_time = time.perf_counter()
+
+                tmp_path = path + '.tmp'
+                with open(tmp_path, 'wb') as file:
+                    file.write(encoded.tobytes())
+                os.replace(tmp_path, path)
+                written_time = time.perf_counter()
+            except Exception as e:
+                print(f"[ERR]: Failed to write image {path}: {e}", file=sys.stderr)
+                with self._lock:
+                    self._failed += 1
+                continue
+            finally:
+                self.queue.task_done()
+
+            with self._lock:
+                self._written += 1
+                self._encode_sum += encoded_time - start
+                self._encode_max = max(self._encode_max, encoded_time - start)
+                self._write_sum += written_time - encoded_time
+                self._write_max = max(self._write_max, written_time - encoded_time)
+
+            if on_written is not None:
+                try:
+                    on_written()
+                except Exception as e:
+                    print(f"[ERR]: {e}", file=sys.stderr)
+
+    def stats(self) -> dict:
+        """
+        Report writer statistics gathered since the last call.
+
+        Returns:
+            dict: ``queue_depth``, ``written``, ``dropped``, ``failed``,
+            ``encode_avg_ms`` / ``encode_max_ms`` and
+            ``write_avg_ms`` / ``write_max_ms``.
+        """
+        with self._lock:
+            written = max(self._written, 1)
+            stats = {
+                "queue_depth": self.queue.qsize(),
+                "written": self._written,
+                "dropped": self._dropped,
+                "failed": self._failed,
+                "encode_avg_ms": self._encode_sum / written * 1e3,
+                "encode_max_ms": self._encode_max * 1e3,
+                "write_avg_ms": self._write_sum / written * 1e3,
+                "write_max_ms": self._write_max * 1e3,
+            }
+            self._reset()
+
+        return stats
+
+    def close(self):
+        """
+        Write the remaining queued images and stop the workers.
+        """
+        self.stop_event.set()
+        for worker in self.workers:
+            worker.join()
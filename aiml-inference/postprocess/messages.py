@@ -0,0 +1,137 @@
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .tracker import TRACK_END
+
+
+def build_frame_message(
+    camera_id: int,
+    timestamp: str,
+    bboxes: np.ndarray,
+    scores: np.ndarray,
+    class_ids: np.ndarray,
+    object_ids: Optional[Sequence[int]] = None,
+    events: Optional[Sequence[str]] = None,
+    attributes: Optional[Sequence[Optional[dict]]] = None,
+    in_zone: Optional[Sequence[bool]] = None
+) -> Tuple[dict, List[List[int]]]:
+    """
+    Build the detection message of one frame, one message for all its boxes.
+
+    Args:
+        camera_id (int): Camera the frame comes from.
+        timestamp (str): ISO timestamp of the detection, also the image name.
+        bboxes (np.ndarray): (N, 4) xyxy boxes.
+        scores (np.ndarray): (N,) confidences.
+        class_ids (np.ndarray): (N,) class ids.
+        object_ids (Optional[Sequence[int]]): Track id of each box, defaults
+            to the box index in the frame.
+        events (Optional[Sequence[str]]): Track event of each box. A track
+            starting inside the zone reports ``start`` here, with
+            ``in_zone`` set.
+        attributes (Optional[Sequence[Optional[dict]]]): Attributes
+            predicted for each box, None for boxes without.
+        in_zone (Optional[Sequence[bool]]): Whether each tracked box is
+            inside the detection zone.
+
+    Returns:
+        Tuple[dict, List[List[int]]]: Message published to RabbitMQ and the
+        integer boxes drawn on the saved image.
+    """
+    # Convert to Python types for the whole frame at once
+    boxes = np.asarray(bboxes, dtype=np.float32).reshape(-1, 4).astype(np.int32).tolist()
+    scores = np.round(np.asarray(scores, dtype=np.float64), 4).tolist()
+    class_ids = np.asarray(class_ids).astype(np.int64).tolist()
+    if object_ids is None:
+        object_ids = range(len(boxes))
+    else:
+        object_ids = np.asarray(object_ids).astype(np.int64).tolist()
+
+    objects = [
+        {
+            "id": object_id,
+            "bbox": bbox,
+            "score": score,
+            "class_id": class_id,
+            "type": "Human"
+        }
+        for object_id, bbox, score, class_id in zip(object_ids, boxes, scores, class_ids)
+    ]
+    if events is not None:
+        for obj, event in zip(objects, events):
+            obj["event"] = event
+    if in_zone is not None:
+        for obj, object_in_zone in zip(objects, in_zone):
+            obj["in_zone"] = bool(object_in_zone)
+    if attributes is not None:
+        for obj, object_attributes in zip(objects, attributes):
+            if object_attributes is not None:
+                obj["attributes"] = object_attributes
+
+    message = {
+        "timestamp": timestamp,
+        "camera_id": camera_id,
+        "number_of_objects": len(objects),
+        "objects": objects
+    }
+    return message, boxes
+
+
+def build_track_end_message(camera_id: int, timestamp: str, tracks) -> dict:
+    """
+    Build the message reporting ended tracks, with their last box.
+
+    No image is saved for it: the objects are no longer in the frame.
+
+    Args:
+        camera_id (int): Camera the tracks belong to.
+        timestamp (str): ISO timestamp of the end.
+        tracks (Sequence[Track]): Ended tracks.
+
+    Returns:
+        dict: Message published to RabbitMQ.
+    """
+    message, _ = build_frame_message(
+        camera_id, timestamp,
+        bboxes=[track.box for track in tracks],
+        scores=[track.score for track in tracks],
+        class_ids=[track.class_id for track in tracks],
+        object_ids=[track.track_id for track in tracks],
+        events=[TRACK_END] * len(tracks))
+    message["image"] = False
+    return message
+
+
+def build_event_message(camera_id: int, timestamp: str,
+                        object_ids: Sequence[int], events: Sequence[str],
+                        video: str) -> dict:
+    """
+    Build the message reporting the clip recorded around track events.
+
+    Args:
+        camera_id (int): Camera of the events.
+        timestamp (str): ISO timestamp of the events.
+        object_ids (Sequence[int]): Track id of each event.
+        events (Sequence[str]): Track event of each object.
+        video (str): File name of the clip in the saved images directory.
+
+    Returns:
+        dict: Message published to RabbitMQ.
+    """
+    return {
+        "timestamp": timestamp,
+        "camera_id": camera_id,
+        "number_of_objects": 0,
+        "objects": [],
+        "image": False,
+        "events": [
+            {
+                "object_id": object_id,
+                "action": event,
+                "type": "Human",
+                "video": video
+            }
+            for object_id, event in zip(np.asarray(object_ids).astype(np.int64).tolist(), events)
+        ]
+    }
@@ -0,0 +1,139 @@
+import time
+from collections import defaultdict
+from threading import Lock
+from typing import Dict, Hashable, Iterable, Optional
+
+
+class TokenBucket:
+    """
+    Token bucket: ``rate`` tokens per second, holding at most ``burst``.
+    """
+
+    def __init__(self, rate: float, burst: float, now: Optional[float] = None):
+        """
+        Initialize a full TokenBucket.
+
+        Args:
+            rate (float): Tokens added per second.
+            burst (float): Bucket capacity.
+            now (Optional[float]): ``time.monotonic()`` of creation.
+        """
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.last = time.monotonic() if now is None else now
+
+    def _refill(self, now: float):
+        self.tokens = min(self.burst, self.tokens + (now - self.last) * self.rate)
+        self.last = now
+
+    def available(self, now: float, tokens: float = 1.0) -> bool:
+        """
+        Whether ``tokens`` can be taken at time ``now``.
+        """
+        self._refill(now)
+        return self.tokens >= tokens
+
+    def try_acquire(self, now: float, tokens: float = 1.0) -> bool:
+        """
+        Take ``tokens`` if available.
+
+        Returns:
+            bool: True if the tokens were taken.
+        """
+        if not self.available(now, tokens):
+            return False
+        self.tokens -= tokens
+        return True
+
+
+class DetectionRateLimiter:
+    """
+    Caps how many detections are saved and published, per camera and class.
+
+    Each (camera id, class id) pair has its own token bucket, so a busy
+    camera or class cannot starve the others. A frame is let through if any
+    of its classes has a token; one token is taken from each such class.
+    """
+
+    def __init__(self, rate: float = 1.0, burst: float = 5.0):
+        """
+        Initialize the DetectionRateLimiter.
+
+        Args:
+            rate (float): Detections per second allowed per camera and class.
+            burst (float): Detections allowed back to back per camera and class.
+        """
+        self._lock = Lock()
+        self.rate = rate
+        self.burst = burst
+        self._buckets: Dict[Hashable, TokenBucket] = {}
+        self._allowed = defaultdict(int)
+        self._limited = defaultdict(int)
+
+    def configure(self, config: dict):
+        """
+        Update the limits at runtime, e.g. from ``RateLimitCache``.
+
+        Args:
+            config (dict): ``rate`` and ``burst``; missing keys are unchanged.
+        """
+        with self._lock:
+            self.rate = float(config.get("rate", self.rate))
+            self.burst = float(config.get("burst", self.burst))
+            for bucket in self._buckets.values():
+                bucket.rate = self.rate
+                bucket.burst = self.burst
+                bucket.tokens = min(bucket.tokens, self.burst)
+
+    def allow(self, camera_id: int, class_ids: Iterable[int],
+              now: Optional[float] = None) -> bool:
+        """
+        Decide whether a frame with detections of ``class_ids`` may be saved.
+
+        Args:
+            camera_id (int): Camera the frame comes from.
+            class_ids (Iterable[int]): Class ids detected in the frame.
+            now (Optional[float]): ``time.monotonic()`` of the decision.
+
+        Returns:
+            bool: True if the frame may be saved and published.
+        """
+        now = time.monotonic() if now is None else now
+        allowed = False
+
+        with self._lock:
+            for class_id in set(int(c) for c in class_ids):
+                key = (camera_id, class_id)
+                bucket = self._buckets.get(key)
+                if bucket is None:
+                    bucket = self._buckets[key] = TokenBucket(
+                        self.rate, self.burst, now)
+
+                if bucket.try_acquire(now):
+                    self._allowed[key] += 1
+                    allowed = True
+                else:
+                    self._limited[key] += 1
+
+        return allowed
+
+    def stats(self) -> dict:
+        """
+        Report allowed and rate-limited counts since the last call.
+
+        Returns:
+            dict: ``allowed`` and ``limited`` totals, and ``limited_by_key``
+            mapping "camera_id:class_id" to its rate-limited count.
+        """
+        with self._lock:
+            stats = {
+                "allowed": sum(self._allowed.values()),
+                "limited": sum(self._limited.values()),
+                "limited_by_key": {f"{camera}:{cls}": count for (camera, cls), count
+                                   in self._limited.items()},
+            }
+            self._allowed.clear()
+            self._limited.clear()
+
+        return stats
@@ -0,0 +1,325 @@
+from collections import defaultdict
+from itertools import count
+from threading import Lock
+from typing import Dict, Hashable, List, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+TRACK_START = 'start'
+TRACK_END = 'end'
+ZONE_ENTRY = 'zone_entry'
+
+
+def iou_matrix(boxes_a: np.ndarray, boxes_b: np.ndarray) -> np.ndarray:
+    """
+    Pairwise IoU of two sets of xyxy boxes.
+
+    Args:
+        boxes_a (np.ndarray): (N, 4) boxes.
+        boxes_b (np.ndarray): (M, 4) boxes.
+
+    Returns:
+        np.ndarray: (N, M) IoU matrix.
+    """
+    top_left = np.maximum(boxes_a[:, None, :2], boxes_b[None, :, :2])
+    bottom_right = np.minimum(boxes_a[:, None, 2:], boxes_b[None, :, 2:])
+    intersection = np.clip(bottom_right - top_left, 0, None).prod(axis=2)
+
+    area_a = (boxes_a[:, 2:] - boxes_a[:, :2]).prod(axis=1)
+    area_b = (boxes_b[:, 2:] - boxes_b[:, :2]).prod(axis=1)
+    union = area_a[:, None] + area_b[None, :] - intersection
+    return intersection / np.maximum(union, 1e-6)
+
+
+def greedy_match(
+    iou: np.ndarray, threshold: float
+) -> Tuple[List[Tuple[int, int]], List[int], List[int]]:
+    """
+    Greedily match rows and columns by decreasing IoU above ``threshold``.
+
+    Args:
+        iou (np.ndarray): (N, M) IoU matrix.
+        threshold (float): Minimum IoU of a match.
+
+    Returns:
+        Tuple[List[Tuple[int, int]], List[int], List[int]]: Matched
+        (row, column) pairs, unmatched rows and unmatched columns.
+    """
+    rows, cols = np.nonzero(iou >= threshold)
+    order = np.argsort(-iou[rows, cols], kind='stable')
+
+    matches = []
+    used_rows, used_cols = set(), set()
+    for row, col in zip(rows[order].tolist(), cols[order].tolist()):
+        if row in used_rows or col in used_cols:
+            continue
+        matches.append((row, col))
+        used_rows.add(row)
+        used_cols.add(col)
+
+    unmatched_rows = [i for i in range(iou.shape[0]) if i not in used_rows]
+    unmatched_cols = [j for j in range(iou.shape[1]) if j not in used_cols]
+    return matches, unmatched_rows, unmatched_cols
+
+
+class Track:
+    """
+    One tracked object with a constant-velocity motion model.
+    """
+
+    __slots__ = ('track_id', 'box', 'velocity', 'score', 'class_id', 'hits',
+                 'last_time', 'confirmed', 'in_zone', 'reported')
+
+    def __init__(self, track_id: int, box: np.ndarray, score: float,
+                 class_id: int, now: float):
+        self.track_id = track_id
+        self.box = box.astype(np.float32)
+        self.velocity = np.zeros(4, dtype=np.float32)  # Pixels per second
+        self.score = score
+        self.class_id = class_id
+        self.hits = 1
+        self.last_time = now
+        self.confirmed = False
+        self.in_zone = False
+        self.reported = False  # Start published, set by the caller
+
+    def predict(self, now: float, max_dt: float) -> np.ndarray:
+        """
+        Box predicted at ``now``, extrapolating at most ``max_dt`` seconds.
+        """
+        return self.box + self.velocity * min(now - self.last_time, max_dt)
+
+    def update(self, box: np.ndarray, score: float, now: float,
+               smoothing: float):
+        dt = now - self.last_time
+        if dt > 0:
+            self.velocity = (1 - smoothing) * self.velocity + \
+                smoothing * (box - self.box) / dt
+        self.box = box.astype(np.float32)
+        self.score = score
+        self.hits += 1
+        self.last_time = now
+
+
+class IouTracker:
+    """
+    ByteTrack-style IoU tracker of one stream.
+
+    High-score detections are matched to the predicted track boxes first,
+    then low-score detections are matched to the tracks left over, which
+    keeps tracks alive through partial occlusion without letting low-score
+    detections start tracks. A track is confirmed (started) after
+    ``min_hits`` matches and ends once unmatched for ``max_age`` seconds.
+    A track enters the zone when its bottom center moves into the polygon,
+    or when it starts inside it: it then gets both ``TRACK_START`` and
+    ``ZONE_ENTRY`` on the same frame.
+    """
+
+    def __init__(
+        self,
+        iou_threshold: float = 0.3,
+        low_iou_threshold: float = 0.5,
+        high_score: float = 0.5,
+        min_hits: int = 2,
+        max_age: float = 1.0,
+        smoothing: float = 0.5,
+        id_counter=None
+    ):
+        """
+        Initialize the IouTracker.
+
+        Args:
+            iou_threshold (float): Minimum IoU matching high-score detections.
+            low_iou_threshold (float): Minimum IoU matching low-score detections.
+            high_score (float): Score splitting high- from low-score detections.
+            min_hits (int): Matches needed before a track starts.
+            max_age (float): Seconds a track survives without a match.
+            smoothing (float): Weight of the latest motion in the velocity.
+            id_counter: Iterator of track ids, shared between streams.
+        """
+        self.iou_threshold = iou_threshold
+        self.low_iou_threshold = low_iou_threshold
+        self.high_score = high_score
+        self.min_hits = min_hits
+        self.max_age = max_age
+        self.smoothing = smoothing
+        self.ids = id_counter if id_counter is not None else count(1)
+        self.tracks: List[Track] = []
+
+    def update(
+        self,
+        boxes: np.ndarray,
+        scores: np.ndarray,
+        class_ids: np.ndarray,
+        now: float,
+        polygon: Optional[Sequence[Tuple[int, int]]] = None
+    ) -> Tuple[np.ndarray, List[Tuple[str, Track]]]:
+        """
+        Associate the detections of a frame with the tracks.
+
+        Args:
+            boxes (np.ndarray): (N, 4) xyxy boxes.
+            scores (np.ndarray): (N,) confidences.
+            class_ids (np.ndarray): (N,) class ids.
+            now (float): ``time.monotonic()`` of the frame.
+            polygon (Optional[Sequence[Tuple[int, int]]]): Zone whose entry
+                is reported, None or fewer than 3 points for no zone.
+
+        Returns:
+            Tuple[np.ndarray, List[Tuple[str, Track]]]: Track id of each
+            detection (-1 if not part of a started track) and the
+            (event, track) events of the frame, event being ``TRACK_START``,
+            ``ZONE_ENTRY`` or ``TRACK_END``.
+        """
+        boxes = np.asarray(boxes, dtype=np.float32).reshape(-1, 4)
+        scores = np.asarray(scores, dtype=np.float32).reshape(-1)
+        class_ids = np.asarray(class_ids).astype(np.int64).reshape(-1)
+
+        track_ids = np.full(len(boxes), -1, dtype=np.int64)
+        events = []
+        assigned = {}  # detection index -> track
+
+        high = np.flatnonzero(scores >= self.high_score)
+        low = np.flatnonzero(scores < self.high_score)
+        pending = list(range(len(self.tracks)))
+
+        for detections, threshold in ((high, self.iou_threshold),
+                                      (low, self.low_iou_threshold)):
+            if len(pending) == 0 or len(detections) == 0:
+                continue
+            iou = self._iou(pending, detections, boxes, class_ids, now)
+            matches, unmatched_tracks, _ = greedy_match(iou, threshold)
+            for row, col in matches:
+                assigned[detections[col]] = self.tracks[pending[row]]
+            pending = [pending[row] for row in unmatched_tracks]
+
+        for index, track in assigned.items():
+            track.update(boxes[index], float(scores[index]), now, self.smoothing)
+
+        # Unmatched high-score detections start new tracks
+        new_tracks = []
+        for index in high:
+            if index not in assigned:
+                track = Track(next(self.ids), boxes[index], float(scores[index]),
+                              int(class_ids[index]), now)
+                assigned[index] = track
+                new_tracks.append(track)
+
+        zone = polygon is not None and len(polygon) >= 3
+        if zone:
+            zone_contour = np.asarray(polygon, dtype=np.float32).reshape(-1, 1, 2)
+
+        for index, track in assigned.items():
+            was_in_zone = track.in_zone
+            if zone:
+                # Bottom center: where a person stands
+                x1, _, x2, y2 = track.box
+                track.in_zone = cv2.pointPolygonTest(
+                    zone_contour, (float(x1 + x2) / 2, float(y2)), False) >= 0
+            else:
+                track.in_zone = False
+
+            started = not track.confirmed and track.hits >= self.min_hits
+            if started:
+                track.confirmed = True
+                events.append((TRACK_START, track))
+            if track.confirmed and track.in_zone and (started or not was_in_zone):
+                events.append((ZONE_ENTRY, track))
+
+            if track.confirmed:
+                track_ids[index] = track.track_id
+
+        # Tracks unmatched for too long end
+        alive = []
+        pending = set(pending)
+        for position, track in enumerate(self.tracks):
+            if position in pending and now - track.last_time > self.max_age:
+                if track.confirmed:
+                    events.append((TRACK_END, track))
+                continue
+            alive.append(track)
+        self.tracks = alive + new_tracks
+
+        return track_ids, events
+
+    def _iou(self, track_positions: List[int], detections: np.ndarray,
+             boxes: np.ndarray, class_ids: np.ndarray, now: float) -> np.ndarray:
+        tracks = [self.tracks[position] for position in track_positions]
+        predicted = np.stack([track.predict(now, self.max_age) for track in tracks])
+        iou = iou_matrix(predicted, boxes[detections])
+
+        # Never match across classes
+        track_classes = np.array([track.class_id for track in tracks])
+        iou[track_classes[:, None] != class_ids[detections][None, :]] = 0
+        return iou
+
+    @property
+    def active(self) -> int:
+        """
+        Number of started tracks.
+        """
+        return sum(track.confirmed for track in self.tracks)
+
+
+class DetectionTracker:
+    """
+    One ``IouTracker`` per camera with track ids unique across cameras.
+    """
+
+    def __init__(self, **tracker_kwargs):
+        """
+        Initialize the DetectionTracker.
+
+        Args:
+            **tracker_kwargs: Arguments of each camera's ``IouTracker``.
+        """
+        self.tracker_kwargs = tracker_kwargs
+        self.ids = count(1)
+        self.trackers: Dict[Hashable, IouTracker] = {}
+        self._lock = Lock()
+        self._events = defaultdict(int)
+
+    def update(
+        self,
+        camera_id: Hashable,
+        boxes: np.ndarray,
+        scores: np.ndarray,
+        class_ids: np.ndarray,
+        now: float,
+        polygon: Optional[Sequence[Tuple[int, int]]] = None
+    ) -> Tuple[np.ndarray, List[Tuple[str, Track]]]:
+        """
+        Update the tracks of a camera with the detections of one frame.
+
+        Must be called for every inferred frame, including frames without
+        detections, so that tracks can end. See ``IouTracker.update``.
+        """
+        tracker = self.trackers.get(camera_id)
+        if tracker is None:
+            tracker = self.trackers[camera_id] = IouTracker(
+                id_counter=self.ids, **self.tracker_kwargs)
+
+        track_ids, events = tracker.update(boxes, scores, class_ids, now, polygon)
+
+        with self._lock:
+            for event, _ in events:
+                self._events[event] += 1
+        return track_ids, events
+
+    def stats(self) -> dict:
+        """
+        Report tracking events since the last call.
+
+        Returns:
+            dict: ``active`` tracks, ``started``, ``ended`` and ``zone_entries``.
+        """
+        with self._lock:
+            events, self._events = self._events, defaultdict(int)
+
+        return {
+            "active": sum(tracker.active for tracker in self.trackers.values()),
+            "started": events[TRACK_START],
+            "ended": events[TRACK_END],
+            "zone_entries": events[ZONE_ENTRY],
+        }
@@ -0,0 +1,44 @@
+import time
+
+import cv2
+import numpy as np
+
+from postprocess.clip_recorder import ClipRecorder
+
+
+def test_clip_round_trip(tmp_path):
+    recorder = ClipRecorder(str(tmp_path), pre_seconds=1.0, post_seconds=1.0,
+                            fps=2.0, jpeg_quality=90)
+    ready = []
+    # Whole seconds ahead of the clock keep the 0.25 s steps exact and the
+    # clip from being written as stalled before its post-event frames
+    start = float(int(time.monotonic()) + 10)
+    try:
+        # Frames every 0.25 s, sampled every 0.5 s; the gray level encodes
+        # the capture time
+        for index in range(17):
+            capture_time = start + index * 0.25
+            frame = np.full((48, 64, 3), index * 10, dtype=np.uint8)
+            recorder.add(1, capture_time, frame.copy)
+            if index == 8:
+                recorder.trigger(1, capture_time, 'event.avi',
+                                 on_ready=ready.append)
+    finally:
+        recorder.close()
+
+    path = str(tmp_path / 'event.avi')
+    assert ready == [path]
+    assert recorder.stats()['clips'] == 1
+
+    capture = cv2.VideoCapture(path)
+    levels = []
+    while True:
+        ok, frame = capture.read()
+        if not ok:
+            break
+        assert frame.shape == (48, 64, 3)
+        levels.append(int(round(frame.mean())))
+    capture.release()
+
+    # 1.0 s before to 1.0 s after the event at 2.0 s, at 2 frames/s
+    assert levels == [40, 60, 80, 100, 120]
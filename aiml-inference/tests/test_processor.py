@@ -0,0 +1,92 @@
+import time
+from queue import Empty, Queue
+from typing import Optional, Tuple
+
+import numpy as np
+import pytest
+
+from video_processor.processor import FastVideoProcessor
+
+
+class FakeCapture:
+    """
+    Capture returning ``num_frames`` black frames, one every ``interval``
+    seconds.
+    """
+
+    def __init__(self, num_frames: int, interval: float = 0.0,
+                 width: int = 64, height: int = 48):
+        self.num_frames = num_frames
+        self.interval = interval
+        self.frame = np.zeros((height, width, 3), dtype=np.uint8)
+        self.index = 0
+
+    def isOpened(self) -> bool:
+        return True
+
+    def get(self, prop: int) -> float:
+        return 0.0
+
+    def read(self) -> Tuple[bool, Optional[np.ndarray]]:
+        if not self.grab():
+            return False, None
+        return True, self.frame.copy()
+
+    def grab(self) -> bool:
+        if self.index >= self.num_frames:
+            return False
+        time.sleep(self.interval)
+        self.index += 1
+        return True
+
+    def release(self):
+        self.index = self.num_frames
+
+
+def make_processor(sources, **kwargs) -> FastVideoProcessor:
+    options = dict(batch_size=4, width=32, height=32, num_workers=2,
+                   device='cpu', device_normalize=False, ring_size=2,
+                   motion_gate=False, roi_mode=False, decode_processes=0,
+                   adaptive_stride=False, capture_backend='opencv')
+    options.update(kwargs)
+    return FastVideoProcessor(sources=sources, **options)
+
+
+def consume(processor: FastVideoProcessor, timeout: float, delay: float = 0.0) -> int:
+    """
+    Fetch batches until the processor finished or ``timeout`` expired.
+
+    Returns:
+        int: Number of frames received.
+    """
+    frames = 0
+    deadline = time.monotonic() + timeout
+    while not processor.finished and time.monotonic() < deadline:
+        batch = processor.get_batch(timeout=0.5)
+        if batch is not None:
+            frames += batch.shape[0]
+            time.sleep(delay)  # Slow consumer
+    return frames
+
+
+def test_live_sources_of_different_lengths_finish():
+    processor = make_processor([FakeCapture(40, 0.005), FakeCapture(150, 0.005)],
+                               live=True, live_queue_size=2)
+    try:
+        frames = consume(processor, timeout=30.0, delay=0.05)
+        assert processor.finished
+        assert 0 < frames <= 190
+    finally:
+        processor.release()
+
+
+def test_get_takes_queued_item_after_deadline():
+    processor = make_processor([FakeCapture(0)])
+    try:
+        queue = Queue()
+        queue.put('frame')
+        assert processor._get(queue, timeout=0) == 'frame'
+        with pytest.raises(Empty):
+            processor._get(queue, timeout=0)
+    finally:
+        processor.release()
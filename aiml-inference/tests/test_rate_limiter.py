@@ -0,0 +1,50 @@
+from postprocess.rate_limiter import DetectionRateLimiter, TokenBucket
+
+
+def test_token_bucket_burst_then_refill():
+    bucket = TokenBucket(rate=2.0, burst=3.0, now=0.0)
+
+    assert [bucket.try_acquire(0.0) for _ in range(4)] == [True, True, True, False]
+
+    # 0.5 s at 2 tokens/s refill one token
+    assert bucket.try_acquire(0.5)
+    assert not bucket.try_acquire(0.5)
+
+    # Never refills past the burst
+    assert [bucket.try_acquire(100.0) for _ in range(4)] == [True, True, True, False]
+
+
+def test_token_bucket_available_does_not_take_tokens():
+    bucket = TokenBucket(rate=1.0, burst=1.0, now=0.0)
+
+    assert bucket.available(0.0) and bucket.available(0.0)
+    assert bucket.try_acquire(0.0)
+    assert not bucket.available(0.5)
+    assert bucket.available(1.0)
+
+
+def test_limiter_buckets_per_camera_and_class():
+    limiter = DetectionRateLimiter(rate=1.0, burst=1.0)
+
+    assert limiter.allow(1, [0], now=0.0)
+    assert not limiter.allow(1, [0], now=0.0)
+    # Other camera and other class have their own buckets
+    assert limiter.allow(2, [0], now=0.0)
+    assert limiter.allow(1, [2], now=0.0)
+    # A frame passes if any of its classes has a token
+    assert limiter.allow(1, [0, 3], now=0.0)
+    assert limiter.allow(1, [0], now=1.0)
+
+    stats = limiter.stats()
+    assert stats['allowed'] == 5 and stats['limited'] == 2
+    assert stats['limited_by_key'] == {'1:0': 2}
+    assert limiter.stats()['allowed'] == 0
+
+
+def test_limiter_configure_caps_existing_buckets():
+    limiter = DetectionRateLimiter(rate=1.0, burst=5.0)
+    limiter.allow(1, [0], now=0.0)
+
+    limiter.configure({'burst': 1})
+    assert limiter.allow(1, [0], now=0.0)
+    assert not limiter.allow(1, [0], now=0.0)
@@ -0,0 +1,64 @@
+import time
+
+import numpy as np
+
+from test_processor import FakeCapture, make_processor
+from video_processor.roi import polygon_to_roi, roi_from_polygon
+
+WIDTH, HEIGHT = 64, 48
+POLYGON = [(30, 20), (50, 20), (50, 40), (30, 40)]
+BOX = (36, 26, 44, 34)  # White box inside the polygon
+
+
+def box_capture(num_frames: int) -> FakeCapture:
+    """
+    Capture of 2x processed-size frames with ``BOX`` drawn in white.
+    """
+    capture = FakeCapture(num_frames, 0.005, width=2 * WIDTH, height=2 * HEIGHT)
+    x1, y1, x2, y2 = BOX
+    capture.frame[2 * y1:2 * y2, 2 * x1:2 * x2] = 255
+    return capture
+
+
+def test_roi_from_polygon_keeps_frame_aspect_ratio():
+    roi = roi_from_polygon(POLYGON, WIDTH, HEIGHT, margin=2)
+    x1, y1, x2, y2 = roi
+    assert x1 <= 28 and y1 <= 18 and x2 >= 52 and y2 >= 42
+    assert abs((x2 - x1) / (y2 - y1) - WIDTH / HEIGHT) < 0.1
+
+    assert roi_from_polygon(POLYGON[:2], WIDTH, HEIGHT) is None
+    assert roi_from_polygon([(0, 0), (WIDTH, 0), (WIDTH, HEIGHT)],
+                            WIDTH, HEIGHT) is None
+
+
+def test_batch_boxes_map_back_to_full_frame():
+    processor = make_processor([box_capture(200)], width=WIDTH, height=HEIGHT,
+                               roi_mode=True, roi_margin=2)
+    try:
+        processor.set_detection_region(POLYGON)
+        deadline = time.monotonic() + 10.0
+        while time.monotonic() < deadline:
+            batch = processor.get_batch(timeout=0.5)
+            if batch is not None and processor.current_slot.rois[0] is not None:
+                break
+        else:
+            raise AssertionError("No ROI-cropped batch")
+
+        # Box as detected on the model input, i.e. the resized crop
+        ys, xs = np.nonzero(batch[0].float().mean(dim=0).numpy() > 0.5)
+        detected = np.array([[xs.min(), ys.min(), xs.max() + 1, ys.max() + 1]],
+                            dtype=np.float32)
+        roi = processor.current_slot.rois[0]
+        # The crop is magnified: the box is larger on the model input
+        assert detected[0, 2] - detected[0, 0] > BOX[2] - BOX[0]
+
+        mapped = processor.batch_boxes_to_frame(detected, np.array([0]))
+        scale = max((roi[2] - roi[0]) / WIDTH, (roi[3] - roi[1]) / HEIGHT)
+        np.testing.assert_allclose(mapped[0], BOX, atol=1 + scale)
+
+        # Same mapping as the polygon into the crop, inverted
+        np.testing.assert_allclose(
+            polygon_to_roi([BOX[:2], BOX[2:]], roi, WIDTH, HEIGHT),
+            detected.reshape(2, 2), atol=2)
+    finally:
+        processor.release()
@@ -0,0 +1,78 @@
+import numpy as np
+
+from postprocess.tracker import TRACK_END, TRACK_START, ZONE_ENTRY, IouTracker
+
+ZONE = [(100, 0), (200, 0), (200, 100), (100, 100)]
+
+
+def step(tracker: IouTracker, boxes, now: float, polygon=None):
+    """
+    Update the tracker with high-score person boxes.
+
+    Returns:
+        Tuple[np.ndarray, List[Tuple[str, int]]]: Track id of each box and
+        the (event, track id) events of the frame.
+    """
+    boxes = np.asarray(boxes, dtype=np.float32).reshape(-1, 4)
+    track_ids, events = tracker.update(
+        boxes, np.full(len(boxes), 0.9), np.zeros(len(boxes)), now, polygon)
+    return track_ids, [(event, track.track_id) for event, track in events]
+
+
+def test_track_starts_after_min_hits_and_ends_after_max_age():
+    tracker = IouTracker(min_hits=2, max_age=0.5)
+
+    track_ids, events = step(tracker, [[0, 0, 20, 40]], 0.0)
+    assert track_ids.tolist() == [-1] and events == []
+
+    track_ids, events = step(tracker, [[2, 0, 22, 40]], 0.1)
+    track_id = track_ids[0]
+    assert track_id > 0 and events == [(TRACK_START, track_id)]
+
+    track_ids, events = step(tracker, [[4, 0, 24, 40]], 0.2)
+    assert track_ids.tolist() == [track_id] and events == []
+
+    # Unmatched, but not yet for max_age
+    assert step(tracker, [], 0.6)[1] == []
+    assert step(tracker, [], 0.8)[1] == [(TRACK_END, track_id)]
+    assert tracker.tracks == []
+
+
+def test_unconfirmed_track_ends_silently():
+    tracker = IouTracker(min_hits=3, max_age=0.5)
+
+    step(tracker, [[0, 0, 20, 40]], 0.0)
+    step(tracker, [[2, 0, 22, 40]], 0.1)
+    assert step(tracker, [], 1.0)[1] == []
+    assert tracker.tracks == []
+
+
+def test_track_starting_in_zone_gets_start_and_zone_entry():
+    tracker = IouTracker(min_hits=2)
+
+    step(tracker, [[140, 20, 160, 60]], 0.0, ZONE)
+    track_ids, events = step(tracker, [[141, 20, 161, 60]], 0.1, ZONE)
+    track_id = track_ids[0]
+    assert events == [(TRACK_START, track_id), (ZONE_ENTRY, track_id)]
+
+    # Staying in the zone is no new entry
+    assert step(tracker, [[142, 20, 162, 60]], 0.2, ZONE)[1] == []
+
+
+def test_zone_entry_when_bottom_center_crosses_into_zone():
+    tracker = IouTracker(min_hits=2)
+
+    x = 60.0
+    step(tracker, [[x, 20, x + 20, 60]], 0.0, ZONE)
+    track_ids, events = step(tracker, [[x + 10, 20, x + 30, 60]], 0.1, ZONE)
+    track_id = track_ids[0]
+    assert events == [(TRACK_START, track_id)]
+
+    entries = []
+    for frame in range(2, 8):
+        x = 60.0 + 10 * frame
+        _, events = step(tracker, [[x, 20, x + 20, 60]], 0.1 * frame, ZONE)
+        entries += [(x, event) for event in events]
+
+    # Bottom center x + 10 reaches the zone at x = 90
+    assert entries == [(90.0, (ZONE_ENTRY, track_id))]
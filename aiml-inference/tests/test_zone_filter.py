@@ -0,0 +1,56 @@
+import cv2
+import numpy as np
+
+from postprocess.zone_filter import ZoneFilter
+
+WIDTH, HEIGHT = 96, 64
+# Concave polygon: a U open to the top
+POLYGON = [(10, 10), (30, 10), (30, 40), (60, 40), (60, 10), (80, 10),
+           (80, 55), (10, 55)]
+
+
+def any_point_in_polygon(box, polygon, grow: int = 0) -> bool:
+    """
+    Whether any integer point of the box, grown by ``grow`` pixels, is inside
+    or on the polygon.
+    """
+    contour = np.asarray(polygon, dtype=np.float32).reshape(-1, 1, 2)
+    x1, y1, x2, y2 = box
+    return any(cv2.pointPolygonTest(contour, (float(x), float(y)), False) >= 0
+               for x in range(x1 - grow, x2 + grow + 1)
+               for y in range(y1 - grow, y2 + grow + 1))
+
+
+def random_boxes(count: int, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    xy = rng.integers(0, [WIDTH - 1, HEIGHT - 1], (count, 2))
+    wh = rng.integers(0, 16, (count, 2))
+    return np.concatenate([xy, np.minimum(xy + wh, [WIDTH - 1, HEIGHT - 1])], axis=1)
+
+
+def test_boxes_in_zone_matches_point_in_polygon():
+    zone_filter = ZoneFilter(WIDTH, HEIGHT)
+    zone_filter.set_polygon(POLYGON)
+    boxes = random_boxes(500)
+
+    kept = zone_filter.boxes_in_zone(boxes)
+
+    for box, keep in zip(boxes.tolist(), kept.tolist()):
+        if any_point_in_polygon(box, POLYGON):
+            assert keep, box
+        elif not any_point_in_polygon(box, POLYGON, grow=1):
+            assert not keep, box
+    # Both outcomes are exercised, including boxes inside the U's gap
+    assert kept.any() and not kept.all()
+    assert not zone_filter.boxes_in_zone(np.array([[35, 5, 55, 30]]))[0]
+
+
+def test_boxes_in_zone_without_polygon_keeps_all():
+    zone_filter = ZoneFilter(WIDTH, HEIGHT)
+    boxes = random_boxes(10)
+    assert zone_filter.boxes_in_zone(boxes).all()
+
+    zone_filter.set_polygon(POLYGON)
+    zone_filter.set_polygon([(0, 0), (10, 10)])  # Fewer than 3 points: none
+    assert not zone_filter.enabled
+    assert zone_filter.boxes_in_zone(boxes).all()
@@ -0,0 +1,179 @@
+from queue import Empty, Queue
+from typing import Optional
+
+import numpy as np
+import torch
+
+from .preprocess import normalize_batch
+
+
+class BatchSlot:
+    """
+    One preallocated batch: host buffers, device buffers and CUDA sync state.
+
+    Attributes:
+        index (int): Position of the slot in the ring.
+        staging (np.ndarray): uint8 (N, H, W, 3) buffer frames are stacked into.
+        pinned (torch.Tensor): Host tensor copied to the device.
+        device_raw (Optional[torch.Tensor]): uint8 device copy of ``pinned``
+            when normalizing on a CUDA device.
+        batch (torch.Tensor): Normalized (N, 3, H, W) batch handed to the model.
+        stream (Optional[torch.cuda.Stream]): Reused copy stream of the slot.
+        ready_event (Optional[torch.cuda.Event]): Recorded once ``batch`` is filled.
+        free_event (Optional[torch.cuda.Event]): Recorded once the consumer
+            is done with ``batch``.
+        size (int): Number of valid frames in the slot.
+        stream_ids (list): Source stream id of each valid frame.
+        capture_times (list): ``time.monotonic()`` capture timestamps of the
+            valid frames.
+        rois (list): ROI each valid frame was cropped to, None for none.
+        sources (list): Decoded frame of each ROI-cropped frame, None for
+            uncropped frames.
+    """
+
+    def __init__(self, index: int, batch_size: int, height: int, width: int,
+                 device: str, device_normalize: bool):
+        self.index = index
+        self.size = 0
+        self.stream_ids = []
+        self.capture_times = []
+        self.rois = []
+        self.sources = []
+        self.device_raw = None
+        self.stream = None
+        self.ready_event = None
+        self.free_event = None
+
+        use_cuda = torch.device(device).type == 'cuda'
+
+        if device_normalize:
+            # uint8 HWC pinned memory, frames are stacked straight into it
+            self.pinned = torch.zeros(
+                (batch_size, height, width, 3), dtype=torch.uint8)
+        else:
+            self.pinned = torch.zeros(
+                (batch_size, 3, height, width), dtype=torch.float16)
+        if torch.cuda.is_available():
+            self.pinned = self.pinned.pin_memory()
+
+        if device_normalize:
+            self.staging = self.pinned.numpy()
+        else:
+            self.staging = np.empty(
+                (batch_size, height, width, 3), dtype=np.uint8)
+
+        if use_cuda:
+            if device_normalize:
+                self.device_raw = torch.zeros_like(self.pinned, device=device)
+            self.batch = torch.zeros(
+                (batch_size, 3, height, width), dtype=torch.float16,
+                device=device)
+            self.stream = torch.cuda.Stream(device=device)
+            self.ready_event = torch.cuda.Event()
+            self.free_event = torch.cuda.Event()
+        elif device_normalize:
+            self.batch = torch.zeros(
+                (batch_size, 3, height, width), dtype=torch.float16)
+        else:
+            self.batch = self.pinned
+
+    def wait_ready(self):
+        """
+        Make the consumer's current stream wait until the batch is filled.
+        """
+        if self.ready_event is not None:
+            torch.cuda.current_stream(self.batch.device).wait_event(
+                self.ready_event)
+
+
+class BatchRing:
+    """
+    Fixed ring of preallocated batch slots shared by producer and consumer.
+
+    Ownership of a slot is passed explicitly: the producer ``acquire``s a
+    free slot, fills it and ``submit``s it, the consumer hands it back with
+    ``release`` once it is done. No memory is allocated per batch, copy
+    streams are reused and CUDA events mark when a slot is filled or free,
+    so copying the next batch overlaps inference on the current one.
+    """
+
+    def __init__(self, size: int, batch_size: int, height: int, width: int,
+                 device: str, device_normalize: bool):
+        """
+        Initialize the BatchRing and preallocate all slots.
+
+        Args:
+            size (int): Number of slots in the ring (at least 2).
+            batch_size (int): Number of frames per batch.
+            height (int): Frame height.
+            width (int): Frame width.
+            device (str): Device the batches are handed out on.
+            device_normalize (bool): Keep host buffers uint8 HWC and
+                normalize on the device.
+        """
+        self.device_normalize = device_normalize
+        self.slots = [
+            BatchSlot(i, batch_size, height, width, device, device_normalize)
+            for i in range(max(2, size))
+        ]
+
+        self.free_slots = Queue()
+        for slot in self.slots:
+            self.free_slots.put(slot.index)
+
+    def acquire(self, timeout: Optional[float] = None) -> Optional[BatchSlot]:
+        """
+        Take ownership of a free slot for filling.
+
+        Args:
+            timeout (Optional[float]): Timeout in seconds.
+
+        Returns:
+            Optional[BatchSlot]: Free slot or None if timeout occurs.
+        """
+        try:
+            slot = self.slots[self.free_slots.get(timeout=timeout)]
+        except Empty:
+            return None
+
+        # The previous copy out of the host buffers must be done before reuse
+        if slot.ready_event is not None:
+            slot.ready_event.synchronize()
+        return slot
+
+    def submit(self, slot: BatchSlot, size: int):
+        """
+        Transfer (and normalize) the filled host buffers of a slot.
+
+        Args:
+            slot (BatchSlot): Slot previously returned by ``acquire``.
+            size (int): Number of valid frames in the slot.
+        """
+        slot.size = size
+
+        if slot.stream is not None:
+            with torch.cuda.stream(slot.stream):
+                # Do not overwrite device buffers the consumer still reads
+                slot.stream.wait_event(slot.free_event)
+                if self.device_normalize:
+                    slot.device_raw[:size].copy_(
+                        slot.pinned[:size], non_blocking=True)
+                    normalize_batch(slot.device_raw[:size], slot.batch[:size])
+                else:
+                    slot.batch[:size].copy_(
+                        slot.pinned[:size], non_blocking=True)
+                slot.ready_event.record(slot.stream)
+        elif self.device_normalize:
+            # Equivalent torch path on the CPU
+            normalize_batch(slot.pinned[:size], slot.batch[:size])
+
+    def release(self, slot: BatchSlot):
+        """
+        Hand a consumed slot back to the producer.
+
+        Args:
+            slot (BatchSlot): Slot whose batch is no longer used.
+        """
+        if slot.free_event is not None:
+            slot.free_event.record(torch.cuda.current_stream(slot.batch.device))
+        self.free_slots.put(slot.index)
@@ -0,0 +1,102 @@
+from threading import Lock
+from typing import Sequence
+
+
+class BatchStats:
+    """
+    Achieved batch fill ratio, queueing delay, frame age and dropped frames
+    since the last report.
+
+    Queueing delay is the time from frame capture until its batch is
+    submitted to the device, frame age the time from capture until the batch
+    is handed to inference.
+    """
+
+    def __init__(self, batch_size: int):
+        """
+        Initialize the BatchStats.
+
+        Args:
+            batch_size (int): Nominal number of frames per batch.
+        """
+        self.batch_size = batch_size
+        self._lock = Lock()
+        self._reset()
+
+    def _reset(self):
+        self._batches = 0
+        self._frames = 0
+        self._partial_batches = 0
+        self._delay_sum = 0.0
+        self._delay_max = 0.0
+        self._aged_frames = 0
+        self._age_sum = 0.0
+        self._age_max = 0.0
+        self._dropped_frames = 0
+
+    def record(self, capture_times: Sequence[float], submit_time: float):
+        """
+        Record one submitted batch.
+
+        Args:
+            capture_times (Sequence[float]): ``time.monotonic()`` capture
+                timestamps of the frames in the batch.
+            submit_time (float): ``time.monotonic()`` of the submission.
+        """
+        delays = [submit_time - t for t in capture_times]
+
+        with self._lock:
+            self._batches += 1
+            self._frames += len(delays)
+            if len(delays) < self.batch_size:
+                self._partial_batches += 1
+            self._delay_sum += sum(delays)
+            self._delay_max = max([self._delay_max] + delays)
+
+    def record_frame_ages(self, capture_times: Sequence[float], now: float):
+        """
+        Record the age of the frames of a batch handed to inference.
+
+        Args:
+            capture_times (Sequence[float]): ``time.monotonic()`` capture
+                timestamps of the frames in the batch.
+            now (float): ``time.monotonic()`` at hand-off.
+        """
+        ages = [now - t for t in capture_times]
+
+        with self._lock:
+            self._aged_frames += len(ages)
+            self._age_sum += sum(ages)
+            self._age_max = max([self._age_max] + ages)
+
+    def record_dropped(self, count: int = 1):
+        """
+        Record frames dropped before they reached a batch.
+        """
+        with self._lock:
+            self._dropped_frames += count
+
+    def report(self) -> dict:
+        """
+        Return the statistics gathered since the last report and reset them.
+
+        Returns:
+            dict: ``batches``, ``partial_batches``, ``fill_ratio``,
+            ``queue_delay_avg_ms`` / ``queue_delay_max_ms``,
+            ``frame_age_avg_ms`` / ``frame_age_max_ms`` and ``dropped_frames``.
+        """
+        with self._lock:
+            frames = max(self._frames, 1)
+            stats = {
+                "batches": self._batches,
+                "partial_batches": self._partial_batches,
+                "fill_ratio": self._frames / max(self._batches * self.batch_size, 1),
+                "queue_delay_avg_ms": self._delay_sum / frames * 1e3,
+                "queue_delay_max_ms": self._delay_max * 1e3,
+                "frame_age_avg_ms": self._age_sum / max(self._aged_frames, 1) * 1e3,
+                "frame_age_max_ms": self._age_max * 1e3,
+                "dropped_frames": self._dropped_frames,
+            }
+            self._reset()
+
+        return stats
@@ -0,0 +1,199 @@
+import sys
+from pathlib import Path
+from typing import Optional, Tuple
+
+import cv2
+import numpy as np
+
+CAPTURE_BACKENDS = ('opencv', 'pyav', 'gstreamer')
+
+# Decode, scale in YUV before the BGR conversion, hand the newest frame to
+# appsink. On Jetson, replace the decode/scale elements with hardware ones,
+# e.g. "uridecodebin uri={uri} ! nvvidconv ! video/x-raw,format=BGRx,
+# width={width},height={height} ! videoconvert ! video/x-raw,format=BGR ! ..."
+GST_PIPELINE = (
+    "uridecodebin uri={uri} ! videoscale ! "
+    "video/x-raw,width={width},height={height} ! videoconvert ! "
+    "video/x-raw,format=BGR ! appsink drop=true max-buffers=2 sync=false"
+)
+
+
+class PyAVCapture:
+    """
+    FFmpeg capture through PyAV, scaling in the frame conversion.
+
+    Decoded frames are converted to BGR at the processing size in a single
+    libswscale pass, so no full-resolution BGR frame is ever produced and
+    no resize is left to Python. With ``keyframes_only`` the decoder skips
+    every non-key frame (e.g. one frame per GOP for low frame rates).
+    Follows the ``cv2.VideoCapture`` read/grab/retrieve/isOpened/get/release
+    interface.
+    """
+
+    def __init__(
+        self,
+        source: str,
+        width: Optional[int] = None,
+        height: Optional[int] = None,
+        keyframes_only: bool = False,
+        timeout: float = 10.0
+    ):
+        """
+        Initialize the PyAVCapture and open the source.
+
+        Args:
+            source (str): RTSP URL or video file.
+            width (Optional[int]): Width frames are scaled to, None for the
+                source width.
+            height (Optional[int]): Height frames are scaled to, None for the
+                source height.
+            keyframes_only (bool): Only decode key frames.
+            timeout (float): Seconds to wait for the source to open or for data.
+        """
+        import av  # Optional dependency, only needed for this backend
+
+        self.width = width
+        self.height = height
+        self.container = None
+        self._frame = None
+
+        options = {}
+        if source.startswith('rtsp://'):
+            options = {'rtsp_transport': 'tcp', 'fflags': 'nobuffer'}
+        try:
+            self.container = av.open(source, options=options, timeout=timeout)
+        except (av.FFmpegError, OSError) as e:
+            print(f"[ERR]: Failed to open {source} with PyAV: {e}", file=sys.stderr)
+            return
+
+        self.stream = self.container.streams.video[0]
+        self.stream.thread_type = 'AUTO'
+        if keyframes_only:
+            self.stream.codec_context.skip_frame = 'NONKEY'
+        self._frames = self.container.decode(self.stream)
+        self._errors = av.FFmpegError
+
+    def isOpened(self) -> bool:
+        return self.container is not None
+
+    def get(self, prop: int) -> float:
+        if self.container is None:
+            return 0.0
+        if prop == cv2.CAP_PROP_FPS:
+            return float(self.stream.average_rate or 0.0)
+        if prop == cv2.CAP_PROP_FRAME_WIDTH:
+            return float(self.width or self.stream.codec_context.width)
+        if prop == cv2.CAP_PROP_FRAME_HEIGHT:
+            return float(self.height or self.stream.codec_context.height)
+        if prop == cv2.CAP_PROP_FRAME_COUNT:
+            return float(self.stream.frames)
+        return 0.0
+
+    def grab(self) -> bool:
+        """
+        Decode the next frame without converting it.
+        """
+        if self.container is None:
+            return False
+        try:
+            self._frame = next(self._frames)
+        except StopIteration:
+            self._frame = None
+        except self._errors as e:
+            print(f"[ERR]: PyAV decode failed: {e}", file=sys.stderr)
+            self._frame = None
+        return self._frame is not None
+
+    def retrieve(self) -> Tuple[bool, Optional[np.ndarray]]:
+        """
+        Convert the grabbed frame to BGR at the processing size.
+        """
+        if self._frame is None:
+            return False, None
+        frame = self._frame.to_ndarray(width=self.width, height=self.height,
+                                       format='bgr24')
+        return True, frame
+
+    def read(self) -> Tuple[bool, Optional[np.ndarray]]:
+        if not self.grab():
+            return False, None
+        return self.retrieve()
+
+    def release(self):
+        if self.container is not None:
+            self.container.close()
+            self.container = None
+
+
+def gstreamer_pipeline(source: str, width: int, height: int,
+                       template: str = GST_PIPELINE) -> str:
+    """
+    GStreamer pipeline decoding ``source`` to BGR frames of width x height.
+
+    Args:
+        source (str): URI (e.g. RTSP URL) or video file path.
+        width (int): Output width.
+        height (int): Output height.
+        template (str): Pipeline with ``{uri}``, ``{width}`` and
+            ``{height}`` placeholders.
+
+    Returns:
+        str: Pipeline for ``cv2.VideoCapture(..., cv2.CAP_GSTREAMER)``.
+    """
+    uri = source if '://' in source else Path(source).absolute().as_uri()
+    return template.format(uri=uri, width=width, height=height)
+
+
+def open_capture(
+    source: str,
+    backend: str = 'opencv',
+    width: Optional[int] = None,
+    height: Optional[int] = None,
+    keyframes_only: bool = False,
+    gst_pipeline: str = GST_PIPELINE
+):
+    """
+    Open a video source with a capture backend.
+
+    Args:
+        source (str): RTSP URL or video file.
+        backend (str): One of ``CAPTURE_BACKENDS``: ``opencv`` decodes at
+            the source resolution (frames are resized afterwards), ``pyav``
+            and ``gstreamer`` hand back frames already scaled to
+            width x height.
+        width (Optional[int]): Frame width to scale to, None keeps the
+            source resolution (e.g. for ROI cropping).
+        height (Optional[int]): Frame height to scale to.
+        keyframes_only (bool): Only decode key frames (``pyav`` only).
+        gst_pipeline (str): Pipeline template of the ``gstreamer`` backend,
+            see ``gstreamer_pipeline``.
+
+    Returns:
+        Capture with the ``cv2.VideoCapture`` read/grab/isOpened/get/release
+        interface; check ``isOpened``.
+    """
+    if backend not in CAPTURE_BACKENDS:
+        raise ValueError(f"Unknown capture backend '{backend}', "
+                         f"expected one of {', '.join(CAPTURE_BACKENDS)}")
+    if keyframes_only and backend != 'pyav':
+        print(f"[ERR]: Key frame only decoding is not supported by the "
+              f"{backend} backend, decoding every frame", file=sys.stderr)
+
+    if backend == 'pyav':
+        return PyAVCapture(source, width=width, height=height,
+                           keyframes_only=keyframes_only)
+
+    if backend == 'gstreamer':
+        if width is None or height is None:
+            return cv2.VideoCapture(source, cv2.CAP_GSTREAMER)
+        return cv2.VideoCapture(
+            gstreamer_pipeline(source, width, height, gst_pipeline),
+            cv2.CAP_GSTREAMER)
+
+    cap = cv2.VideoCapture(source)
+    if width is not None and height is not None:
+        # Only honoured by some local cameras, RTSP streams ignore it
+        cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+    cap.set(cv2.CAP_PROP_BUFFERSIZE, 3)
+    return cap
@@ -0,0 +1,145 @@
+import time
+from threading import Lock
+from typing import Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+
+class MotionGate:
+    """
+    Cheap pre-inference gate that skips frames without significant change.
+
+    Each frame is reduced to a small blurred grayscale thumbnail and compared
+    with the thumbnail of the last frame of the same stream that went to
+    inference. The frame is inferred if the fraction of changed pixels
+    (optionally only inside the detection polygon) exceeds ``min_changed``,
+    or if ``force_interval`` seconds passed since the stream's last inference,
+    so slow changes are still caught.
+    """
+
+    def __init__(
+        self,
+        frame_size: Tuple[int, int],
+        thumb_size: Tuple[int, int] = (80, 80),
+        pixel_threshold: int = 25,
+        min_changed: float = 0.01,
+        force_interval: float = 5.0
+    ):
+        """
+        Initialize the MotionGate.
+
+        Args:
+            frame_size (Tuple[int, int]): (width, height) of processed frames.
+            thumb_size (Tuple[int, int]): (width, height) frames are compared at.
+            pixel_threshold (int): Gray level difference a pixel counts as changed.
+            min_changed (float): Fraction of changed pixels that triggers inference.
+            force_interval (float): Seconds after which a stream is inferred anyway.
+        """
+        self.frame_size = frame_size
+        self.thumb_size = thumb_size
+        self.pixel_threshold = pixel_threshold
+        self.min_changed = min_changed
+        self.force_interval = force_interval
+
+        self._lock = Lock()
+        self._mask: Optional[np.ndarray] = None
+        self._polygon: List[Tuple[int, int]] = []
+        self._references: Dict[int, Tuple[float, np.ndarray]] = {}
+        self._reset()
+
+    def _reset(self):
+        self._frames = 0
+        self._skipped = 0
+        self._forced = 0
+
+    def thumbnail(self, frame: np.ndarray) -> np.ndarray:
+        """
+        Downscaled, blurred grayscale version of a frame. Thread-safe, meant
+        to run on the preprocessing workers.
+        """
+        small = cv2.resize(frame, self.thumb_size, interpolation=cv2.INTER_AREA)
+        gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        return cv2.GaussianBlur(gray, (5, 5), 0)
+
+    def set_region(self, polygon: List[Tuple[int, int]]):
+        """
+        Limit change detection to a polygon in processed-frame coordinates.
+
+        Args:
+            polygon (List[Tuple[int, int]]): Polygon points, empty for the
+                whole frame.
+        """
+        if polygon == self._polygon:
+            return
+
+        mask = None
+        if len(polygon) >= 3:
+            scale = np.array([self.thumb_size[0] / self.frame_size[0],
+                              self.thumb_size[1] / self.frame_size[1]])
+            points = np.round(np.array(polygon) * scale).astype(np.int32)
+            mask = np.zeros((self.thumb_size[1], self.thumb_size[0]), np.uint8)
+            cv2.fillPoly(mask, [points.reshape((-1, 1, 2))], 1)
+            mask = mask.astype(bool)
+
+        with self._lock:
+            self._polygon = list(polygon)
+            self._mask = mask
+
+    def should_infer(self, stream_id: int, thumb: np.ndarray,
+                     now: Optional[float] = None) -> bool:
+        """
+        Decide whether a frame goes to inference and update the reference.
+
+        Args:
+            stream_id (int): Stream the frame comes from.
+            thumb (np.ndarray): Output of ``thumbnail`` for the frame.
+            now (Optional[float]): ``time.monotonic()`` of the frame.
+
+        Returns:
+            bool: True if the frame should be inferred.
+        """
+        now = time.monotonic() if now is None else now
+
+        with self._lock:
+            self._frames += 1
+            reference = self._references.get(stream_id)
+
+            if reference is None:
+                infer = True
+            elif now - reference[0] >= self.force_interval:
+                infer = True
+                self._forced += 1
+            else:
+                changed = cv2.absdiff(thumb, reference[1]) > self.pixel_threshold
+                if self._mask is not None:
+                    changed_ratio = changed[self._mask].mean() if self._mask.any() else 0.0
+                else:
+                    changed_ratio = changed.mean()
+                infer = changed_ratio >= self.min_changed
+
+            if infer:
+                self._references[stream_id] = (now, thumb)
+            else:
+                self._skipped += 1
+
+        return infer
+
+    def stats(self) -> dict:
+        """
+        Report gate statistics gathered since the last call.
+
+        Returns:
+            dict: ``gated_frames``, ``skipped_frames``, ``forced_frames`` and
+            ``skip_ratio``.
+        """
+        with self._lock:
+            stats = {
+                "gated_frames": self._frames,
+                "skipped_frames": self._skipped,
+                "forced_frames": self._forced,
+                "skip_ratio": self._skipped / max(self._frames, 1),
+            }
+            self._reset()
+
+        return stats
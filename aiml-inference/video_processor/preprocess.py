@@ -0,0 +1,84 @@
+from typing import Sequence
+
+import numpy as np
+import torch
+
+
+def preprocess_frame(frame: np.ndarray) -> np.ndarray:
+    """
+    Preprocess a single frame (per-frame path).
+
+    Args:
+        frame (np.ndarray): Input frame, uint8 HWC.
+
+    Returns:
+        np.ndarray: Preprocessed frame, float16 CHW in [0, 1].
+    """
+    # If color conversion is not needed, skip it
+    # frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+    frame = np.ascontiguousarray(frame)
+    frame = frame.transpose(2, 0, 1)  # HWC to CHW
+    frame = frame.astype(np.float16) / 255.0
+    return frame
+
+
+def stack_batch(frames: Sequence[np.ndarray], staging: np.ndarray) -> int:
+    """
+    Stack uint8 frames into a preallocated HWC batch buffer.
+
+    Args:
+        frames (Sequence[np.ndarray]): Input frames, uint8 HWC, same shape.
+        staging (np.ndarray): Preallocated uint8 buffer of shape (N, H, W, 3).
+
+    Returns:
+        int: Number of frames written to the front of ``staging``.
+    """
+    n = len(frames)
+    if n > 0:
+        np.stack(frames, out=staging[:n])
+    return n
+
+
+def normalize_batch(raw: torch.Tensor, out: torch.Tensor) -> torch.Tensor:
+    """
+    Convert a uint8 NHWC batch to a normalized NCHW batch as tensor ops.
+
+    Runs on whatever device the tensors live on, so the same code path is
+    used for on-device normalization and for the CPU fallback.
+
+    Args:
+        raw (torch.Tensor): uint8 tensor of shape (N, H, W, 3).
+        out (torch.Tensor): Float tensor of shape (N, 3, H, W), same device.
+
+    Returns:
+        torch.Tensor: ``out``, scaled to [0, 1].
+    """
+    out.copy_(raw.permute(0, 3, 1, 2))  # HWC to CHW and cast in one copy
+    out.mul_(1.0 / 255.0)
+    return out
+
+
+def preprocess_batch(
+    frames: Sequence[np.ndarray],
+    staging: np.ndarray,
+    out: torch.Tensor
+) -> int:
+    """
+    Preprocess a whole batch of frames in a single vectorized pass.
+
+    The uint8 frames are stacked into the preallocated staging buffer, then
+    the HWC to CHW conversion, the cast and the normalization are written
+    straight into the output tensor, without per-frame temporaries.
+
+    Args:
+        frames (Sequence[np.ndarray]): Input frames, uint8 HWC, same shape.
+        staging (np.ndarray): Preallocated uint8 buffer of shape (N, H, W, 3).
+        out (torch.Tensor): Preallocated float tensor of shape (N, 3, H, W).
+
+    Returns:
+        int: Number of frames written to the front of ``out``.
+    """
+    n = stack_batch(frames, staging)
+    if n > 0:
+        normalize_batch(torch.from_numpy(staging[:n]), out[:n])
+    return n
@@ -0,0 +1,736 @@
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from queue import Empty, Full, Queue
+from threading import Event, Thread
+from typing import List, Optional, Sequence, Tuple, Union
+
+import cv2
+import numpy as np
+import torch
+
+from .batch_ring import BatchRing, BatchSlot
+from .batching import BatchStats
+from .capture import open_capture
+from .config import (ADAPTIVE_STRIDE, BATCH_RING_SIZE, BATCH_SIZE,
+                     CAPTURE_BACKEND, DECODE_PROCESSES, DEVICE,
+                     DEVICE_NORMALIZE, FRAME_HEIGHT, FRAME_WIDTH,
+                     GST_PIPELINE, KEYFRAMES_ONLY, LIVE_MODE, LIVE_QUEUE_SIZE,
+                     MAX_BATCH_LATENCY, MAX_STRIDE, MOTION_FORCE_INTERVAL,
+                     MOTION_GATE, MOTION_MIN_CHANGED, MOTION_PIXEL_THRESHOLD,
+                     NUM_WORKERS, QUEUE_SIZE, ROI_MARGIN, ROI_MODE,
+                     SHM_RING_SIZE, STRIDE_INTERVAL, TARGET_LATENCY,
+                     VIDEO_SOURCES)
+from .motion_gate import MotionGate
+from .preprocess import preprocess_batch, stack_batch
+from .roi import Roi, crop_source, polygon_to_roi, roi_from_polygon
+from .shm_capture import END_OF_STREAM as SHM_END_OF_STREAM
+from .shm_capture import SharedMemoryCapture
+from .stage_timer import StageTimer
+from .stride_controller import StrideController
+
+END_OF_STREAM = None  # Sentinel passed down the queues when the source ends
+STOP_CHECK_INTERVAL = 0.1  # Seconds a blocked hand-off waits between stop checks
+
+
+class FastVideoProcessor:
+    """
+    High-performance video capture and processing for AI inference.
+
+    Features:
+        - Multiple video sources filling shared batches
+        - Multi-threaded capture and preprocessing with blocking hand-off
+        - Efficient GPU memory management
+        - Batch processing, with partial batches flushed on a latency deadline
+        - Automatic frame dropping if AI can't keep up (live mode)
+        - Motion gate skipping frames without significant change
+        - ROI mode cropping frames to the detection polygon's region
+        - Optional decoding in worker processes through shared memory
+        - Per-stage latencies (decode, resize, preprocess, h2d)
+        - Adaptive capture stride holding a target latency
+        - Pluggable capture backend scaling frames while decoding
+    """
+
+    def __init__(
+        self,
+        sources: Union[str, Sequence[str]] = VIDEO_SOURCES,
+        batch_size: int = BATCH_SIZE,
+        width: int = FRAME_WIDTH,
+        height: int = FRAME_HEIGHT,
+        num_workers: int = NUM_WORKERS,
+        queue_size: int = QUEUE_SIZE,
+        device: str = DEVICE,
+        device_normalize: bool = DEVICE_NORMALIZE,
+        ring_size: int = BATCH_RING_SIZE,
+        max_batch_latency: float = MAX_BATCH_LATENCY,
+        live: bool = LIVE_MODE,
+        live_queue_size: int = LIVE_QUEUE_SIZE,
+        motion_gate: bool = MOTION_GATE,
+        roi_mode: bool = ROI_MODE,
+        roi_margin: int = ROI_MARGIN,
+        decode_processes: int = DECODE_PROCESSES,
+        shm_ring_size: int = SHM_RING_SIZE,
+        adaptive_stride: bool = ADAPTIVE_STRIDE,
+        target_latency: float = TARGET_LATENCY,
+        max_stride: int = MAX_STRIDE,
+        stride_interval: float = STRIDE_INTERVAL,
+        capture_backend: str = CAPTURE_BACKEND,
+        keyframes_only: bool = KEYFRAMES_ONLY,
+        gst_pipeline: str = GST_PIPELINE
+    ):
+        """
+        Initialize the FastVideoProcessor.
+
+        Args:
+            sources (Union[str, Sequence[str]]): Video source identifiers,
+                RTSP URLs or video files, or already opened captures with
+                the ``cv2.VideoCapture`` read/grab/isOpened/release
+                interface.
+                Frames from all sources fill shared batches; a source's
+                index in the list is its stream id.
+            batch_size (int): Number of frames per batch.
+            width (int): Frame width.
+            height (int): Frame height.
+            num_workers (int): Number of preprocessing worker threads.
+            queue_size (int): Maximum size of the frame queue.
+            device (str): Device to use for processing.
+            device_normalize (bool): Transfer uint8 HWC frames and run the
+                transpose/scale/cast on the device instead of on the CPU.
+            ring_size (int): Number of preallocated batch slots.
+            max_batch_latency (float): Maximum seconds the first frame of a
+                batch waits for the batch to fill before a partial batch is
+                flushed. 0 always waits for a full batch.
+            live (bool): Latest-frame-wins mode: when the frame queue is full
+                the oldest frame is dropped instead of blocking capture.
+            live_queue_size (int): Maximum size of the frame queue in live
+                mode, replaces ``queue_size``.
+            motion_gate (bool): Skip inference on frames without significant
+                change since the stream's last inferred frame.
+            roi_mode (bool): Crop frames to the bounding rectangle of the
+                detection region, see ``set_detection_region``, before resize.
+            roi_margin (int): Pixels added around the region's bounding
+                rectangle, in processed-frame coordinates.
+            decode_processes (int): Decode (and resize) the sources in this
+                many worker processes writing into a shared memory ring,
+                0 decodes in threads of this process.
+            shm_ring_size (int): Frame slots of the shared memory ring, 0
+                sizes it to the frames that can be in flight.
+            adaptive_stride (bool): Queue only every k-th frame of a stream,
+                k adjusted to the inference throughput, see
+                ``StrideController``.
+            target_latency (float): Frame age at hand-off to inference the
+                stride controller holds, in seconds.
+            max_stride (int): Largest stride of a stream.
+            stride_interval (float): Seconds between stride adjustments.
+            capture_backend (str): Backend opening source URLs and files,
+                see ``open_capture``. In ROI mode frames are decoded at
+                source resolution for cropping.
+            keyframes_only (bool): Only decode key frames (pyav backend).
+            gst_pipeline (str): Pipeline template of the gstreamer backend.
+        """
+        self.device = device
+        self.device_normalize = device_normalize
+        self.batch_size = batch_size
+        self.max_batch_latency = max_batch_latency
+        self.live = live
+        self.roi_mode = roi_mode
+        self.roi_margin = roi_margin
+        self.roi: Optional[Roi] = None
+        self._region = None
+        self.batch_stats = BatchStats(batch_size)
+        self.stage_timer = StageTimer()
+        self.stop_event = Event()
+        # Set once every source ended and every batch was handed out
+        self.finished = False
+
+        if isinstance(sources, str):
+            sources = [sources]
+        self.sources = list(sources)
+
+        # Initialize one video capture per source, unless decoding in
+        # worker processes
+        self.caps = []
+        self.capture: Optional[SharedMemoryCapture] = None
+        capture_size = (None, None) if roi_mode else (width, height)
+        for source in self.sources if decode_processes <= 0 else []:
+            if isinstance(source, str):
+                cap = open_capture(source, capture_backend, *capture_size,
+                                   keyframes_only=keyframes_only,
+                                   gst_pipeline=gst_pipeline)
+            else:
+                cap = source
+            self.caps.append(cap)
+
+            # Check if camera opened successfully
+            if not cap.isOpened():
+                self._release_captures()
+                raise IOError(f"Failed to open video source {source}")
+
+        self.width = width
+        self.height = height
+
+        self.motion_gate = None
+        if motion_gate:
+            self.motion_gate = MotionGate(
+                frame_size=(width, height),
+                pixel_threshold=MOTION_PIXEL_THRESHOLD,
+                min_changed=MOTION_MIN_CHANGED,
+                force_interval=MOTION_FORCE_INTERVAL
+            )
+
+        self.stride_controller = None
+        if adaptive_stride:
+            self.stride_controller = StrideController(
+                len(self.sources), target_latency=target_latency,
+                max_stride=max_stride, interval=stride_interval)
+
+        # Initialize queues
+        self.frame_queue = Queue(
+            maxsize=live_queue_size if live else queue_size)
+        self.batch_queue = Queue(maxsize=ring_size)
+
+        # Pre-allocate a ring of pinned/device batch slots
+        self.ring = BatchRing(
+            size=ring_size,
+            batch_size=batch_size,
+            height=self.height,
+            width=self.width,
+            device=device,
+            device_normalize=device_normalize
+        )
+        self.current_slot: Optional[BatchSlot] = None
+
+        if decode_processes > 0:
+            if not all(isinstance(source, str) for source in self.sources):
+                raise ValueError("Decode processes need source URLs or files")
+            self.capture = SharedMemoryCapture(
+                self.sources, width=width, height=height,
+                num_processes=decode_processes,
+                num_slots=shm_ring_size or
+                self.frame_queue.maxsize + batch_size + len(self.sources),
+                live=live, capture_backend=capture_backend,
+                capture_scaled=not roi_mode, keyframes_only=keyframes_only,
+                gst_pipeline=gst_pipeline)
+
+        # Start worker threads
+        if self.capture is not None:
+            self.capture_threads = [
+                Thread(target=self._receive_frames, daemon=True)]
+        else:
+            self.capture_threads = [
+                Thread(target=self._capture_frames, args=(stream_id,), daemon=True)
+                for stream_id in range(len(self.caps))
+            ]
+        self.batch_thread = Thread(target=self._prepare_batches, daemon=True)
+        self.executor = ThreadPoolExecutor(max_workers=num_workers)
+
+        self.start()
+
+    def start(self):
+        """
+        Start all worker threads for capturing and preparing batches.
+        """
+        for capture_thread in self.capture_threads:
+            capture_thread.start()
+        self.batch_thread.start()
+
+    @property
+    def stopped(self) -> bool:
+        """
+        Whether the processor has been asked to stop.
+        """
+        return self.stop_event.is_set()
+
+    def _put(self, queue: Queue, item) -> bool:
+        """
+        Block until ``item`` is put into ``queue`` or the processor stops.
+
+        Returns:
+            bool: True if the item was queued.
+        """
+        while not self.stop_event.is_set():
+            try:
+                queue.put(item, timeout=STOP_CHECK_INTERVAL)
+                return True
+            except Full:
+                pass
+        return False
+
+    def _get(self, queue: Queue, timeout: Optional[float] = None):
+        """
+        Block until an item is available, ``timeout`` expires or the
+        processor stops.
+
+        Raises:
+            Empty: If no item was available in time.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not self.stop_event.is_set():
+            wait = STOP_CHECK_INTERVAL
+            if deadline is not None:
+                wait = min(wait, deadline - time.monotonic())
+            try:
+                if wait <= 0:
+                    # Expired: still take an item that is already waiting
+                    return queue.get_nowait()
+                return queue.get(timeout=wait)
+            except Empty:
+                if wait <= 0:
+                    break
+        raise Empty
+
+    def _put_latest(self, item):
+        """
+        Queue a captured frame, dropping the oldest queued frame if full.
+
+        End-of-stream markers of other sources are never dropped, they are
+        queued again after the frame.
+        """
+        ended_streams = 0
+        while True:
+            try:
+                self.frame_queue.put_nowait(item)
+                break
+            except Full:
+                pass
+
+            try:
+                stale = self.frame_queue.get_nowait()
+            except Empty:
+                continue  # The batch thread took it meanwhile
+            if stale is END_OF_STREAM:
+                ended_streams += 1
+                continue
+            stale[-1].cancel()
+            self.batch_stats.record_dropped()
+            if self.stride_controller is not None:
+                self.stride_controller.record_dropped()
+
+        for _ in range(ended_streams):
+            self._put(self.frame_queue, END_OF_STREAM)
+
+    def _capture_frames(self, stream_id: int):
+        """
+        Continuously capture frames from one video source in a separate thread.
+
+        Decoded frames are preprocessed on the executor; their futures are
+        queued in capture order, so the bounded frame queue also bounds the
+        work in flight. In live mode capture never blocks: the oldest queued
+        frame is dropped to make room for the newest one. Frames skipped by
+        the stride are only grabbed, not retrieved.
+
+        Args:
+            stream_id (int): Index of the source in ``sources``.
+        """
+        cap = self.caps[stream_id]
+
+        while not self.stop_event.is_set():
+            if self.stride_controller is not None and \
+                    not self.stride_controller.should_queue(stream_id):
+                start = time.perf_counter()
+                if not cap.grab():
+                    break
+                self.stage_timer.record('grab', time.perf_counter() - start)
+                continue
+
+            start = time.perf_counter()
+            ret, frame = cap.read()
+            if not ret:
+                break
+            self.stage_timer.record('decode', time.perf_counter() - start)
+
+            capture_time = time.monotonic()
+            future = self.executor.submit(self._preprocess_frame, frame)
+            item = (stream_id, capture_time, future)
+            if self.live:
+                self._put_latest(item)
+            elif not self._put(self.frame_queue, item):
+                return
+
+        # Signal the end of the stream to the batch thread
+        self._put(self.frame_queue, END_OF_STREAM)
+
+    def _receive_frames(self):
+        """
+        Queue the frames decoded by the worker processes, see
+        ``SharedMemoryCapture``.
+
+        Frames stay in their shared memory slot (zero-copy) until batched.
+        Only the motion gate thumbnail is computed on the executor. In live
+        mode frames are dropped by the decoders while every slot is in use;
+        their drop counts are passed on to the stride controller.
+        """
+        ended_streams = 0
+        while ended_streams < len(self.sources) and not self.stop_event.is_set():
+            self._record_worker_drops()
+            try:
+                stream_id, shm_slot, capture_time, roi, decode_time, resize_time = \
+                    self.capture.get(timeout=STOP_CHECK_INTERVAL)
+            except Empty:
+                continue
+
+            if shm_slot == SHM_END_OF_STREAM:
+                ended_streams += 1
+                self._put(self.frame_queue, END_OF_STREAM)
+                continue
+
+            self.stage_timer.record('decode', decode_time)
+            self.stage_timer.record('resize', resize_time)
+            if self.stride_controller is not None and \
+                    not self.stride_controller.should_queue(stream_id):
+                # Already decoded in the worker, skip everything after it
+                self.capture.release(shm_slot)
+                continue
+            if self.motion_gate is not None:
+                future = self.executor.submit(self._shm_frame, shm_slot, roi)
+            else:
+                future = Future()
+                future.set_result(self._shm_frame(shm_slot, roi))
+            if not self._put(self.frame_queue, (stream_id, capture_time, future)):
+                return
+
+    def _record_worker_drops(self):
+        """
+        Record the frames dropped by the decode worker processes since the
+        last call, also as overload of the stride controller.
+        """
+        for stream_id, count in enumerate(self.capture.dropped_frames().tolist()):
+            if count == 0:
+                continue
+            self.batch_stats.record_dropped(count)
+            if self.stride_controller is not None:
+                self.stride_controller.record_dropped(count, stream_id=stream_id)
+
+    def _shm_frame(
+        self, shm_slot: int, roi: Optional[Roi]
+    ) -> Tuple[np.ndarray, Optional[np.ndarray], Optional[Roi], Optional[np.ndarray], int]:
+        """
+        Views of a frame decoded into the shared memory ring, see
+        ``_preprocess_frame``.
+        """
+        frame = self.capture.frame(shm_slot)
+        thumb = None
+        if self.motion_gate is not None:
+            thumb = self.motion_gate.thumbnail(frame)
+        source = self.capture.full_frame(shm_slot) if roi is not None else None
+        return frame, thumb, roi, source, shm_slot
+
+    def _preprocess_frame(
+        self, frame: np.ndarray
+    ) -> Tuple[np.ndarray, Optional[np.ndarray], Optional[Roi], Optional[np.ndarray], None]:
+        """
+        Per-frame preprocessing run on the executor.
+
+        Args:
+            frame (np.ndarray): Decoded frame.
+
+        Returns:
+            Tuple[np.ndarray, Optional[np.ndarray], Optional[Roi], Optional[np.ndarray], None]:
+            Frame (or its ROI crop) resized to the processing size, its
+            motion gate thumbnail (None without gate), the ROI it was cropped
+            to, the decoded frame when cropped (None when not cropped) and
+            the shared memory slot (None, not decoded by a worker process).
+        """
+        roi = self.roi
+        with self.stage_timer.time('resize'):
+            source = frame
+            if roi is not None:
+                frame = crop_source(frame, roi, self.width, self.height)
+            else:
+                source = None
+            if frame.shape[:2] != (self.height, self.width):
+                # Not scaled by the capture backend
+                frame = cv2.resize(frame, (self.width, self.height))
+            thumb = None
+            if self.motion_gate is not None:
+                thumb = self.motion_gate.thumbnail(frame)
+        return frame, thumb, roi, source, None
+
+    def _prepare_batches(self):
+        """
+        Prepare batches of frames for AI processing.
+        """
+        ended_streams = 0
+        end_of_stream = False
+
+        while not end_of_stream and not self.stop_event.is_set():
+            batch_frames = []
+            stream_ids = []
+            capture_times = []
+            rois = []
+            sources = []
+            shm_slots = []
+
+            # Collect frames for the batch until it is full or its deadline
+            deadline = None
+            while len(batch_frames) < self.batch_size:
+                timeout = None
+                if deadline is not None:
+                    timeout = max(deadline - time.monotonic(), 0)
+                try:
+                    item = self._get(self.frame_queue, timeout=timeout)
+                except Empty:
+                    break  # Deadline expired (or stopping): flush
+
+                if item is END_OF_STREAM:
+                    ended_streams += 1
+                    end_of_stream = ended_streams == len(self.sources)
+                    if end_of_stream:
+                        break
+                    continue
+
+                stream_id, capture_time, future = item
+                frame, thumb, roi, source, shm_slot = future.result()
+
+                # Skip frames without significant change
+                if self.motion_gate is not None and not \
+                        self.motion_gate.should_infer(stream_id, thumb, capture_time):
+                    if shm_slot is not None:
+                        self.capture.release(shm_slot)
+                    continue
+
+                if deadline is None and self.max_batch_latency > 0:
+                    deadline = capture_time + self.max_batch_latency
+                batch_frames.append(frame)
+                stream_ids.append(stream_id)
+                capture_times.append(capture_time)
+                rois.append(roi)
+                sources.append(source)
+                shm_slots.append(shm_slot)
+
+            if batch_frames:
+                # Wait for the consumer to free a slot
+                slot = None
+                while slot is None and not self.stop_event.is_set():
+                    slot = self.ring.acquire(timeout=STOP_CHECK_INTERVAL)
+                if slot is None:
+                    return
+
+                with self.stage_timer.time('preprocess', len(batch_frames)):
+                    if self.device_normalize:
+                        # Stack raw uint8 frames straight into pinned memory
+                        n = stack_batch(batch_frames, slot.staging)
+                    else:
+                        # Preprocess the whole batch straight into pinned memory
+                        n = preprocess_batch(batch_frames, slot.staging, slot.pinned)
+
+                # Frames are in the batch, hand their shared memory slots back
+                for i, shm_slot in enumerate(shm_slots):
+                    if shm_slot is not None:
+                        if sources[i] is not None:
+                            sources[i] = sources[i].copy()
+                        self.capture.release(shm_slot)
+
+                # Transfer to the device on the slot's stream
+                slot.stream_ids = stream_ids
+                slot.capture_times = capture_times
+                slot.rois = rois
+                slot.sources = sources
+                with self.stage_timer.time('h2d', n):
+                    self.ring.submit(slot, n)
+                self.batch_stats.record(capture_times, time.monotonic())
+                self._put(self.batch_queue, slot)
+
+        if end_of_stream:
+            self._put(self.batch_queue, END_OF_STREAM)
+
+    def get_batch(self, timeout: float = 1.0) -> Optional[torch.Tensor]:
+        """
+        Retrieve the next batch of frames as a tensor on the specified device.
+
+        The returned tensor is a view into a ring slot owned by the caller
+        until the next call to ``get_batch`` or ``release_batch``.
+
+        Args:
+            timeout (float): Timeout in seconds.
+
+        Returns:
+            Optional[torch.Tensor]: Tensor of shape (batch_size, 3, height, width) or None if timeout occurs.
+        """
+        self.release_batch()
+        if self.finished:
+            return None
+
+        start = time.monotonic()
+        try:
+            slot = self.batch_queue.get(timeout=timeout)
+        except Empty:
+            return None
+
+        if slot is END_OF_STREAM:
+            self.finished = True
+            return None
+
+        slot.wait_ready()
+        now = time.monotonic()
+        self.batch_stats.record_frame_ages(slot.capture_times, now)
+        if self.stride_controller is not None:
+            self.stride_controller.record_wait(start, now)
+            self.stride_controller.record_batch(slot.capture_times, now)
+            self.stride_controller.update(
+                backlog=self.frame_queue.qsize()
+                + self.batch_queue.qsize() * self.batch_size, now=now)
+        self.current_slot = slot
+        return slot.batch[:slot.size]
+
+    @property
+    def batch_stream_ids(self) -> List[int]:
+        """
+        Stream id of each frame of the batch returned by ``get_batch``.
+        """
+        if self.current_slot is None:
+            return []
+        return self.current_slot.stream_ids
+
+    @property
+    def batch_capture_times(self) -> List[float]:
+        """
+        ``time.monotonic()`` capture timestamp of each frame of the batch
+        returned by ``get_batch``.
+        """
+        if self.current_slot is None:
+            return []
+        return self.current_slot.capture_times
+
+    @property
+    def batch_frames(self) -> np.ndarray:
+        """
+        uint8 (N, H, W, 3) resized frames of the batch returned by
+        ``get_batch``, valid until the slot is released.
+        """
+        if self.current_slot is None:
+            return np.empty((0, self.height, self.width, 3), dtype=np.uint8)
+        return self.current_slot.staging[:self.current_slot.size]
+
+    def batch_boxes_to_frame(self, boxes: np.ndarray,
+                             frames: np.ndarray) -> np.ndarray:
+        """
+        Map boxes detected on the batch to full-frame (processed-frame)
+        coordinates, undoing the ROI crop of their frame, vectorized over
+        the whole batch.
+
+        Args:
+            boxes (np.ndarray): (N, 4) xyxy boxes in model input coordinates.
+            frames (np.ndarray): (N,) index in the batch of each box's frame.
+
+        Returns:
+            np.ndarray: (N, 4) boxes in processed-frame coordinates.
+        """
+        rois = self.current_slot.rois
+        if not any(roi is not None for roi in rois):
+            return boxes
+
+        full = (0, 0, self.width, self.height)
+        regions = np.array([full if roi is None else roi for roi in rois],
+                           dtype=np.float32)
+        scale = (regions[:, 2:] - regions[:, :2]) / \
+            np.array([self.width, self.height], dtype=np.float32)
+        scale = np.tile(scale, 2)[frames]
+        offset = np.tile(regions[:, :2], 2)[frames]
+        return boxes * scale + offset
+
+    def batch_full_frame(self, index: int) -> np.ndarray:
+        """
+        Whole processed frame ``index`` of the batch, resized again from the
+        decoded frame if it was ROI-cropped.
+
+        Args:
+            index (int): Frame index in the batch.
+
+        Returns:
+            np.ndarray: uint8 (H, W, 3) frame owned by the caller.
+        """
+        source = self.current_slot.sources[index]
+        if source is None:
+            return self.current_slot.staging[index].copy()
+        return cv2.resize(source, (self.width, self.height))
+
+    def release_batch(self):
+        """
+        Hand the slot of the last batch back to the producer.
+        """
+        if self.current_slot is not None:
+            self.ring.release(self.current_slot)
+            self.current_slot = None
+
+    def stats(self) -> dict:
+        """
+        Report batching statistics gathered since the last call.
+
+        Returns:
+            dict: Batch fill ratio, queueing delay, frame age at inference
+            time and dropped frames, see ``BatchStats.report``, plus the
+            motion gate skip ratio, see ``MotionGate.stats``, and the
+            stride controller state, see ``StrideController.stats``.
+        """
+        if self.capture is not None:
+            self._record_worker_drops()
+        stats = self.batch_stats.report()
+        if self.motion_gate is not None:
+            stats.update(self.motion_gate.stats())
+        if self.stride_controller is not None:
+            stats.update(self.stride_controller.stats())
+        return stats
+
+    def stage_stats(self) -> dict:
+        """
+        Report per-stage latencies gathered since the last call, including
+        stages recorded by the consumer on ``stage_timer``.
+
+        Returns:
+            dict: See ``StageTimer.report``.
+        """
+        return self.stage_timer.report()
+
+    def set_motion_region(self, polygon: List[Tuple[int, int]]):
+        """
+        Limit the motion gate to the detection polygon.
+
+        Args:
+            polygon (List[Tuple[int, int]]): Polygon in processed-frame
+                coordinates, empty for the whole frame.
+        """
+        if self.motion_gate is not None:
+            self.motion_gate.set_region(polygon)
+
+    def set_detection_region(self, polygon: List[Tuple[int, int]]):
+        """
+        Set the detection polygon: in ROI mode frames are cropped to its
+        bounding rectangle, and the motion gate is limited to it.
+
+        Args:
+            polygon (List[Tuple[int, int]]): Polygon in processed-frame
+                coordinates, empty for the whole frame.
+        """
+        if polygon == self._region:
+            return
+        self._region = list(polygon)
+
+        if self.roi_mode:
+            self.roi = roi_from_polygon(polygon, self.width, self.height,
+                                        self.roi_margin)
+            if self.capture is not None:
+                self.capture.set_roi(self.roi)
+            # Thumbnails are taken from the crop
+            polygon = polygon_to_roi(polygon, self.roi, self.width, self.height)
+        self.set_motion_region(polygon)
+
+    def release(self):
+        """
+        Release all resources, including threads and video capture.
+        """
+        self.stop_event.set()
+        self.release_batch()
+        for capture_thread in self.capture_threads:
+            capture_thread.join()
+        self.batch_thread.join()
+        self.executor.shutdown(cancel_futures=True)
+        self._release_captures()
+        if self.capture is not None:
+            self.capture.close()
+
+    def _release_captures(self):
+        """
+        Release all video captures.
+        """
+        for cap in self.caps:
+            cap.release()
@@ -0,0 +1,96 @@
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+Roi = Tuple[int, int, int, int]  # x1, y1, x2, y2 in processed-frame coordinates
+
+
+def roi_from_polygon(
+    polygon: Sequence[Tuple[int, int]],
+    width: int,
+    height: int,
+    margin: int = 32
+) -> Optional[Roi]:
+    """
+    Bounding rectangle of a polygon plus a margin, grown to the aspect
+    ratio of the processed frame so the crop is not distorted by the resize.
+
+    Args:
+        polygon (Sequence[Tuple[int, int]]): Polygon in processed-frame
+            coordinates.
+        width (int): Processed frame width.
+        height (int): Processed frame height.
+        margin (int): Pixels added around the bounding rectangle.
+
+    Returns:
+        Optional[Roi]: Region of interest, None for the whole frame (no
+        usable polygon, or a region as large as the frame).
+    """
+    if len(polygon) < 3:
+        return None
+
+    points = np.asarray(polygon, dtype=np.float64)
+    x1, y1 = points.min(axis=0) - margin
+    x2, y2 = points.max(axis=0) + margin
+
+    # Grow the short side around the center to the frame aspect ratio
+    roi_width, roi_height = x2 - x1, y2 - y1
+    aspect = width / height
+    if roi_width / max(roi_height, 1) < aspect:
+        roi_width = roi_height * aspect
+    else:
+        roi_height = roi_width / aspect
+    roi_width, roi_height = min(roi_width, width), min(roi_height, height)
+
+    center_x, center_y = (x1 + x2) / 2, (y1 + y2) / 2
+    x1 = int(np.clip(round(center_x - roi_width / 2), 0, width - roi_width))
+    y1 = int(np.clip(round(center_y - roi_height / 2), 0, height - roi_height))
+    x2 = int(min(x1 + round(roi_width), width))
+    y2 = int(min(y1 + round(roi_height), height))
+
+    if x2 - x1 >= width and y2 - y1 >= height:
+        return None
+    return x1, y1, x2, y2
+
+
+def crop_source(frame: np.ndarray, roi: Roi, width: int, height: int) -> np.ndarray:
+    """
+    Crop a decoded frame to a region given in processed-frame coordinates.
+
+    Args:
+        frame (np.ndarray): Decoded frame of any resolution.
+        roi (Roi): Region in processed-frame coordinates.
+        width (int): Processed frame width.
+        height (int): Processed frame height.
+
+    Returns:
+        np.ndarray: View of the region in ``frame``.
+    """
+    source_height, source_width = frame.shape[:2]
+    scale_x, scale_y = source_width / width, source_height / height
+    x1, y1 = int(roi[0] * scale_x), int(roi[1] * scale_y)
+    x2 = max(int(round(roi[2] * scale_x)), x1 + 1)
+    y2 = max(int(round(roi[3] * scale_y)), y1 + 1)
+    return frame[y1:y2, x1:x2]
+
+
+def polygon_to_roi(polygon: Sequence[Tuple[int, int]], roi: Optional[Roi],
+                   width: int, height: int) -> List[Tuple[int, int]]:
+    """
+    Map a polygon from full-frame to resized ROI crop coordinates.
+
+    Args:
+        polygon (Sequence[Tuple[int, int]]): Polygon in processed-frame
+            coordinates.
+        roi (Optional[Roi]): Region of the crop, None for none.
+        width (int): Processed frame width.
+        height (int): Processed frame height.
+
+    Returns:
+        List[Tuple[int, int]]: Polygon in crop coordinates.
+    """
+    if roi is None or len(polygon) == 0:
+        return list(polygon)
+    x1, y1, x2, y2 = roi
+    return [(int(round((x - x1) * width / (x2 - x1))),
+             int(round((y - y1) * height / (y2 - y1)))) for x, y in polygon]
@@ -0,0 +1,272 @@
+import multiprocessing as mp
+import sys
+import time
+from multiprocessing import shared_memory
+from queue import Empty
+from threading import Lock, Thread
+from typing import Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+from .capture import GST_PIPELINE, open_capture
+from .roi import Roi, crop_source
+
+STOP_CHECK_INTERVAL = 0.1
+END_OF_STREAM = -1  # Slot index sent when a stream ends
+
+# Fork: spawn/forkserver would re-import the __main__ module (main.py loads
+# the model at import). Workers only touch cv2, numpy and the queues.
+_context = mp.get_context('fork')
+
+
+class SharedFrameRing:
+    """
+    Fixed ring of frame slots in one ``multiprocessing.shared_memory`` block.
+
+    A header holds the number of frames each stream's decoder dropped so
+    far (written by that decoder only). Each slot holds the frame handed to
+    batching (resized, ROI-cropped if set) and the whole resized frame,
+    only written when the frame is cropped, for saving.
+    """
+
+    def __init__(self, num_slots: int, height: int, width: int,
+                 num_streams: int = 1):
+        """
+        Create the ring. Forked worker processes inherit its mapping.
+
+        Args:
+            num_slots (int): Number of frame slots.
+            height (int): Frame height.
+            width (int): Frame width.
+            num_streams (int): Number of streams with a drop counter.
+        """
+        self.shape = (num_slots, 2, height, width, 3)
+        header_size = num_streams * np.dtype(np.int64).itemsize
+        self.shm = shared_memory.SharedMemory(
+            create=True, size=header_size + int(np.prod(self.shape)))
+        self.dropped = np.ndarray((num_streams,), dtype=np.int64, buffer=self.shm.buf)
+        self.dropped[:] = 0
+        planes = np.ndarray(self.shape, dtype=np.uint8, buffer=self.shm.buf,
+                            offset=header_size)
+        self.frames = planes[:, 0]
+        self.full_frames = planes[:, 1]
+
+    def close(self):
+        """
+        Free the ring.
+        """
+        self.dropped = self.frames = self.full_frames = None
+        self.shm.close()
+        self.shm.unlink()
+
+
+def _decode_stream(stream_id: int, source: str, ring: SharedFrameRing,
+                   free_slots, ready, stop_event, roi_array, live: bool,
+                   capture_options: dict):
+    """
+    Decode one source into ring slots until it ends or the capture stops.
+    """
+    height, width = ring.frames.shape[1:3]
+    scaled = capture_options.pop('scaled')
+    cap = open_capture(source, width=width if scaled else None,
+                       height=height if scaled else None, **capture_options)
+    if not cap.isOpened():
+        print(f"[ERR]: Failed to open video source {source}", file=sys.stderr)
+
+    try:
+        while cap.isOpened() and not stop_event.is_set():
+            start = time.perf_counter()
+            ret, frame = cap.read()
+            if not ret:
+                break
+            capture_time = time.monotonic()
+            decode_time = time.perf_counter() - start
+
+            # Live: drop the frame if inference holds every slot, otherwise
+            # wait for one (backpressure)
+            slot = None
+            while slot is None and not stop_event.is_set():
+                try:
+                    if live:
+                        slot = free_slots.get_nowait()
+                    else:
+                        slot = free_slots.get(timeout=STOP_CHECK_INTERVAL)
+                except Empty:
+                    if live:
+                        break
+            if slot is None:
+                if live:
+                    ring.dropped[stream_id] += 1
+                    continue
+                break
+
+            start = time.perf_counter()
+            roi = None
+            with roi_array.get_lock():
+                if roi_array[0]:
+                    roi = tuple(roi_array[1:5])
+            if roi is not None:
+                cv2.resize(frame, (width, height), dst=ring.full_frames[slot])
+                frame = crop_source(frame, roi, width, height)
+            if frame.shape[:2] == (height, width):
+                ring.frames[slot][...] = frame  # Scaled by the capture backend
+            else:
+                cv2.resize(frame, (width, height), dst=ring.frames[slot])
+            resize_time = time.perf_counter() - start
+
+            ready.put((stream_id, slot, capture_time, roi, decode_time, resize_time))
+    finally:
+        cap.release()
+        ready.put((stream_id, END_OF_STREAM, time.monotonic(), None, 0.0, 0.0))
+
+
+def _decode_worker(streams: Sequence[Tuple[int, str]], ring: SharedFrameRing,
+                   free_slots, ready, stop_event, roi_array, live: bool,
+                   capture_options: dict):
+    """
+    Worker process entry point: one decode thread per assigned stream.
+    """
+    threads = [
+        Thread(target=_decode_stream,
+               args=(stream_id, source, ring, free_slots, ready, stop_event,
+                     roi_array, live, dict(capture_options)),
+               daemon=True)
+        for stream_id, source in streams
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+class SharedMemoryCapture:
+    """
+    Decode video sources in worker processes into a shared memory ring.
+
+    Worker processes decode, (ROI-crop and) resize frames straight into free
+    ring slots and pass only slot indices back, so frames are never pickled
+    and decoding does not compete with inference for the GIL. The consumer
+    reads slots zero-copy and hands each slot back with ``release`` once
+    the frame was copied into a batch.
+    """
+
+    def __init__(self, sources: Sequence[str], width: int, height: int,
+                 num_processes: int, num_slots: int, live: bool,
+                 capture_backend: str = 'opencv', capture_scaled: bool = True,
+                 keyframes_only: bool = False, gst_pipeline: str = GST_PIPELINE):
+        """
+        Create the ring and start the worker processes.
+
+        Args:
+            sources (Sequence[str]): Video sources, RTSP URLs or files.
+            width (int): Processed frame width.
+            height (int): Processed frame height.
+            num_processes (int): Number of decode processes, sources are
+                spread over them (one thread per source inside a process).
+            num_slots (int): Number of frame slots in the ring.
+            live (bool): Drop newly decoded frames while no slot is free
+                instead of blocking decode.
+            capture_backend (str): Backend the sources are opened with, see
+                ``open_capture``.
+            capture_scaled (bool): Let the backend scale frames to width x
+                height, False decodes at source resolution (ROI cropping).
+            keyframes_only (bool): Only decode key frames (pyav backend).
+            gst_pipeline (str): Pipeline template of the gstreamer backend.
+        """
+        self.ring = SharedFrameRing(num_slots, height, width, len(sources))
+        self.free_slots = _context.Queue()
+        for slot in range(num_slots):
+            self.free_slots.put(slot)
+        self.ready = _context.Queue()
+        self.stop_event = _context.Event()
+        self.roi_array = _context.Array('i', 5)  # valid, x1, y1, x2, y2
+        self._dropped_reported = np.zeros(len(sources), dtype=np.int64)
+        self._dropped_lock = Lock()
+
+        capture_options = {'backend': capture_backend, 'scaled': capture_scaled,
+                           'keyframes_only': keyframes_only,
+                           'gst_pipeline': gst_pipeline}
+
+        num_processes = max(1, min(num_processes, len(sources)))
+        assignments = [[] for _ in range(num_processes)]
+        for stream_id, source in enumerate(sources):
+            assignments[stream_id % num_processes].append((stream_id, source))
+
+        self.processes = [
+            _context.Process(
+                target=_decode_worker,
+                args=(streams, self.ring, self.free_slots, self.ready, self.stop_event,
+                      self.roi_array, live, capture_options),
+                daemon=True)
+            for streams in assignments
+        ]
+        for process in self.processes:
+            process.start()
+
+    def get(self, timeout: float = STOP_CHECK_INTERVAL):
+        """
+        Next decoded frame.
+
+        Returns:
+            tuple: (stream_id, slot, capture_time, roi, decode_time,
+            resize_time); ``slot`` is ``END_OF_STREAM`` when the stream ended.
+
+        Raises:
+            Empty: If no frame arrived in time.
+        """
+        return self.ready.get(timeout=timeout)
+
+    def frame(self, slot: int) -> np.ndarray:
+        """
+        Zero-copy view of the frame in ``slot``.
+        """
+        return self.ring.frames[slot]
+
+    def full_frame(self, slot: int) -> np.ndarray:
+        """
+        Zero-copy view of the whole resized frame of a ROI-cropped ``slot``.
+        """
+        return self.ring.full_frames[slot]
+
+    def release(self, slot: int):
+        """
+        Hand a slot back to the decoders once its frame is no longer read.
+        """
+        self.free_slots.put(slot)
+
+    def set_roi(self, roi: Optional[Roi]):
+        """
+        Set the region the decoders crop frames to, None for none.
+        """
+        with self.roi_array.get_lock():
+            self.roi_array[0] = int(roi is not None)
+            if roi is not None:
+                self.roi_array[1:5] = list(roi)
+
+    def dropped_frames(self) -> np.ndarray:
+        """
+        Frames dropped by the decoder of each stream since the last call.
+        """
+        with self._dropped_lock:
+            dropped = self._dropped_total if self.ring.dropped is None \
+                else self.ring.dropped.copy()
+            counts = dropped - self._dropped_reported
+            self._dropped_reported = dropped
+        return counts
+
+    def close(self):
+        """
+        Stop the worker processes and free the shared memory.
+        """
+        self.stop_event.set()
+        for process in self.processes:
+            process.join(timeout=5.0)
+            if process.is_alive():
+                process.terminate()
+        for queue in (self.free_slots, self.ready):
+            queue.cancel_join_thread()
+            queue.close()
+        # Keep the drop counts readable after the ring is freed
+        self._dropped_total = self.ring.dropped.copy()
+        self.ring.close()
@@ -0,0 +1,67 @@
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from threading import Lock
+
+
+class StageTimer:
+    """
+    Per-stage latencies of the pipeline since the last report.
+
+    Stages are recorded by name from any thread (decode, resize, preprocess,
+    h2d by the processor, infer, postprocess by the consumer) and reported
+    in the order they were first seen. Times are host-side: on CUDA the
+    asynchronous copy and inference are only fully accounted for by the
+    stage that synchronizes on them.
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        self._stages = OrderedDict()
+
+    def record(self, stage: str, seconds: float, count: int = 1):
+        """
+        Record ``count`` occurrences of a stage that took ``seconds`` in total.
+
+        Args:
+            stage (str): Stage name.
+            seconds (float): Elapsed time in seconds.
+            count (int): Number of items (e.g. frames) processed in that time.
+        """
+        with self._lock:
+            total, items, calls, longest = self._stages.get(stage, (0.0, 0, 0, 0.0))
+            self._stages[stage] = (total + seconds, items + count, calls + 1,
+                                   max(longest, seconds))
+
+    @contextmanager
+    def time(self, stage: str, count: int = 1):
+        """
+        Context manager recording the time spent in its body as ``stage``.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - start, count)
+
+    def report(self) -> dict:
+        """
+        Return the latencies gathered since the last report and reset them.
+
+        Returns:
+            dict: Stage name -> ``{"calls", "items", "avg_ms", "max_ms",
+            "total_ms"}``, ``avg_ms`` being per call.
+        """
+        with self._lock:
+            stages, self._stages = self._stages, OrderedDict()
+
+        return OrderedDict(
+            (stage, {
+                "calls": calls,
+                "items": items,
+                "avg_ms": total / calls * 1e3,
+                "max_ms": longest * 1e3,
+                "total_ms": total * 1e3,
+            })
+            for stage, (total, items, calls, longest) in stages.items()
+        )
@@ -0,0 +1,216 @@
+import math
+import time
+from threading import Lock
+from typing import Optional, Sequence
+
+
+class StrideController:
+    """
+    Closed-loop controller of the capture stride of each stream.
+
+    A stream with stride k only queues every k-th captured frame, the others
+    are grabbed without being retrieved, resized or inferred. Once per
+    ``interval`` the controller compares the demand (captured frames per
+    second of each stream, divided by its stride, times the fraction that
+    passes the motion gate) with the measured capacity of the consumer
+    (frames per second of time spent outside ``get_batch``, i.e. inference
+    and post-processing):
+
+        - Overloaded, i.e. frame age above ``target_latency``, frames
+          dropped in live mode or a backlog growing while the frame age is
+          above half the target: every stream gets a stride
+          that fits its equal share of ``headroom`` times the capacity, at
+          least one more than before.
+        - Underloaded, i.e. frame age below half the target, no backlog
+          growth and no drops: strides step down by one, as long as the
+          expected demand still fits the capacity.
+
+    The stride changes with the scene (motion gate pass ratio) and with the
+    throughput of the device (e.g. thermal throttling), so the device stays
+    busy without an unbounded backlog.
+    """
+
+    def __init__(
+        self,
+        num_streams: int,
+        target_latency: float = 0.5,
+        max_stride: int = 5,
+        interval: float = 2.0,
+        headroom: float = 0.9
+    ):
+        """
+        Initialize the StrideController, every stream at stride 1.
+
+        Args:
+            num_streams (int): Number of streams.
+            target_latency (float): Frame age at hand-off to inference to
+                hold, in seconds.
+            max_stride (int): Largest stride of a stream.
+            interval (float): Seconds between stride adjustments.
+            headroom (float): Fraction of the capacity the demand may use.
+        """
+        self.target_latency = target_latency
+        self.max_stride = max(1, max_stride)
+        self.interval = interval
+        self.headroom = headroom
+        self.strides = [1] * num_streams
+
+        self._lock = Lock()
+        self._frame_counters = [0] * num_streams
+        self._last_update = time.monotonic()
+        self._last_backlog = 0
+        self._last_return: Optional[float] = None
+        self._input_fps = 0.0
+        self._capacity_fps = 0.0
+        self._reset_interval()
+        self._reset()
+
+    def _reset_interval(self):
+        self._captured = [0] * len(self.strides)
+        self._queued = 0
+        self._dropped = 0
+        self._consumed = 0
+        self._busy = 0.0
+        self._age_sum = 0.0
+
+    def _reset(self):
+        self._increases = 0
+        self._decreases = 0
+
+    def should_queue(self, stream_id: int) -> bool:
+        """
+        Count a captured frame of a stream and decide if it is queued.
+
+        Called by the stream's capture thread only.
+
+        Args:
+            stream_id (int): Stream of the frame.
+
+        Returns:
+            bool: True for every ``stride``-th frame of the stream.
+        """
+        count = self._frame_counters[stream_id]
+        self._frame_counters[stream_id] = count + 1
+        queue = count % self.strides[stream_id] == 0
+        with self._lock:
+            self._captured[stream_id] += 1
+            self._queued += queue
+        return queue
+
+    def record_dropped(self, count: int = 1, stream_id: Optional[int] = None):
+        """
+        Record queued frames dropped before they reached a batch.
+
+        Args:
+            count (int): Number of dropped frames.
+            stream_id (Optional[int]): Stream of frames dropped before
+                ``should_queue`` saw them (e.g. by decode worker processes),
+                also counted as captured. None for frames already counted.
+        """
+        with self._lock:
+            self._dropped += count
+            if stream_id is not None:
+                self._captured[stream_id] += count
+
+    def record_batch(self, capture_times: Sequence[float], now: float):
+        """
+        Record the frames of a batch handed to the consumer.
+
+        Args:
+            capture_times (Sequence[float]): ``time.monotonic()`` capture
+                timestamps of the frames in the batch.
+            now (float): ``time.monotonic()`` at hand-off.
+        """
+        with self._lock:
+            self._consumed += len(capture_times)
+            self._age_sum += sum(now - t for t in capture_times)
+
+    def record_wait(self, start: float, now: float):
+        """
+        Record a ``get_batch`` call from ``start`` until it returned at
+        ``now``: the time since the previous return is consumer busy time.
+        """
+        with self._lock:
+            if self._last_return is not None:
+                self._busy += max(start - self._last_return, 0.0)
+            self._last_return = now
+
+    def update(self, backlog: int, now: Optional[float] = None) -> bool:
+        """
+        Adjust the strides if ``interval`` elapsed since the last adjustment.
+
+        Args:
+            backlog (int): Frames queued or batched but not yet consumed.
+            now (Optional[float]): ``time.monotonic()``, defaults to now.
+
+        Returns:
+            bool: True if a stride changed.
+        """
+        now = time.monotonic() if now is None else now
+        elapsed = now - self._last_update
+        if elapsed < self.interval:
+            return False
+
+        with self._lock:
+            captured = self._captured
+            queued, dropped, consumed = self._queued, self._dropped, self._consumed
+            busy, age_sum = self._busy, self._age_sum
+            self._reset_interval()
+        self._last_update = now
+        growth = backlog - self._last_backlog
+        self._last_backlog = backlog
+
+        if consumed == 0:
+            return False  # Nothing measured, e.g. all frames gated
+
+        rates = [count / elapsed for count in captured]
+        latency = age_sum / consumed
+        # Fraction of queued frames reaching inference (motion gate, drops)
+        pass_ratio = min(consumed / max(queued, 1), 1.0)
+        capacity = consumed / busy if busy > 0 else math.inf
+        self._input_fps = sum(rates)
+        self._capacity_fps = capacity
+
+        strides = list(self.strides)
+        if latency > self.target_latency or dropped > 0 or \
+                (growth > 0 and latency > self.target_latency / 2):
+            # Equal share of the capacity for every active stream
+            active = [i for i, rate in enumerate(rates) if rate > 0]
+            share = self.headroom * capacity / max(len(active), 1)
+            for i in active:
+                needed = math.ceil(rates[i] * pass_ratio / share) if share > 0 else self.max_stride
+                strides[i] = min(max(needed, strides[i] + 1), self.max_stride)
+        elif latency < self.target_latency / 2:
+            lowered = [max(stride - 1, 1) for stride in strides]
+            demand = sum(rate * pass_ratio / stride for rate, stride in zip(rates, lowered))
+            if demand <= self.headroom * capacity:
+                strides = lowered
+
+        changed = strides != self.strides
+        if changed:
+            with self._lock:
+                self._increases += sum(new > old for new, old in zip(strides, self.strides))
+                self._decreases += sum(new < old for new, old in zip(strides, self.strides))
+            self.strides = strides
+        return changed
+
+    def stats(self) -> dict:
+        """
+        Report the controller state, adjustment counters since the last call.
+
+        Returns:
+            dict: ``strides`` per stream, ``input_fps`` (captured frames of
+            all streams) and ``capacity_fps`` measured at the last
+            adjustment, and the ``stride_increases`` / ``stride_decreases``.
+        """
+        with self._lock:
+            stats = {
+                "strides": list(self.strides),
+                "input_fps": self._input_fps,
+                "capacity_fps": self._capacity_fps,
+                "stride_increases": self._increases,
+                "stride_decreases": self._decreases,
+            }
+            self._reset()
+
+        return stats
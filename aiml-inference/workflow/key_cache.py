@@ -0,0 +1,166 @@
+import sys
+import time
+from abc import ABC, abstractmethod
+from threading import Event, Lock, Thread
+from typing import Any, Callable, Optional
+
+import redis
+
+KEYSPACE_EVENTS = 'K$'  # Keyspace events for string commands (SET, ...)
+
+
+class RedisKeyCache(ABC):
+    """
+    In-memory cache of one workflow value stored in Redis.
+
+    The value is read once at construction and then kept in memory. A
+    background thread refreshes it only when the key changes:
+        - Redis keyspace notifications on the key, if enabled on the server
+          (``keyspace_events`` enables them with CONFIG SET, opt-in as it
+          changes the server configuration for every client)
+        - The pub/sub channel named after the key, used by workflow_management
+        - A periodic poll as a fallback when neither of the above is available
+
+    Subclasses implement ``parse`` to turn the raw value into a Python object.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        db: int,
+        key: str,
+        default: Any = None,
+        poll_interval: float = 30.0,
+        on_change: Optional[Callable[[Any], None]] = None,
+        keyspace_events: bool = False
+    ):
+        """
+        Initialize the RedisKeyCache and load the current value.
+
+        Args:
+            host (str): Redis host.
+            port (int): Redis port.
+            db (int): Redis database index.
+            key (str): Redis key (and pub/sub channel) holding the value.
+            default (Any): Value used while the key is missing or invalid.
+            poll_interval (float): Seconds between fallback polls.
+            on_change (Optional[Callable[[Any], None]]): Called with the new
+                value whenever it changes, including the initial load.
+            keyspace_events (bool): Enable keyspace notifications on the
+                server (CONFIG SET notify-keyspace-events) instead of relying
+                on the pub/sub channel and polling.
+        """
+        self.key = key
+        self.db = int(db)
+        self.default = default
+        self.poll_interval = poll_interval
+        self.on_change = on_change
+        self.keyspace_events = keyspace_events
+        self.stopped = Event()
+
+        self._client = redis.Redis(host=host, port=port, db=self.db)
+        self._lock = Lock()
+        self._value = default
+        self._loaded = False
+        self._last_refresh = 0.0
+
+        self.refresh()
+
+        self.watch_thread = Thread(target=self._watch, daemon=True)
+        self.watch_thread.start()
+
+    @property
+    def value(self) -> Any:
+        """
+        Current value, ``default`` if the key is missing or invalid.
+        """
+        with self._lock:
+            return self._value
+
+    @abstractmethod
+    def parse(self, raw: bytes) -> Any:
+        """
+        Convert the raw Redis value; raise to fall back to ``default``.
+        """
+
+    def refresh(self):
+        """
+        Read the value from Redis and replace the cached copy.
+        """
+        self._last_refresh = time.monotonic()
+
+        try:
+            raw = self._client.get(self.key)
+            if raw is None:
+                raise KeyError(f"'{self.key}' is not set")
+            value = self.parse(raw)
+        except redis.RedisError as e:
+            # Keep the last known value while Redis is unreachable
+            print(f"[ERR]: When read data from redis db: {e}", file=sys.stderr)
+            return
+        except Exception as e:
+            print(f"[EX]: When read data from redis db: {e}")
+            value = self.default
+
+        with self._lock:
+            changed = not self._loaded or value != self._value
+            self._value = value
+            self._loaded = True
+
+        if changed:
+            print(f"[INFO]: {self.key}: {value}")
+            if self.on_change is not None:
+                self.on_change(value)
+
+    def _enable_keyspace_events(self):
+        """
+        Make sure Redis emits keyspace notifications for string commands.
+        """
+        try:
+            flags = self._client.config_get(
+                'notify-keyspace-events').get('notify-keyspace-events', '')
+            missing = ''.join(f for f in KEYSPACE_EVENTS if f not in flags)
+            if missing and 'A' not in flags:
+                self._client.config_set('notify-keyspace-events', flags + missing)
+        except Exception as e:
+            print(f"[INFO]: Keyspace notifications unavailable: {e}")
+
+    def _watch(self):
+        """
+        Refresh the cached value on change notifications or on poll timeout.
+        """
+        keyspace_channel = f"__keyspace@{self.db}__:{self.key}"
+
+        while not self.stopped.is_set():
+            pubsub = None
+            try:
+                if self.keyspace_events:
+                    self._enable_keyspace_events()
+                pubsub = self._client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(keyspace_channel, self.key)
+                # Catch changes made while (re)subscribing
+                self.refresh()
+
+                while not self.stopped.is_set():
+                    message = pubsub.get_message(timeout=1.0)
+                    elapsed = time.monotonic() - self._last_refresh
+                    if message is not None or elapsed >= self.poll_interval:
+                        self.refresh()
+            except Exception as e:
+                print(f"[ERR]: {self.key} watcher: {e}", file=sys.stderr)
+                self.stopped.wait(self.poll_interval)
+            finally:
+                if pubsub is not None:
+                    try:
+                        pubsub.close()
+                    except Exception:
+                        pass
+
+    def close(self):
+        """
+        Stop the watcher thread and close the Redis connection.
+        """
+        self.stopped.set()
+        self.watch_thread.join()
+        self._client.close()
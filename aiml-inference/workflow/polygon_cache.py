@@ -0,0 +1,58 @@
+import json
+from typing import List, Tuple
+
+from .key_cache import RedisKeyCache
+
+DETECTION_RANGE_KEY = 'detection_range'
+
+
+class DetectionPolygonCache(RedisKeyCache):
+    """
+    In-memory cache of the detection polygon set by workflow_management.
+
+    The polygon is loaded once and refreshed only when ``detection_range``
+    changes, see ``RedisKeyCache``. It is empty while not configured.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        db: int,
+        key: str = DETECTION_RANGE_KEY,
+        poll_interval: float = 30.0,
+        keyspace_events: bool = False
+    ):
+        """
+        Initialize the DetectionPolygonCache and load the current polygon.
+
+        Args:
+            host (str): Redis host.
+            port (int): Redis port.
+            db (int): Redis database index.
+            key (str): Redis key (and pub/sub channel) holding the polygon.
+            poll_interval (float): Seconds between fallback polls.
+            keyspace_events (bool): Enable keyspace notifications on the
+                server, see ``RedisKeyCache``.
+        """
+        super().__init__(host=host, port=port, db=db, key=key, default=[],
+                         poll_interval=poll_interval,
+                         keyspace_events=keyspace_events)
+
+    def parse(self, raw: bytes) -> List[Tuple[int, int]]:
+        points_list = json.loads(raw.decode('utf-8'))
+        return [(p["x"], p["y"]) for p in points_list]
+
+    @property
+    def polygon(self) -> List[Tuple[int, int]]:
+        """
+        Current detection polygon, empty if it is not configured.
+        """
+        return self.value
+
+    @property
+    def enabled(self) -> bool:
+        """
+        Whether a usable detection polygon is configured.
+        """
+        return len(self.polygon) >= 3
@@ -0,0 +1,52 @@
+import json
+from typing import Callable, Optional
+
+from .key_cache import RedisKeyCache
+
+DETECTION_RATE_LIMIT_KEY = 'detection_rate_limit'
+
+
+class RateLimitCache(RedisKeyCache):
+    """
+    In-memory cache of the detection rate limit set by workflow_management.
+
+    The value is a JSON object ``{"rate": <detections/s>, "burst": <count>}``
+    applied per camera and per class; see ``RedisKeyCache`` for refreshing.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        db: int,
+        default: dict,
+        key: str = DETECTION_RATE_LIMIT_KEY,
+        poll_interval: float = 30.0,
+        on_change: Optional[Callable[[dict], None]] = None,
+        keyspace_events: bool = False
+    ):
+        """
+        Initialize the RateLimitCache and load the current limits.
+
+        Args:
+            host (str): Redis host.
+            port (int): Redis port.
+            db (int): Redis database index.
+            default (dict): Limits used while the key is missing or invalid.
+            key (str): Redis key (and pub/sub channel) holding the limits.
+            poll_interval (float): Seconds between fallback polls.
+            on_change (Optional[Callable[[dict], None]]): Called with the new
+                limits, typically ``DetectionRateLimiter.configure``.
+            keyspace_events (bool): Enable keyspace notifications on the
+                server, see ``RedisKeyCache``.
+        """
+        super().__init__(host=host, port=port, db=db, key=key, default=default,
+                         poll_interval=poll_interval, on_change=on_change,
+                         keyspace_events=keyspace_events)
+
+    def parse(self, raw: bytes) -> dict:
+        config = json.loads(raw.decode('utf-8'))
+        return {
+            "rate": float(config.get("rate", self.default["rate"])),
+            "burst": float(config.get("burst", self.default["burst"])),
+        }
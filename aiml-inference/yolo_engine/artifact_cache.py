@@ -0,0 +1,275 @@
+import hashlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from importlib import metadata
+from threading import Lock
+
+# Ultralytics export format and file suffix of each backend's artifact
+EXPORT_FORMATS = {
+    'tensorrt': ('engine', '.engine'),
+    'torchscript': ('torchscript', '.torchscript'),
+    'onnxruntime': ('onnx', '.onnx'),
+}
+
+HASH_CHUNK_SIZE = 1 << 20
+HASH_LENGTH = 12
+
+
+class ArtifactCache:
+    """
+    On-disk cache of compiled/exported model artifacts.
+
+    Artifacts are named after everything that makes them differ: the weights
+    hash, backend, batch range, input size, precision and a hash of the
+    toolchain (ultralytics and TensorRT versions, device name; a TensorRT
+    engine only runs with the TensorRT version and GPU it was built for),
+    e.g. ``yolo_person-3f2a9c1b7d4e-tensorrt-b1-8-640x640-fp16-0c5e7f21.engine``.
+    A missing artifact is exported once from the weights, in a build
+    directory inside the cache so no intermediate files (e.g. the ONNX
+    export a TensorRT build goes through) are left next to the weights, and
+    reused across restarts. Build and warmup timings are kept next to it in
+    a ``.json`` file.
+    """
+
+    def __init__(self, cache_dir: str, weights_path: str):
+        """
+        Initialize the ArtifactCache.
+
+        Args:
+            cache_dir (str): Directory holding the artifacts.
+            weights_path (str): PyTorch weights the artifacts are exported from.
+        """
+        self.cache_dir = cache_dir
+        self.weights_path = weights_path
+        self._weights_hash = None
+        self._lock = Lock()
+
+    @property
+    def weights_hash(self) -> str:
+        """
+        Short SHA-256 of the weights file, computed once.
+        """
+        if self._weights_hash is None:
+            digest = hashlib.sha256()
+            with open(self.weights_path, 'rb') as f:
+                for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+                    digest.update(chunk)
+            self._weights_hash = digest.hexdigest()[:HASH_LENGTH]
+        return self._weights_hash
+
+    def artifact_path(self, backend: str, batch_size: int, height: int,
+                      width: int, precision: str, device: str = 'cpu') -> str:
+        """
+        Path of the artifact for the given build parameters.
+
+        Args:
+            backend (str): Backend name, one of ``EXPORT_FORMATS``.
+            batch_size (int): Maximum batch size, the artifact takes 1 to it.
+            height (int): Input height.
+            width (int): Input width.
+            precision (str): 'fp16', 'fp32' or 'int8'.
+            device (str): Device the artifact is built for.
+
+        Returns:
+            str: Artifact path in the cache directory.
+        """
+        if backend not in EXPORT_FORMATS:
+            raise ValueError(f"No artifact format for backend '{backend}'")
+
+        toolchain = json.dumps(toolchain_versions(backend, device), sort_keys=True)
+        toolchain_hash = hashlib.sha256(toolchain.encode('utf-8')).hexdigest()[:8]
+        stem = os.path.splitext(os.path.basename(self.weights_path))[0]
+        suffix = EXPORT_FORMATS[backend][1]
+        name = (f"{stem}-{self.weights_hash}-{backend}-b1-{batch_size}-"
+                f"{height}x{width}-{precision}-{toolchain_hash}{suffix}")
+        return os.path.join(self.cache_dir, name)
+
+    def owns(self, path: str) -> bool:
+        """
+        Whether ``path`` is an artifact of this cache.
+        """
+        return os.path.dirname(os.path.abspath(path)) == os.path.abspath(self.cache_dir)
+
+    def get_or_build(self, backend: str, batch_size: int, height: int,
+                     width: int, precision: str, device: str = 'cpu') -> str:
+        """
+        Return the cached artifact, exporting it first if it is missing.
+
+        Args:
+            backend (str): Backend name, one of ``EXPORT_FORMATS``.
+            batch_size (int): Maximum batch size.
+            height (int): Input height.
+            width (int): Input width.
+            precision (str): 'fp16', 'fp32' or 'int8'.
+            device (str): Device the export runs on (TensorRT needs a GPU).
+
+        Returns:
+            str: Path of the artifact.
+        """
+        path = self.artifact_path(backend, batch_size, height, width, precision,
+                                  device)
+        with self._lock:
+            if os.path.exists(path):
+                print(f"[INFO]: Using cached model artifact {path}")
+                return path
+
+            print(f"[INFO]: Building model artifact {path}")
+            os.makedirs(self.cache_dir, exist_ok=True)
+            # Export writes next to the weights: export a copy of them in a
+            # build directory, then move the artifact in place atomically
+            build_dir = tempfile.mkdtemp(prefix='.build-', dir=self.cache_dir)
+            try:
+                weights = shutil.copy(self.weights_path, build_dir)
+                start = time.perf_counter()
+                exported = self._export(weights, backend, batch_size, height,
+                                        width, precision, device)
+                build_time = time.perf_counter() - start
+
+                tmp_path = path + '.tmp'
+                shutil.move(exported, tmp_path)
+                os.replace(tmp_path, path)
+            finally:
+                shutil.rmtree(build_dir, ignore_errors=True)
+
+            self._write_metadata(path, {
+                'weights': os.path.basename(self.weights_path),
+                'weights_hash': self.weights_hash,
+                'backend': backend,
+                'batch_range': [1, batch_size],
+                'input_size': [height, width],
+                'precision': precision,
+                'device': device,
+                'toolchain': toolchain_versions(backend, device),
+                'built_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                'build_seconds': round(build_time, 3),
+            })
+            print(f"[INFO]: Built model artifact in {build_time:.1f} s")
+            return path
+
+    def record_warmup(self, path: str, warmup_time: float):
+        """
+        Record the warmup time of an artifact in its metadata.
+
+        Args:
+            path (str): Artifact path returned by ``get_or_build``.
+            warmup_time (float): Warmup time in seconds.
+        """
+        metadata = self.metadata(path)
+        metadata['warmup_seconds'] = round(warmup_time, 3)
+        self._write_metadata(path, metadata)
+
+    def metadata(self, path: str) -> dict:
+        """
+        Build metadata of an artifact, empty if none was recorded.
+
+        Args:
+            path (str): Artifact path.
+
+        Returns:
+            dict: Metadata stored next to the artifact.
+        """
+        try:
+            with open(path + '.json', 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _write_metadata(self, path: str, metadata: dict):
+        tmp_path = path + '.json.tmp'
+        try:
+            with open(tmp_path, 'w') as f:
+                json.dump(metadata, f, indent=2)
+            os.replace(tmp_path, path + '.json')
+        except OSError as e:
+            print(f"[ERR]: Failed to write metadata of {path}: {e}", file=sys.stderr)
+
+    def _export(self, weights: str, backend: str, batch_size: int, height: int,
+                width: int, precision: str, device: str) -> str:
+        from ultralytics import YOLO
+
+        export_format = EXPORT_FORMATS[backend][0]
+        model = YOLO(weights)
+        exported = model.export(
+            format=export_format,
+            imgsz=(height, width),
+            batch=batch_size,
+            dynamic=backend != 'torchscript',
+            half=precision == 'fp16',
+            int8=precision == 'int8',
+            workspace=4 if backend == 'tensorrt' else None,
+            device=device,
+        )
+        return str(exported)
+
+
+def package_version(name: str) -> str:
+    """
+    Installed version of a distribution, 'none' if it is not installed.
+    """
+    try:
+        return metadata.version(name)
+    except metadata.PackageNotFoundError:
+        return 'none'
+
+
+def device_name(device: str) -> str:
+    """
+    Name of the GPU behind ``device`` (e.g. 'NVIDIA A10'), or the device
+    string for CPU.
+    """
+    import torch
+
+    if device.startswith('cuda') and torch.cuda.is_available():
+        return torch.cuda.get_device_name(torch.device(device))
+    return device
+
+
+def toolchain_versions(backend: str, device: str) -> dict:
+    """
+    Versions an artifact of ``backend`` built on ``device`` depends on.
+
+    Args:
+        backend (str): Backend name.
+        device (str): Device the artifact is built for.
+
+    Returns:
+        dict: ``ultralytics`` version and ``device`` name, plus the
+        ``tensorrt`` version for TensorRT engines.
+    """
+    versions = {
+        'ultralytics': package_version('ultralytics'),
+        'device': device_name(device),
+    }
+    if backend == 'tensorrt':
+        versions['tensorrt'] = package_version('tensorrt')
+        if versions['tensorrt'] == 'none':
+            # e.g. JetPack installs the bindings without package metadata
+            try:
+                import tensorrt
+                versions['tensorrt'] = tensorrt.__version__
+            except ImportError:
+                pass
+    return versions
+
+
+def artifact_precision(backend: str, precision: str, device: str) -> str:
+    """
+    Precision an artifact is actually built with on ``device``.
+
+    FP16 and INT8 exports need a GPU, CPU artifacts are FP32.
+
+    Args:
+        backend (str): Backend name.
+        precision (str): Requested precision.
+        device (str): Device the artifact runs on.
+
+    Returns:
+        str: Precision used in the artifact key.
+    """
+    if device == 'cpu' or (backend != 'tensorrt' and precision == 'int8'):
+        return 'fp32'
+    return precision
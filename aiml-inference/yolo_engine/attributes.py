@@ -0,0 +1,269 @@
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+import torch
+
+from . import config
+
+
+def gather_crops(frames: Sequence[np.ndarray], boxes: Sequence[np.ndarray],
+                 size: Tuple[int, int]) -> np.ndarray:
+    """
+    Crop the boxes of several frames and resize them into one batch.
+
+    Args:
+        frames (Sequence[np.ndarray]): BGR frames.
+        boxes (Sequence[np.ndarray]): (N_i, 4) xyxy boxes of each frame.
+        size (Tuple[int, int]): (width, height) of the crops.
+
+    Returns:
+        np.ndarray: uint8 (sum N_i, height, width, 3) crops in frame order;
+        boxes without area give black crops.
+    """
+    width, height = size
+    crops = np.zeros((sum(len(b) for b in boxes), height, width, 3), dtype=np.uint8)
+
+    i = 0
+    for frame, frame_boxes in zip(frames, boxes):
+        frame_h, frame_w = frame.shape[:2]
+        clipped = np.round(np.asarray(frame_boxes, dtype=np.float32).reshape(-1, 4))
+        clipped = clipped.clip(0, [frame_w, frame_h, frame_w, frame_h]).astype(np.int32)
+        for x1, y1, x2, y2 in clipped:
+            if x2 > x1 and y2 > y1:
+                cv2.resize(frame[y1:y2, x1:x2], size, dst=crops[i])
+            i += 1
+    return crops
+
+
+class AttributeBackend(ABC):
+    """
+    Interface of the secondary attribute models run on object crops.
+
+    ``predict`` takes a batch of uint8 crops and returns one attribute dict
+    per crop: the label of each classification output listed in ``labels``
+    (argmax, or a 0.5 threshold for a single-value output with two labels)
+    and the value of each other single-value output (e.g. age).
+    """
+
+    name = 'base'
+
+    def __init__(
+        self,
+        path: str,
+        device: str = 'cpu',
+        input_size: Tuple[int, int] = config.ATTRIBUTE_INPUT_SIZE,
+        labels: Dict[str, List[str]] = config.ATTRIBUTE_LABELS,
+        mean: Sequence[float] = config.ATTRIBUTE_MEAN,
+        std: Sequence[float] = config.ATTRIBUTE_STD
+    ):
+        """
+        Initialize the backend, ``load`` must be called before ``predict``.
+
+        Args:
+            path (str): Model artifact path.
+            device (str): Device to run on.
+            input_size (Tuple[int, int]): (width, height) of the model input.
+            labels (Dict[str, List[str]]): Labels of each classification output.
+            mean (Sequence[float]): Per-channel (RGB) normalization mean.
+            std (Sequence[float]): Per-channel (RGB) normalization std.
+        """
+        self.path = path
+        self.device = device
+        self.input_size = input_size
+        self.labels = labels
+        self.mean = np.asarray(mean, dtype=np.float32) * 255
+        self.std = np.asarray(std, dtype=np.float32) * 255
+
+    @abstractmethod
+    def load(self):
+        """
+        Load the model artifact.
+        """
+
+    @abstractmethod
+    def run(self, inputs: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Run the model on a normalized batch.
+
+        Args:
+            inputs (np.ndarray): float32 (N, 3, H, W) RGB batch.
+
+        Returns:
+            Dict[str, np.ndarray]: (N, K) or (N,) array of each output.
+        """
+
+    def predict(self, crops: np.ndarray) -> List[dict]:
+        """
+        Predict the attributes of a batch of crops, in one model call.
+
+        Args:
+            crops (np.ndarray): uint8 (N, H, W, 3) BGR crops, see
+                ``gather_crops``.
+
+        Returns:
+            List[dict]: Attributes of each crop.
+        """
+        if len(crops) == 0:
+            return []
+
+        # BGR HWC uint8 -> normalized RGB CHW float32, whole batch at once
+        inputs = (crops[..., ::-1].astype(np.float32) - self.mean) / self.std
+        outputs = self.run(np.ascontiguousarray(inputs.transpose(0, 3, 1, 2)))
+
+        attributes = [{} for _ in range(len(crops))]
+        for name, values in outputs.items():
+            values = np.asarray(values, dtype=np.float32).reshape(len(crops), -1)
+            labels = self.labels.get(name)
+            if values.shape[1] == 1:
+                if labels is not None and len(labels) == 2:
+                    # Binary output (e.g. sigmoid gender head)
+                    for attribute, positive in zip(attributes, (values[:, 0] >= 0.5).tolist()):
+                        attribute[name] = labels[int(positive)]
+                    continue
+                for attribute, value in zip(attributes, np.round(values[:, 0].astype(np.float64), 1).tolist()):
+                    attribute[name] = value
+                continue
+
+            indices = values.argmax(axis=1).tolist()
+            if labels is not None and len(labels) == values.shape[1]:
+                indices = [labels[index] for index in indices]
+            for attribute, label in zip(attributes, indices):
+                attribute[name] = label
+        return attributes
+
+
+class OnnxAttributeBackend(AttributeBackend):
+    """
+    ONNX Runtime attribute backend, outputs named after the model outputs.
+
+    Runs on the CPU execution provider (CUDA when available and requested).
+    Models exported with a fixed batch size get padded chunks.
+    """
+
+    name = 'onnxruntime'
+
+    def load(self):
+        import onnxruntime as ort
+
+        providers = ['CPUExecutionProvider']
+        if self.device != 'cpu' and \
+                'CUDAExecutionProvider' in ort.get_available_providers():
+            providers.insert(0, 'CUDAExecutionProvider')
+
+        self.session = ort.InferenceSession(self.path, providers=providers)
+        model_input = self.session.get_inputs()[0]
+        self.input_name = model_input.name
+        self.input_dtype = np.float16 if 'float16' in model_input.type else np.float32
+        batch_dim = model_input.shape[0]
+        self.fixed_batch_size = batch_dim if isinstance(batch_dim, int) else None
+        self.output_names = [output.name for output in self.session.get_outputs()]
+
+    def run(self, inputs: np.ndarray) -> Dict[str, np.ndarray]:
+        inputs = inputs.astype(self.input_dtype, copy=False)
+        if self.fixed_batch_size is None:
+            return dict(zip(self.output_names,
+                            self.session.run(None, {self.input_name: inputs})))
+
+        chunks = []
+        n = len(inputs)
+        for start in range(0, n, self.fixed_batch_size):
+            chunk = inputs[start:start + self.fixed_batch_size]
+            padding = self.fixed_batch_size - len(chunk)
+            if padding:
+                chunk = np.concatenate([chunk, np.zeros((padding,) + chunk.shape[1:],
+                                                        dtype=chunk.dtype)])
+            chunks.append(self.session.run(None, {self.input_name: chunk}))
+        return {name: np.concatenate([chunk[i] for chunk in chunks])[:n]
+                for i, name in enumerate(self.output_names)}
+
+
+class TorchScriptAttributeBackend(AttributeBackend):
+    """
+    TorchScript attribute backend. The model returns a dict of outputs, or
+    a tuple named by ``output_names``.
+    """
+
+    name = 'torchscript'
+
+    def __init__(self, *args, output_names: Sequence[str] = config.ATTRIBUTE_OUTPUTS,
+                 **kwargs):
+        super().__init__(*args, **kwargs)
+        self.output_names = list(output_names)
+
+    def load(self):
+        self.model = torch.jit.load(self.path, map_location=self.device).eval()
+
+    def run(self, inputs: np.ndarray) -> Dict[str, np.ndarray]:
+        with torch.inference_mode():
+            outputs = self.model(torch.from_numpy(inputs).to(self.device))
+        if isinstance(outputs, torch.Tensor):
+            outputs = (outputs,)
+        if not isinstance(outputs, dict):
+            outputs = dict(zip(self.output_names, outputs))
+        # One transfer per output for the whole batch
+        return {name: output.float().cpu().numpy() for name, output in outputs.items()}
+
+
+ATTRIBUTE_BACKENDS = {
+    OnnxAttributeBackend.name: (OnnxAttributeBackend, config.ATTRIBUTE_ONNX_PATH),
+    TorchScriptAttributeBackend.name: (TorchScriptAttributeBackend,
+                                       config.ATTRIBUTE_TORCHSCRIPT_PATH),
+}
+
+
+def create_attribute_backend(name: str, path: Optional[str] = None,
+                             device: str = 'cpu') -> AttributeBackend:
+    """
+    Create and load an attribute backend by name.
+
+    Args:
+        name (str): One of ``ATTRIBUTE_BACKENDS``.
+        path (Optional[str]): Model artifact, defaults to the backend's path
+            from ``yolo_engine/config.py``.
+        device (str): Device to run on.
+
+    Returns:
+        AttributeBackend: Loaded backend.
+    """
+    if name not in ATTRIBUTE_BACKENDS:
+        raise ValueError(
+            f"Unknown attribute backend '{name}', expected one of {list(ATTRIBUTE_BACKENDS)}")
+
+    backend_class, default_path = ATTRIBUTE_BACKENDS[name]
+    backend = backend_class(path=path or default_path, device=device)
+    backend.load()
+    return backend
+
+
+def predict_attributes(
+    backend: AttributeBackend,
+    frames: Sequence[np.ndarray],
+    boxes: Sequence[np.ndarray],
+    class_ids: Sequence[np.ndarray],
+    classes: Optional[Sequence[int]] = None
+) -> List[List[Optional[dict]]]:
+    """
+    Predict the attributes of the objects of several frames in one batch.
+
+    Args:
+        backend (AttributeBackend): Loaded attribute backend.
+        frames (Sequence[np.ndarray]): BGR frames the boxes belong to.
+        boxes (Sequence[np.ndarray]): (N_i, 4) xyxy boxes of each frame.
+        class_ids (Sequence[np.ndarray]): (N_i,) class ids of each frame.
+        classes (Optional[Sequence[int]]): Classes to predict attributes of,
+            None for all.
+
+    Returns:
+        List[List[Optional[dict]]]: Attributes of each box of each frame,
+        None for boxes of other classes.
+    """
+    masks = [np.ones(len(ids), dtype=bool) if classes is None else np.isin(ids, classes)
+             for ids in class_ids]
+    crops = gather_crops(frames, [np.asarray(b)[mask] for b, mask in zip(boxes, masks)],
+                         backend.input_size)
+    predictions = iter(backend.predict(crops))
+
+    return [[next(predictions) if selected else None for selected in mask.tolist()]
+            for mask in masks]
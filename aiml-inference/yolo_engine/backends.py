@@ -0,0 +1,282 @@
+import os
+import sys
+import time
+from abc import ABC, abstractmethod
+from typing import Optional, Sequence
+
+import cv2
+import numpy as np
+import torch
+
+from . import config
+from .artifact_cache import ArtifactCache, artifact_precision
+
+
+# Detections of a whole batch, sorted by frame: one compact record per box
+DETECTION_DTYPE = np.dtype([
+    ('frame', np.int32),         # Frame index in the batch
+    ('box', np.float32, (4,)),   # x1, y1, x2, y2 in model input pixels
+    ('score', np.float32),
+    ('class_id', np.int32),
+])
+
+
+def detections_from_array(rows: np.ndarray) -> np.ndarray:
+    """
+    Pack (M, 7) [frame, x1, y1, x2, y2, score, class_id] rows into a
+    ``DETECTION_DTYPE`` array.
+    """
+    detections = np.empty(len(rows), dtype=DETECTION_DTYPE)
+    detections['frame'] = rows[:, 0]
+    detections['box'] = rows[:, 1:5]
+    detections['score'] = rows[:, 5]
+    detections['class_id'] = rows[:, 6]
+    return detections
+
+
+class InferenceBackend(ABC):
+    """
+    Interface every inference backend implements.
+
+    ``infer`` takes a normalized float (N, 3, H, W) batch and returns the
+    detections of the whole batch, after confidence filtering and NMS, as
+    one ``DETECTION_DTYPE`` array sorted by frame.
+    """
+
+    name = 'base'
+
+    def __init__(self, path: str, device: str = 'cpu',
+                 conf_threshold: float = config.CONF_THRESHOLD,
+                 iou_threshold: float = config.IOU_THRESHOLD):
+        """
+        Initialize the backend, ``load`` must be called before ``infer``.
+
+        Args:
+            path (str): Model artifact path.
+            device (str): Device to run on.
+            conf_threshold (float): Minimum confidence kept.
+            iou_threshold (float): NMS IoU threshold.
+        """
+        self.path = path
+        self.device = device
+        self.conf_threshold = conf_threshold
+        self.iou_threshold = iou_threshold
+
+    @abstractmethod
+    def load(self):
+        """
+        Load the model artifact.
+        """
+
+    @abstractmethod
+    def infer(self, batch: torch.Tensor) -> np.ndarray:
+        """
+        Run inference on a batch.
+
+        Args:
+            batch (torch.Tensor): Normalized float (N, 3, H, W) batch.
+
+        Returns:
+            np.ndarray: ``DETECTION_DTYPE`` detections of the batch.
+        """
+
+    def warmup(self, batch_size: int, height: int, width: int,
+               iterations: int = 2) -> float:
+        """
+        Run a few dummy batches so the first real batch is not slow.
+
+        Returns:
+            float: Seconds spent warming up.
+        """
+        start = time.perf_counter()
+        dummy = torch.zeros((batch_size, 3, height, width),
+                            dtype=torch.float16, device=self.device)
+        for _ in range(iterations):
+            self.infer(dummy)
+        return time.perf_counter() - start
+
+
+class UltralyticsBackend(InferenceBackend):
+    """
+    Backend running an exported model through Ultralytics ``YOLO``.
+    """
+
+    name = 'ultralytics'
+
+    def load(self):
+        from ultralytics import YOLO
+
+        self.model = YOLO(self.path, task='detect')
+
+    def infer(self, batch: torch.Tensor) -> np.ndarray:
+        results = self.model(batch, conf=self.conf_threshold,
+                             iou=self.iou_threshold, verbose=False)
+
+        # Gather the boxes of all frames on the device, then transfer and
+        # synchronize once for the whole batch
+        data = [result.boxes.data for result in results]  # (n, 6) per frame
+        counts = torch.tensor([len(d) for d in data], device=data[0].device)
+        frames = torch.repeat_interleave(
+            torch.arange(len(data), device=counts.device), counts)
+        rows = torch.cat([frames[:, None].float(), torch.cat(data).float()], dim=1)
+        return detections_from_array(rows.cpu().numpy())
+
+
+class TensorRTBackend(UltralyticsBackend):
+    """
+    TensorRT ``.engine`` exported by ``yolo.export_engine`` (Jetson).
+    """
+
+    name = 'tensorrt'
+
+
+class TorchScriptBackend(UltralyticsBackend):
+    """
+    TorchScript ``.torchscript`` exported by ``yolo.load_torchscript``.
+    """
+
+    name = 'torchscript'
+
+
+class OnnxRuntimeBackend(InferenceBackend):
+    """
+    ONNX Runtime backend for YOLOv8-style ``.onnx`` exports.
+
+    Runs on the CPU execution provider (CUDA when available and requested),
+    so the pipeline can run on a GPU-less x86 box. Box decoding and NMS are
+    done with NumPy/OpenCV.
+    """
+
+    name = 'onnxruntime'
+
+    def load(self):
+        import onnxruntime as ort
+
+        providers = ['CPUExecutionProvider']
+        if self.device != 'cpu' and \
+                'CUDAExecutionProvider' in ort.get_available_providers():
+            providers.insert(0, 'CUDAExecutionProvider')
+
+        self.session = ort.InferenceSession(self.path, providers=providers)
+        model_input = self.session.get_inputs()[0]
+        self.input_name = model_input.name
+        self.input_dtype = np.float16 if 'float16' in model_input.type else np.float32
+
+    def infer(self, batch: torch.Tensor) -> np.ndarray:
+        inputs = batch.detach().cpu().numpy().astype(self.input_dtype, copy=False)
+        # YOLOv8 head: (N, 4 + num_classes, num_anchors), boxes as cx, cy, w, h
+        predictions = self.session.run(None, {self.input_name: inputs})[0]
+        return self._decode(predictions)
+
+    def _decode(self, predictions: np.ndarray) -> np.ndarray:
+        predictions = predictions.astype(np.float32, copy=False).transpose(0, 2, 1)
+        num_classes = predictions.shape[2] - 4
+
+        # Confidence filtering of the whole batch at once
+        class_scores = predictions[..., 4:]
+        class_ids = class_scores.argmax(axis=2)
+        scores = np.take_along_axis(class_scores, class_ids[..., None], axis=2)[..., 0]
+        frames, anchors = np.nonzero(scores >= self.conf_threshold)
+
+        cxcywh = predictions[frames, anchors, :4]
+        scores = scores[frames, anchors]
+        class_ids = class_ids[frames, anchors]
+
+        xywh = cxcywh.copy()
+        xywh[:, :2] -= cxcywh[:, 2:] / 2
+
+        # One class-aware NMS call for the batch: boxes of different frames
+        # never suppress each other as each (frame, class) is its own group
+        groups = frames * num_classes + class_ids
+        indices = np.array(cv2.dnn.NMSBoxesBatched(
+            xywh.tolist(), scores.tolist(), groups.tolist(),
+            self.conf_threshold, self.iou_threshold), dtype=np.int64).reshape(-1)
+        indices = indices[np.lexsort((-scores[indices], frames[indices]))]
+
+        detections = np.empty(len(indices), dtype=DETECTION_DTYPE)
+        detections['frame'] = frames[indices]
+        detections['box'][:, :2] = xywh[indices, :2]
+        detections['box'][:, 2:] = xywh[indices, :2] + cxcywh[indices, 2:]
+        detections['score'] = scores[indices]
+        detections['class_id'] = class_ids[indices]
+        return detections
+
+
+BACKENDS = {
+    TensorRTBackend.name: (TensorRTBackend, config.ENGINE_PATH),
+    TorchScriptBackend.name: (TorchScriptBackend, config.TORCHSCRIPT_PATH),
+    OnnxRuntimeBackend.name: (OnnxRuntimeBackend, config.ONNX_PATH),
+}
+
+
+def create_backend(name: str, path: Optional[str] = None,
+                   device: str = 'cpu') -> InferenceBackend:
+    """
+    Create and load a backend by name.
+
+    Args:
+        name (str): One of ``BACKENDS``.
+        path (Optional[str]): Model artifact, defaults to the backend's path
+            from ``yolo_engine/config.py``.
+        device (str): Device to run on.
+
+    Returns:
+        InferenceBackend: Loaded backend.
+    """
+    if name not in BACKENDS:
+        raise ValueError(
+            f"Unknown inference backend '{name}', expected one of {list(BACKENDS)}")
+
+    backend_class, default_path = BACKENDS[name]
+    backend = backend_class(path=path or default_path, device=device)
+    backend.load()
+    return backend
+
+
+def load_backend(
+    names: Sequence[str],
+    device: str = 'cpu',
+    artifact_cache: Optional[ArtifactCache] = None,
+    batch_size: int = 8,
+    height: int = 640,
+    width: int = 640,
+    precision: str = 'fp16'
+) -> InferenceBackend:
+    """
+    Load the first backend of ``names`` that loads successfully.
+
+    Used to fall back, e.g. to ONNX Runtime on the CPU, when the TensorRT
+    engine fails to load. With an ``artifact_cache`` whose weights exist,
+    each backend's artifact is taken from (or built into) the cache for the
+    given batch size, input size and precision, otherwise the default path
+    from ``yolo_engine/config.py`` is used.
+
+    Args:
+        names (Sequence[str]): Backend names in order of preference.
+        device (str): Device to run on.
+        artifact_cache (Optional[ArtifactCache]): Cache of exported artifacts.
+        batch_size (int): Maximum batch size of the artifact.
+        height (int): Input height of the artifact.
+        width (int): Input width of the artifact.
+        precision (str): Requested precision, 'fp16', 'fp32' or 'int8'.
+
+    Returns:
+        InferenceBackend: Loaded backend.
+    """
+    use_cache = artifact_cache is not None and \
+        os.path.exists(artifact_cache.weights_path)
+
+    for name in names:
+        try:
+            path = None
+            if use_cache:
+                path = artifact_cache.get_or_build(
+                    name, batch_size, height, width,
+                    artifact_precision(name, precision, device), device=device)
+            backend = create_backend(name, path=path, device=device)
+            print(f"[INFO]: Inference backend: {name}")
+            return backend
+        except Exception as e:
+            print(f"[ERR]: Failed to load {name} backend: {e}", file=sys.stderr)
+
+    raise RuntimeError(f"No inference backend could be loaded from {list(names)}")
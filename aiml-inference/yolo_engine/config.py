@@ -1,7 +1,36 @@
+import os
+
 REDIS_HOST = '192.168.1.201'
 REDIS_PORT = 6379
 REDIS_DB = 0
 
 MODEL_DESCRIPTION = "YOLOv8_engine"
 CAMERA_ID = 0
-CAMERA_TYPE = "RGB"
\ No newline at end of file
+CAMERA_TYPE = "RGB"
+
+MODEL_DIR = os.path.dirname(os.path.abspath(__file__))
+ENGINE_PATH = os.path.join(MODEL_DIR, "yolo_person.engine")
+TORCHSCRIPT_PATH = os.path.join(MODEL_DIR, "yolo_person.torchscript")
+ONNX_PATH = os.path.join(MODEL_DIR, "yolo_person.onnx")
+
+# Same defaults as Ultralytics predict
+CONF_THRESHOLD = 0.25
+IOU_THRESHOLD = 0.45
+
+# Secondary attribute model run on the crops of detected objects
+ATTRIBUTE_ONNX_PATH = os.path.join(MODEL_DIR, "attributes.onnx")
+ATTRIBUTE_TORCHSCRIPT_PATH = os.path.join(MODEL_DIR, "attributes.torchscript")
+# (width, height) crops are resized to, ImageNet normalization
+ATTRIBUTE_INPUT_SIZE = (128, 256)
+ATTRIBUTE_MEAN = (0.485, 0.456, 0.406)
+ATTRIBUTE_STD = (0.229, 0.224, 0.225)
+# Labels of each classification output; a single-value output with two
+# labels is a binary output thresholded at 0.5 (second label above), other
+# single-value outputs (e.g. age in years) are reported as numbers
+ATTRIBUTE_LABELS = {
+    "gender": ["male", "female"],
+    "category": ["car", "truck", "bus", "motorbike", "bicycle"],
+    "color": ["white", "black", "gray", "red", "blue", "green", "yellow", "other"],
+}
+# Names of the outputs of TorchScript models returning a tuple
+ATTRIBUTE_OUTPUTS = ["gender", "age"]
@@ -1,21 +1,24 @@
-from ultralytics import YOLO
 import torch
-import torch_tensorrt
 import time
 import os
 
 import redis
 from . import config
 
-r = redis.Redis(host=config.REDIS_HOST,
-                port=config.REDIS_PORT, db=config.REDIS_DB)
 
-r.set('MODEL_DESCRIPTION', config.MODEL_DESCRIPTION)
-r.set('CAMERA_ID', config.CAMERA_ID)
-r.set('CAMERA_TYPE', config.CAMERA_TYPE)
+def register_model():
+    # Model and camera description read by model_messages_generator
+    r = redis.Redis(host=config.REDIS_HOST,
+                    port=config.REDIS_PORT, db=config.REDIS_DB)
+
+    r.set('MODEL_DESCRIPTION', config.MODEL_DESCRIPTION)
+    r.set('CAMERA_ID', config.CAMERA_ID)
+    r.set('CAMERA_TYPE', config.CAMERA_TYPE)
 
 
 def export_engine():
+    from ultralytics import YOLO
+
     # Load a YOLO11n PyTorch model
     model = YOLO("yolo_person.pt")
     # Export the model to TensorRT
@@ -23,7 +26,18 @@ def export_engine():
                  workspace=4,  half=True,)  # creates 'yolo11n.engine'
 
 
+def export_onnx():
+    from ultralytics import YOLO
+
+    # Load a YOLO PyTorch model
+    model = YOLO("yolo_person.pt")
+    # Export the model to ONNX for the onnxruntime (CPU) backend
+    model.export(format="onnx", dynamic=True, batch=8)  # creates 'yolo_person.onnx'
+
+
 def load_engine():
+    from ultralytics import YOLO
+
     # Load the exported TensorRT model
     path = os.getcwd() + "/yolo_engine/yolo_person.engine"
     trt_model = YOLO(path)
@@ -32,6 +46,8 @@ def load_engine():
 
 
 def run_engine():
+    from ultralytics import YOLO
+
     input_ = torch.rand(8, 3, 640, 640)
     # Load the exported TensorRT model
     trt_model = YOLO("yolo_person.engine")
@@ -41,6 +57,8 @@ def run_engine():
 
 
 def load_torchscript():
+    from ultralytics import YOLO
+
     # Load a YOLO11n PyTorch model
     model = YOLO("yolo11n.pt")
     # Export the model to TensorRT
@@ -48,6 +66,8 @@ def load_torchscript():
 
 
 def run_torchscript():
+    from ultralytics import YOLO
+
     input_ = torch.rand(8, 3, 640, 640)
     # Load the exported TensorRT model
     trt_model = YOLO("yolo11n.torchscript")
@@ -57,6 +77,9 @@ def run_torchscript():
 
 
 def convert_ts_torchTRT():  # error function
+    import torch_tensorrt
+    from ultralytics import YOLO
+
     script_model = YOLO("yolo11n.torchscript")
     spec = {
         "forward": torch_tensorrt.ts.TensorRTCompileSpec(
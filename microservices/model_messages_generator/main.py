@@ -5,6 +5,7 @@ import redis
 from dotenv import load_dotenv
 import os
 import copy
+import math
 import sys
 from shapely.geometry import Polygon
 from enum import Enum
@@ -267,14 +268,25 @@ class RabbitMQClient:
             if raw_object_msg is not None:
                 getDataRedis()
 
-            raw_object_list = [raw_object_msg]
-            object_data_message = ObjectDataMessage(
-                raw_obj_msg_list=raw_object_list)
-
-            if use_detection_polygon and not object_data_message.anyOverlapObject():
+            # Parsed once for both its objects and its events
+            data = parseModelMessage(raw_object_msg)
+            if data is None:
                 ch.basic_ack(delivery_tag=method.delivery_tag)
                 return
 
+            object_data_message = ObjectDataMessage(
+                raw_obj_msg_list=[data],
+                raw_evn_msg_list=[data])
+
+            if use_detection_polygon:
+                # Clip messages carry events only, of objects already
+                # reported in the zone
+                if not (object_data_message.anyOverlapObject()
+                        or object_data_message.anyEvent()):
+                    ch.basic_ack(delivery_tag=method.delivery_tag)
+                    return
+                object_data_message.dropNonOverlapObjects()
+
             message_str = object_data_message.createMessage()
             if object_data_message._upload_result:
                 result = self.objectPublish(message=message_str)
@@ -283,9 +295,8 @@ class RabbitMQClient:
                 return
 
             if result and object_data_message._upload_result:
-                for obj in object_data_message._raw_object_list:
-                    ts = obj.timestamp
-                    path = local_image_directory + '/' + ts + IMAGE_FILE_EXTENSION
+                for path in object_data_message.getImagePaths() + \
+                        object_data_message.getVideoPaths():
                     os.remove(path=path)
             ch.basic_ack(delivery_tag=method.delivery_tag)
 
@@ -316,6 +327,12 @@ class RawObject:
         self.object_id = id
         self.object_type = type
         self.bounding_box = bbox
+        self.camera_id = None
+        self.score = None
+        self.class_id = None
+        self.event = None
+        self.attributes = {}
+        self.has_image = True
         self.version = 'ver.1'
         self.is_overlap = False
 
@@ -331,23 +348,32 @@ class RawObject:
             'version': self.version,
         }
 
+    def loadDict(self, data: dict):
+        self.timestamp = data.get('timestamp', 'default_timestamp')
+        self.object_id = data.get('id', 'default_id')
+        self.object_type = data.get('type', 'default_type')
+        self.bounding_box = data.get('bbox', [0, 0, 0, 0])
+        self.camera_id = data.get('camera_id')
+        self.score = data.get('score')
+        self.class_id = data.get('class_id')
+        self.event = data.get('event')
+        self.attributes = data.get('attributes') or {}
+        self.has_image = data.get('image', True)
+        self.is_overlap = checkOverlap(
+            bbox_coords=self.bounding_box, detection_points=detection_polygon)
+
+        print(f"[INFO]: Process this object: {data}:")
+        if self.is_overlap:
+            print(
+                f"[INFO]: Overlap founded with detection polygon: {detection_polygon}")
+        else:
+            print(f"[INFO]: Overlap not found")
+
+        return self
+
     def load(self, raw_str: str):
         try:
-            data = json.loads(raw_str)
-
-            self.timestamp = data.get('timestamp', 'default_timestamp')
-            self.object_id = data.get('id', 'default_id')
-            self.object_type = data.get('type', 'default_type')
-            self.bounding_box = data.get('bbox', [0, 0, 0, 0])
-            self.is_overlap = checkOverlap(
-                bbox_coords=self.bounding_box, detection_points=detection_polygon)
-
-            print(f"[INFO]: Process this object message: {raw_str}:")
-            if self.is_overlap:
-                print(
-                    f"[INFO]: Overlap founded with detection polygon: {detection_polygon}")
-            else:
-                print(f"[INFO]: Overlap not found")
+            self.loadDict(json.loads(raw_str))
 
         except json.JSONDecodeError as e:
             print(f"[ERR]: Failed to decode model message: {e}", file=sys.stderr)
@@ -360,6 +386,114 @@ class RawObject:
         return self  # Ensure that this always returns an object, even if the input is malformed
 
 
+def parseModelMessage(raw_str: str):
+    '''
+    Decode a model message, None (logged) if it is not a JSON object.
+    '''
+    try:
+        data = json.loads(raw_str)
+    except json.JSONDecodeError as e:
+        print(f"[ERR]: Failed to decode model message: {e}", file=sys.stderr)
+        return None
+
+    if not isinstance(data, dict):
+        print(f"[ERR]: Skipping model message, expected a JSON object: {raw_str}",
+              file=sys.stderr)
+        return None
+    return data
+
+
+def loadRawObjects(data: dict) -> list:
+    '''
+    Load the raw objects of a model message decoded by parseModelMessage.
+
+    A frame message carries all detections of one frame and one image:
+    {"timestamp", "camera_id", "number_of_objects", "objects": [{"id", "bbox",
+    "score", "class_id", "type", "event", "attributes"}, ...]}. With tracking,
+    "id" is the track id and "event" one of "start", "zone_entry" or "end",
+    "in_zone" whether the object is in the zone (a track starting in the
+    zone reports "start" with "in_zone": true);
+    "attributes" (e.g. {"gender", "age"}) come from the optional attribute
+    model. Track end messages have "image": false as no frame image is
+    saved for them.
+    Single-object messages (one per bbox) are still accepted.
+    '''
+    if "objects" not in data:
+        return [RawObject().loadDict(data)]
+
+    objects = data["objects"]
+    if not isinstance(objects, list):
+        print(f"[ERR]: Skipping objects {objects!r}, expected a list", file=sys.stderr)
+        return []
+
+    raw_objects = []
+    for object_data in objects:
+        if not isinstance(object_data, dict):
+            print(f"[ERR]: Skipping object {object_data!r}, expected a JSON object",
+                  file=sys.stderr)
+            continue
+        object_data = dict(object_data)
+        object_data['timestamp'] = data.get('timestamp', 'default_timestamp')
+        object_data['camera_id'] = data.get('camera_id')
+        object_data['image'] = data.get('image', True)
+        raw_objects.append(RawObject().loadDict(object_data))
+
+    return raw_objects
+
+
+class RawEvent:
+    '''
+    Track event of an object, with the clip recorded around it.
+    '''
+
+    def __init__(self):
+        self.timestamp = 'default_timestamp'
+        self.camera_id = None
+        self.object_id = 'default_id'
+        self.action = 'default_action'
+        self.event_type = 'default_type'
+        self.video = None
+
+    def loadDict(self, data: dict):
+        self.timestamp = data.get('timestamp', 'default_timestamp')
+        self.camera_id = data.get('camera_id')
+        self.object_id = data.get('object_id', 'default_id')
+        self.action = data.get('action', 'default_action')
+        self.event_type = data.get('type', 'default_type')
+        self.video = data.get('video')
+
+        print(f"[INFO]: Process this event: {data}")
+        return self
+
+
+def loadRawEvents(data: dict) -> list:
+    '''
+    Load the raw events of a model message decoded by parseModelMessage.
+
+    Clip messages are sent once the clip around a frame with track events is
+    recorded: {"timestamp", "camera_id", "objects": [], "image": false,
+    "events": [{"object_id", "action", "type", "video"}, ...]}, "video"
+    being the clip file name in the local image directory.
+    '''
+    events = data.get("events") or []
+    if not isinstance(events, list):
+        print(f"[ERR]: Skipping events {events!r}, expected a list", file=sys.stderr)
+        return []
+
+    raw_events = []
+    for event_data in events:
+        if not isinstance(event_data, dict):
+            print(f"[ERR]: Skipping event {event_data!r}, expected a JSON object",
+                  file=sys.stderr)
+            continue
+        event_data = dict(event_data)
+        event_data['timestamp'] = data.get('timestamp', 'default_timestamp')
+        event_data['camera_id'] = data.get('camera_id')
+        raw_events.append(RawEvent().loadDict(event_data))
+
+    return raw_events
+
+
 class ObjectDataMessage:
     global location_id, location_description
     global minio_bucket, minio_file_destination_directory, minio_start_url, minio_credentials_file_path
@@ -367,18 +501,23 @@ class ObjectDataMessage:
     global redis_host, redis_port, redis_db
 
     def __init__(self, raw_obj_msg_list: list = [], raw_evn_msg_list: list = []):
-        self._num_of_objects = len(raw_obj_msg_list)
-        self._num_of_events = len(raw_evn_msg_list)
+        # Model messages decoded by parseModelMessage
+        self._raw_event_list: list[RawEvent] = []
+        for raw_event_message in raw_evn_msg_list:
+            self._raw_event_list.extend(loadRawEvents(data=raw_event_message))
+        self._num_of_events = len(self._raw_event_list)
+
         self._message_template_dict = copy.deepcopy(
             OBJECT_MESSAGE_TEMPLATE_DICT)
 
         self._raw_object_list: list[RawObject] = []
         self._overlap_list: list[bool] = []
         for raw_object_message in raw_obj_msg_list:
-            raw_object = RawObject().load(raw_str=raw_object_message)
-            self._raw_object_list.append(raw_object)
-            self._overlap_list.append(raw_object.is_overlap)
+            for raw_object in loadRawObjects(data=raw_object_message):
+                self._raw_object_list.append(raw_object)
+                self._overlap_list.append(raw_object.is_overlap)
 
+        self._num_of_objects = len(self._raw_object_list)
         self._contain_overlap_object = any(self._overlap_list)
 
         self._file_transfer_handler = ftp.FileTransferHandler(
@@ -392,6 +531,31 @@ class ObjectDataMessage:
     def anyOverlapObject(self) -> bool:
         return self._contain_overlap_object
 
+    def anyEvent(self) -> bool:
+        return self._num_of_events > 0
+
+    def dropNonOverlapObjects(self):
+        self._raw_object_list = [
+            obj for obj in self._raw_object_list if obj.is_overlap]
+        self._overlap_list = [True] * len(self._raw_object_list)
+        self._num_of_objects = len(self._raw_object_list)
+
+    def getImagePaths(self) -> list:
+        '''
+        Local image paths of the message, each frame image only once.
+        '''
+        return list(dict.fromkeys(
+            local_image_directory + '/' + obj.timestamp + IMAGE_FILE_EXTENSION
+            for obj in self._raw_object_list if obj.has_image))
+
+    def getVideoPaths(self) -> list:
+        '''
+        Local clip paths of the message, each clip only once.
+        '''
+        return list(dict.fromkeys(
+            local_image_directory + '/' + event.video
+            for event in self._raw_event_list if event.video))
+
     def getCurrentLocation(self):
         try:
             latitude = float(self._redis_client.get(
@@ -455,13 +619,39 @@ class ObjectDataMessage:
 
     def createObjectList(self) -> list:
 
-        def createObjectDetail(object_type: ObjectType) -> dict:
+        def getLabel(attributes: dict, key: str) -> str:
+            value = attributes.get(key)
+            if value is None:
+                return "unspecified"
+            if not isinstance(value, str):
+                print(f"[ERR]: Skipping attribute {key}={value!r}, expected a label",
+                      file=sys.stderr)
+                return "unspecified"
+            return value
+
+        def createObjectDetail(object_type: ObjectType, attributes: dict) -> dict:
+            # Attributes predicted by the inference's attribute model, if any.
+            # Values of an unexpected type are skipped, not the whole message
+            if not isinstance(attributes, dict):
+                print(f"[ERR]: Skipping attributes {attributes!r}, expected an object",
+                      file=sys.stderr)
+                attributes = {}
             if object_type == ObjectType.HUMAN:
                 object_detail = HUMAN_OBJECT_TEMPLATE_DICT.copy()
-                object_detail["age"] = -1
-                object_detail["gender"] = "unspecified"
+                age = attributes.get("age")
+                if isinstance(age, (int, float)) and not isinstance(age, bool) \
+                        and math.isfinite(age):
+                    object_detail["age"] = int(round(age))
+                else:
+                    if age is not None:
+                        print(f"[ERR]: Skipping attribute age={age!r}, expected a number",
+                              file=sys.stderr)
+                    object_detail["age"] = -1
+                object_detail["gender"] = getLabel(attributes, "gender")
             elif object_type == ObjectType.VEHICLE:
                 object_detail = VEHICLE_OBJECT_TEMPLATE_DICT.copy()
+                for key in ("category", "brand", "color", "licence"):
+                    object_detail[key] = getLabel(attributes, key)
 
             return object_detail
 
@@ -474,6 +664,7 @@ class ObjectDataMessage:
             }
 
         object_list = []
+        uploaded_images = {}  # Upload each frame image once for all its objects
 
         for raw_object in self._raw_object_list:
             object = copy.deepcopy(OBJECT_TEMPLATE_DICT)
@@ -481,35 +672,82 @@ class ObjectDataMessage:
             object["id"] = raw_object.object_id
             object["bbox"] = createBboxDict(raw_object=raw_object)
 
-            image_path = local_image_directory + '/' + \
-                raw_object.timestamp + IMAGE_FILE_EXTENSION
-
-            if not self.uploadImage(image_path=image_path):
-                self._upload_result = False
-                continue
-
-            object["image_URL"] = minio_start_url + '/' + minio_bucket + '/' + \
-                minio_file_destination_directory + '/' + \
-                raw_object.timestamp + IMAGE_FILE_EXTENSION
+            # Track end messages have no frame image
+            if raw_object.has_image:
+                image_path = local_image_directory + '/' + \
+                    raw_object.timestamp + IMAGE_FILE_EXTENSION
+
+                if image_path not in uploaded_images:
+                    uploaded_images[image_path] = self.uploadImage(
+                        image_path=image_path)
+                if not uploaded_images[image_path]:
+                    self._upload_result = False
+                    continue
+
+                object["image_URL"] = minio_start_url + '/' + minio_bucket + '/' + \
+                    minio_file_destination_directory + '/' + \
+                    raw_object.timestamp + IMAGE_FILE_EXTENSION
+            else:
+                object["image_URL"] = ""
 
             if (raw_object.object_type == "Human"):
                 object["object"] = createObjectDetail(
-                    object_type=ObjectType.HUMAN)
+                    object_type=ObjectType.HUMAN,
+                    attributes=raw_object.attributes)
             elif (raw_object.object_type == "Vehicle"):
                 object["object"] = createObjectDetail(
-                    object_type=ObjectType.VEHICLE)
+                    object_type=ObjectType.VEHICLE,
+                    attributes=raw_object.attributes)
 
             object_list.append(object)
 
         return object_list
 
     def createEventList(self) -> list:
-        return []
+        event_list = []
+        uploaded_videos = {}  # Upload each clip once for all its events
+
+        for raw_event in self._raw_event_list:
+            event = copy.deepcopy(EVENT_TEMPLATE_DICT)
+
+            event["object_id"] = str(raw_event.object_id)
+            event["action"] = raw_event.action
+            event["type"] = raw_event.event_type
+
+            if raw_event.video:
+                video_path = local_image_directory + '/' + raw_event.video
+
+                if video_path not in uploaded_videos:
+                    # Same upload path and destination as the images
+                    uploaded_videos[video_path] = self.uploadImage(
+                        image_path=video_path)
+                if not uploaded_videos[video_path]:
+                    self._upload_result = False
+                    continue
+
+                event["video_URL"] = minio_start_url + '/' + minio_bucket + '/' + \
+                    minio_file_destination_directory + '/' + raw_event.video
+            else:
+                event["video_URL"] = ""
+
+            event_list.append(event)
+
+        return event_list
+
+    def getCameraID(self) -> str:
+        '''
+        Camera id of the frame the objects come from: the one sent by the
+        inference (one engine may serve several cameras), else from redis.
+        '''
+        for raw_object in self._raw_object_list + self._raw_event_list:
+            if raw_object.camera_id is not None:
+                return str(raw_object.camera_id)
+        return camera_id
 
     def createMessageID(self) -> str:
         global message_count
         msg_id = "obj-" + \
-            camera_id.zfill(4) + '-' + str(message_count).zfill(8)
+            self.getCameraID().zfill(4) + '-' + str(message_count).zfill(8)
         message_count += 1
         return msg_id
 
@@ -530,7 +768,7 @@ class ObjectDataMessage:
 
         # Check for missing fields, provide default values where necessary
         payload_dict["specs"] = self.createModelSpecs(description=model_description or 'default_model',
-                                                      cam_id=camera_id or 'default_cam',
+                                                      cam_id=self.getCameraID() or 'default_cam',
                                                       cam_type=camera_type or 'default_type')
 
         payload_dict["number_of_objects"] = self._num_of_objects
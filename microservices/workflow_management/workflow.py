@@ -22,6 +22,7 @@ class WorkflowType(Enum):
     DETECTION_RANGE = "detection_range"
     DETECTION_TIMER = "detection_timer"
     SENSOR_LIMIT = "sensor_limit"
+    DETECTION_RATE_LIMIT = "detection_rate_limit"
 
 
 def getDataRedis():
@@ -52,6 +53,8 @@ class WorkflowHandler:
             self.detectionTimerHandle()
         elif self._workflow_type == WorkflowType.SENSOR_LIMIT.value:
             self.sensorLimitHandle()
+        elif self._workflow_type == WorkflowType.DETECTION_RATE_LIMIT.value:
+            self.detectionRateLimitHandle()
 
         print(f"[INFO]: Set workflow parameters successfully")
 
@@ -60,6 +63,9 @@ class WorkflowHandler:
         points_json = json.dumps(points)
         self._redis_client.set(
             name=WorkflowType.DETECTION_RANGE.value, value=points_json)
+        # Notify subscribers (aiml-inference polygon cache) of the change
+        self._redis_client.publish(
+            channel=WorkflowType.DETECTION_RANGE.value, message=points_json)
         print(f"[INFO]: Detection Polygon: {points_json}")
 
     def detectionTimerHandle(self):
@@ -76,6 +82,20 @@ class WorkflowHandler:
         print(f"[INFO]: Sensor Limits List: {sensor_limit_list}")
 
 
+    def detectionRateLimitHandle(self):
+        rate_limit = {
+            "rate": float(self._message_payload["rate"]),
+            "burst": float(self._message_payload.get("burst", 1))
+        }
+        rate_limit_json = json.dumps(rate_limit)
+        self._redis_client.set(
+            name=WorkflowType.DETECTION_RATE_LIMIT.value, value=rate_limit_json)
+        # Notify subscribers (aiml-inference rate limiter) of the change
+        self._redis_client.publish(
+            channel=WorkflowType.DETECTION_RATE_LIMIT.value, message=rate_limit_json)
+        print(f"[INFO]: Detection Rate Limit: {rate_limit_json}")
+
+
 class CloudAMQPClient:
 
     def __init__(self, amqp_url: str, dev_queue: str,